@@ -0,0 +1,132 @@
+# async_engine.py
+# asyncio 기반 퍼징 엔진: 여러 개의 Ollama 생성 요청을 동시에 진행시켜
+# 변형/평가/로그 기록 중에도 GPU(및 Ollama 병렬 슬롯)가 쉬지 않도록 합니다.
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from fuzz_core import (apply_dedup_feedback, apply_scheduler_feedback, apply_seed_feedback, build_log_entry,
+                       get_seed_weight_after, save_log_entry, timed_generate, timed_judge, timed_mutate)
+from mutation_rng import mutation_key, new_run_seed
+
+logger = logging.getLogger(__name__)
+
+
+async def _run_iteration(iteration, seed_manager, mutator, executor, all_log_filepath,
+                         successful_prompts, max_iterations, run_stats=None, dedup_filter=None, run_seed=None,
+                         mutation_service=None, scheduler=None):
+    """반복 1회: 선택 → 변형 → (스레드에서) 생성 → 평가 → 가중치 업데이트 → 로그."""
+    loop = asyncio.get_running_loop()
+    iteration_start_time = time.time()
+
+    # 1. 시드 선택 (슬롯이 비는 시점에 선택하므로 앞선 결과의 가중치가 반영됨)
+    selected_seed_info = seed_manager.select_seed()
+    if selected_seed_info is None:
+        return
+    selected_seed_id = selected_seed_info['id']
+    original_seed_text = selected_seed_info['seed']
+    logger.info(
+        f"[{iteration}/{max_iterations}] 선택 시드 ID: {selected_seed_id} (현재 가중치: {selected_seed_info['weight']:.2f})")
+
+    # 2. 변형 (변형 서비스가 있으면 워커 프로세스에 맡기고 기다리는 동안 다른 반복을 진행)
+    key = mutation_key(run_seed, iteration, selected_seed_id)
+    if scheduler is not None:
+        key = scheduler.assign(key, mutator.medium_available())
+    if mutation_service is not None:
+        mutated_prompt, applied_mutation_names, mutate_cpu_sec, mutation_key_used = await loop.run_in_executor(
+            None, mutation_service.timed_mutate, original_seed_text, dedup_filter, key)
+    else:
+        mutated_prompt, applied_mutation_names, mutate_cpu_sec, mutation_key_used = timed_mutate(
+            mutator, original_seed_text, dedup_filter, key)
+    if mutated_prompt is None:
+        logger.info(f"[{iteration}/{max_iterations}] 중복 변형만 생성되어 LLM 호출 없이 건너뜁니다.")
+        return
+    if original_seed_text == mutated_prompt:
+        logger.info(f"[{iteration}/{max_iterations}] 변형이 적용되지 않았습니다.")
+
+    # 3. LLM 실행 (블로킹 HTTP 호출은 실행기 스레드로 넘김)
+    try:
+        llm_response, llm_duration, call_info = await loop.run_in_executor(
+            executor, timed_generate, config.TARGET_MODEL, mutated_prompt, original_seed_text)
+    except Exception as e:
+        # 예외로 반복을 빠져나가면 중복 제거 표시가 해제되지 않고 로그도 남지 않으므로 LLM 오류로 처리하고 계속 진행
+        logger.error(f"[{iteration}/{max_iterations}] LLM 호출 중 예외 발생: {e}")
+        llm_response, llm_duration, call_info = None, 0.0, {"llm_error": "unexpected"}
+    logger.info(f"[{iteration}/{max_iterations}] LLM 응답 수신 완료 ({llm_duration:.2f}초)")
+
+    # 4. 평가
+    judgment_result, judge_cpu_sec = timed_judge(original_seed_text, llm_response)
+    logger.info(f"[{iteration}/{max_iterations}] 평가 결과: {judgment_result}")
+
+    # 5. 시드 가중치/스케줄러 업데이트 (LLM 오류는 반영하지 않음)
+    is_success = apply_seed_feedback(seed_manager, selected_seed_id, judgment_result)
+    apply_scheduler_feedback(scheduler, mutation_key_used, judgment_result, llm_duration)
+    apply_dedup_feedback(dedup_filter, mutated_prompt, judgment_result)
+
+    # 6. 로깅 (완료 순서대로 기록되며 iteration 필드로 원래 순번 확인 가능)
+    log_entry = build_log_entry(
+        iteration, selected_seed_id, original_seed_text, mutated_prompt,
+        applied_mutation_names, llm_response, judgment_result, llm_duration,
+        time.time() - iteration_start_time, config.TARGET_MODEL,
+        get_seed_weight_after(seed_manager, selected_seed_id),
+        extra_fields={**call_info, "mutate_cpu_sec": mutate_cpu_sec,
+                      "judge_cpu_sec": judge_cpu_sec, "mutation_key": mutation_key_used})
+    save_log_entry(all_log_filepath, log_entry)
+    if run_stats is not None:
+        run_stats.record(log_entry)
+
+    if is_success:
+        logger.warning(
+            f"★★★ 잠재적 탈옥 발견! (반복 {iteration}, 시드 ID {selected_seed_id}) ★★★")
+        successful_prompts.append(log_entry)
+
+
+async def async_fuzz_loop(seed_manager, mutator, all_log_filepath,
+                          max_iterations=None, max_in_flight=None, run_stats=None, dedup_filter=None,
+                          run_seed=None, mutation_service=None, scheduler=None):
+    """
+    최대 max_in_flight개의 생성 요청을 동시에 유지하며 퍼징을 수행합니다.
+    변형 난수는 (run_seed, 반복 번호, 시드 ID) 키에서 파생되므로 완료 순서와 무관하게 재현됩니다.
+
+    Returns:
+        list: 성공(POTENTIAL_SUCCESS) 로그 항목 리스트.
+    """
+    max_iterations = max_iterations if max_iterations is not None else config.MAX_ITERATIONS
+    max_in_flight = max(1, max_in_flight if max_in_flight is not None else config.MAX_IN_FLIGHT)
+    run_seed = run_seed if run_seed is not None else new_run_seed()
+
+    successful_prompts = []
+    semaphore = asyncio.Semaphore(max_in_flight)
+    tasks = []
+
+    with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="ollama") as executor:
+        for i in range(max_iterations):
+            await semaphore.acquire()  # 빈 슬롯이 생길 때까지 대기
+            task = asyncio.create_task(_run_iteration(
+                i + 1, seed_manager, mutator, executor, all_log_filepath,
+                successful_prompts, max_iterations, run_stats, dedup_filter, run_seed, mutation_service,
+                scheduler))
+            task.add_done_callback(lambda _t: semaphore.release())
+            tasks.append(task)
+
+            if (i + 1) % 10 == 0:
+                logger.info(
+                    f"진행: {i+1}/{max_iterations} 발행, 현재 성공 건수: {len(successful_prompts)}")
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    for iteration, result in enumerate(results, start=1):
+        if isinstance(result, Exception):
+            logger.error(f"반복 {iteration} 처리 중 오류 발생: {result}")
+
+    return successful_prompts
+
+
+def run_async_fuzz(seed_manager, mutator, all_log_filepath, max_iterations=None, max_in_flight=None,
+                   run_stats=None, dedup_filter=None, run_seed=None, mutation_service=None, scheduler=None):
+    """동기 코드(main)에서 비동기 엔진을 실행하는 진입점."""
+    return asyncio.run(async_fuzz_loop(
+        seed_manager, mutator, all_log_filepath, max_iterations, max_in_flight, run_stats, dedup_filter,
+        run_seed, mutation_service, scheduler))
@@ -0,0 +1,137 @@
+# benchmark.py
+# mock_ollama 대역 서버를 상대로 main_fuzz_loop 전체를 실행해 퍼저 자체의 처리량/오버헤드를 측정합니다.
+# 기준치(--min-iter-per-sec, --max-cpu-ms-per-iter)를 벗어나면 종료 코드 1을 반환하므로 CI에서 사용 가능.
+#
+# 실행 예: python benchmark.py --iterations 200 --engine pipeline --latency-ms 50 --min-iter-per-sec 20
+import argparse
+import glob
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import config
+import llm_interface
+from fuzz_core import load_log_entries
+from llm_resilience import percentile
+from mock_ollama import MockOllamaServer, add_settings_arguments, settings_from_args
+
+logger = logging.getLogger("Benchmark")
+
+# 로그 항목에 기록되는 단계별 CPU 시간 필드
+STAGE_CPU_FIELDS = {
+    "mutate": "mutate_cpu_sec",
+    "generate": "generate_cpu_sec",
+    "judge": "judge_cpu_sec",
+}
+
+
+def summarize(entries, wall_sec, process_cpu_sec):
+    """로그 항목들로 처리량, 반복 지연 백분위수, 단계별 CPU 시간 요약."""
+    n = len(entries)
+    latencies = sorted(e["iteration_duration_sec"] for e in entries)
+    report = {
+        "iterations": n,
+        "wall_sec": round(wall_sec, 3),
+        "iter_per_sec": round(n / wall_sec, 2) if wall_sec > 0 else None,
+        "iteration_latency_p50_sec": percentile(latencies, 50),
+        "iteration_latency_p99_sec": percentile(latencies, 99),
+        "process_cpu_sec": round(process_cpu_sec, 3),
+        "process_cpu_ms_per_iter": round(1000 * process_cpu_sec / n, 3) if n else None,
+        "llm_errors": sum(1 for e in entries if e.get("llm_error")),
+        "successes": sum(1 for e in entries if "SUCCESS" in e["judgment"]),
+        "stage_cpu_ms_per_iter": {},
+    }
+    for stage, field in STAGE_CPU_FIELDS.items():
+        values = [e[field] for e in entries if field in e]
+        report["stage_cpu_ms_per_iter"][stage] = (
+            round(1000 * statistics.fmean(values), 3) if values else None)
+    return report
+
+
+def run_benchmark(args):
+    """대역 서버 기동 → config 패치 → main_fuzz_loop 실행 → 로그 집계."""
+    server = MockOllamaServer(port=0, settings=settings_from_args(args)).start()
+    results_dir = tempfile.mkdtemp(prefix="kofuzz_bench_")
+
+    config.OLLAMA_ENDPOINTS = [server.generate_url]
+    config.RESULTS_DIR = results_dir
+    config.MAX_ITERATIONS = args.iterations
+    config.ENGINE_MODE = args.engine
+    config.MAX_IN_FLIGHT = args.in_flight
+    config.PIPELINE_GENERATE_WORKERS = args.in_flight
+    config.LLM_STREAM = args.stream
+    config.MUTATION_SERVICE_WORKERS = args.mutation_workers
+    config.TARGET_MODELS = [config.TARGET_MODEL]
+    # 캐시 적중과 중복 건너뛰기는 하네스 오버헤드 측정(완료 반복 수)을 왜곡하므로 끔
+    config.RESPONSE_CACHE_ENABLED = False
+    config.DEDUP_ENABLED = False
+    llm_interface.reset_default_client()
+
+    import main  # config 패치 후 임포트 (로깅 설정 포함)
+    if args.quiet:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    try:
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        main.main_fuzz_loop()
+        wall_sec, cpu_sec = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    finally:
+        server.stop()
+        llm_interface.reset_default_client()
+
+    entries = []
+    for log_filepath in glob.glob(os.path.join(results_dir, "all_log_*.jsonl")):
+        entries.extend(load_log_entries(log_filepath))
+    report = summarize(entries, wall_sec, cpu_sec)
+    report["engine"] = args.engine
+    report["results_dir"] = results_dir
+    return report
+
+
+def check_thresholds(report, args):
+    """기준치 위반 목록."""
+    violations = []
+    if args.min_iter_per_sec is not None and (report["iter_per_sec"] or 0) < args.min_iter_per_sec:
+        violations.append(f"iter/s {report['iter_per_sec']} < {args.min_iter_per_sec}")
+    if (args.max_cpu_ms_per_iter is not None
+            and (report["process_cpu_ms_per_iter"] or 0) > args.max_cpu_ms_per_iter):
+        violations.append(
+            f"CPU ms/iter {report['process_cpu_ms_per_iter']} > {args.max_cpu_ms_per_iter}")
+    if report["iterations"] < args.iterations:
+        violations.append(f"완료 반복 {report['iterations']} < {args.iterations}")
+    return violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KoFuzzLLM 처리량 벤치마크 (mock Ollama 사용)")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--engine", choices=["sync", "async", "pipeline"], default=config.ENGINE_MODE)
+    parser.add_argument("--in-flight", type=int, default=config.MAX_IN_FLIGHT)
+    parser.add_argument("--stream", action="store_true", help="스트리밍 생성 사용")
+    parser.add_argument("--mutation-workers", type=int, default=config.MUTATION_SERVICE_WORKERS,
+                        help="변형 서비스 워커 프로세스 수 (async/pipeline, 0이면 프로세스 안에서 변형)")
+    parser.add_argument("--min-iter-per-sec", type=float, default=None)
+    parser.add_argument("--max-cpu-ms-per-iter", type=float, default=None)
+    parser.add_argument("--json-out", default=None, help="결과 JSON 저장 경로")
+    parser.add_argument("--quiet", action="store_true", help="퍼저 INFO 로그 끄기")
+    add_settings_arguments(parser)
+    args = parser.parse_args()
+
+    report = run_benchmark(args)
+    print(json.dumps(report, ensure_ascii=False, indent=4))
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=4)
+
+    violations = check_thresholds(report, args)
+    for violation in violations:
+        print(f"기준치 위반: {violation}", file=sys.stderr)
+    return 1 if violations else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,227 @@
+# campaign.py
+# 멀티 모델 캠페인: 한 번의 실행에서 여러 모델을 퍼징하며 같은 변형 프롬프트를 모든 모델에 전송합니다.
+# 변형 프롬프트를 배치로 모은 뒤 모델별로 몰아서 생성하고(keep_alive 적용), 배치마다 모델 순서를
+# 뒤집어(지그재그) 직전 배치의 마지막 모델부터 시작하므로 VRAM 모델 교체가 최소화됩니다.
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import config
+from dedup import DedupFilter
+from operator_scheduler import build_scheduler
+from mutation_rng import mutation_key, new_run_seed
+from llm_interface import get_default_client
+from run_stats import RunStats
+from fuzz_core import (JsonlLogWriter, apply_dedup_feedback, apply_scheduler_feedback, apply_seed_feedback,
+                       build_dedup_path, build_log_entry, build_log_paths, build_run_stats_path, build_scheduler_path,
+                       get_seed_weight_after, save_successful_results,
+                       timed_generate, timed_judge, timed_mutate)
+
+logger = logging.getLogger(__name__)
+
+
+def model_order_for_batch(models, batch_index):
+    """배치 순번에 따른 모델 처리 순서 (짝수 배치는 정방향, 홀수 배치는 역방향)."""
+    return list(models) if batch_index % 2 == 0 else list(reversed(models))
+
+
+class FuzzCampaign:
+    """
+    TARGET_MODELS 전체를 대상으로 하는 캠페인 실행기.
+    시드 선택과 변형은 모든 모델이 공유하고, 각 모델의 판정 결과는 모두 시드 가중치에 반영됩니다.
+    로그는 모델별 all_log/success_log 파일에 따로 기록됩니다.
+    """
+
+    def __init__(self, seed_manager, mutator, models=None, max_iterations=None,
+                 batch_size=None, max_in_flight=None, timestamp=None, run_seed=None, mutation_service=None,
+                 startup_sec=None):
+        self.seed_manager = seed_manager
+        self.run_seed = run_seed if run_seed is not None else new_run_seed()
+        self.mutator = mutator
+        # 변형 서비스(mutation_service.MutationService)가 있으면 배치 전체를 워커 프로세스에 나눠 변형
+        self.mutation_service = mutation_service
+        self.models = list(models or config.TARGET_MODELS)
+        self.max_iterations = max_iterations if max_iterations is not None else config.MAX_ITERATIONS
+        self.batch_size = max(1, batch_size or config.CAMPAIGN_BATCH_SIZE)
+        self.max_in_flight = max(1, max_in_flight or config.MAX_IN_FLIGHT)
+        timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.log_paths = {model: build_log_paths(model, timestamp) for model in self.models}
+        self.run_stats_paths = {model: build_run_stats_path(model, timestamp) for model in self.models}
+        self.run_stats = {model: RunStats(model) for model in self.models}
+        for stats in self.run_stats.values():
+            stats.run_seed = self.run_seed
+            # 변형은 모든 모델이 공유하므로 연산자 비용도 같은 집계를 참조
+            stats.operator_costs = mutator.operator_stats
+            if startup_sec is not None:
+                # 변형기 준비 시간은 백그라운드 준비가 끝나는 대로 채워지므로 같은 딕셔너리를 참조
+                stats.startup = {"startup_sec": round(startup_sec, 3), "mutator": mutator.startup_times}
+        self.successful_prompts = {model: [] for model in self.models}
+        self.load_durations = {model: [] for model in self.models}
+        self.model_switches = 0
+        self._current_model = None
+        # 같은 프롬프트를 모든 모델에 보내므로 중복 제거 필터는 모델 조합 단위로 하나
+        self.dedup_filter = (DedupFilter(build_dedup_path("+".join(self.models)))
+                             if config.DEDUP_ENABLED else None)
+        # 연산자도 모든 모델이 공유하므로 스케줄러는 모델 조합 단위로 하나 (모든 모델의 판정 결과로 학습)
+        self.scheduler = build_scheduler(mutator, build_scheduler_path("+".join(self.models)), seed=self.run_seed)
+
+    # --- 단계 구현 ---
+    def _mutate_batch(self, first_iteration, count):
+        """
+        시드 선택 + 변형을 count회 수행 (모든 모델이 이 배치를 공유).
+
+        Returns:
+            tuple: (batch, consumed) - consumed는 사용한 반복 수 (중복으로 건너뛴 반복 포함)
+        """
+        # 가중치는 배치의 생성/판정이 끝난 뒤에 바뀌므로 배치의 시드를 먼저 모두 선택해도 순서는 같음
+        selections = []
+        for iteration in range(first_iteration, first_iteration + count):
+            selected_seed_info = self.seed_manager.select_seed()
+            if selected_seed_info is None:
+                break
+            selections.append((iteration, selected_seed_info))
+        requests = [(selected_seed_info['seed'], mutation_key(self.run_seed, iteration, selected_seed_info['id']))
+                    for iteration, selected_seed_info in selections]
+        if self.scheduler is not None:
+            medium = self.mutator.medium_available()
+            requests = [(text, self.scheduler.assign(key, medium)) for text, key in requests]
+        if self.mutation_service is not None:
+            mutations = self.mutation_service.timed_mutate_many(requests, self.dedup_filter)
+        else:
+            mutations = [timed_mutate(self.mutator, text, self.dedup_filter, key) for text, key in requests]
+
+        batch = []
+        for (iteration, selected_seed_info), mutation in zip(selections, mutations):
+            original_seed_text = selected_seed_info['seed']
+            mutated_prompt, applied_mutation_names, mutate_cpu_sec, mutation_key_used = mutation
+            if mutated_prompt is None:
+                logger.info(f"[{iteration}/{self.max_iterations}] 중복 변형만 생성되어 LLM 호출 없이 건너뜁니다.")
+                continue
+            if original_seed_text == mutated_prompt:
+                logger.info(f"[{iteration}/{self.max_iterations}] 변형이 적용되지 않았습니다.")
+            batch.append({
+                "iteration": iteration,
+                "seed_info": selected_seed_info,
+                "mutated_prompt": mutated_prompt,
+                "applied_mutations": applied_mutation_names,
+                "mutate_cpu_sec": mutate_cpu_sec,
+                "mutation_key": mutation_key_used,
+                "mutate_end_time": time.time(),
+            })
+        return batch, len(selections)
+
+    def _switch_model(self, model_name):
+        if model_name == self._current_model:
+            return
+        self.model_switches += 1
+        self._current_model = model_name
+        if config.CAMPAIGN_PRELOAD_MODELS:
+            load_duration = get_default_client().preload(model_name)
+            self.load_durations[model_name].append(load_duration)
+            logger.info(f"모델 전환: {model_name} (적재 {load_duration:.2f}초)")
+        else:
+            logger.info(f"모델 전환: {model_name}")
+
+    def _run_model_group(self, model_name, batch, executor, writer):
+        """한 모델에 대해 배치 전체를 생성 → 평가 → 기록 (생성은 max_in_flight개씩 동시 진행)."""
+        self._switch_model(model_name)
+        futures = [
+            executor.submit(timed_generate, model_name, item["mutated_prompt"], item["seed_info"]['seed'])
+            for item in batch
+        ]
+        for item, future in zip(batch, futures):
+            try:
+                llm_response, llm_duration, call_info = future.result()
+            except Exception as e:
+                logger.error(f"[{model_name}] 반복 {item['iteration']} LLM 호출 중 예외 발생: {e}")
+                llm_response, llm_duration, call_info = None, 0.0, {"llm_error": "unexpected"}
+
+            seed_id = item["seed_info"]['id']
+            original_seed_text = item["seed_info"]['seed']
+            judgment_result, judge_cpu_sec = timed_judge(original_seed_text, llm_response)
+            logger.info(
+                f"[{model_name}] [{item['iteration']}/{self.max_iterations}] 평가 결과: {judgment_result}")
+            is_success = apply_seed_feedback(self.seed_manager, seed_id, judgment_result)
+            apply_scheduler_feedback(self.scheduler, item["mutation_key"], judgment_result, llm_duration)
+            apply_dedup_feedback(self.dedup_filter, item["mutated_prompt"], judgment_result)
+
+            log_entry = build_log_entry(
+                item["iteration"], seed_id, original_seed_text, item["mutated_prompt"],
+                item["applied_mutations"], llm_response, judgment_result, llm_duration,
+                time.time() - item["mutate_end_time"], model_name,
+                get_seed_weight_after(self.seed_manager, seed_id),
+                extra_fields={**call_info, "mutate_cpu_sec": item["mutate_cpu_sec"],
+                              "judge_cpu_sec": judge_cpu_sec, "mutation_key": item["mutation_key"]})
+            writer.write(log_entry)
+            self.run_stats[model_name].record(log_entry)
+            if is_success:
+                logger.warning(
+                    f"★★★ 잠재적 탈옥 발견! ({model_name}, 반복 {item['iteration']}, 시드 ID {seed_id}) ★★★")
+                self.successful_prompts[model_name].append(log_entry)
+
+    # --- 실행 ---
+    def run(self):
+        """
+        캠페인을 끝까지 실행합니다.
+
+        Returns:
+            dict: 모델명 -> 성공(POTENTIAL_SUCCESS) 로그 항목 리스트.
+        """
+        writers = {model: JsonlLogWriter(self.log_paths[model][0]) for model in self.models}
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_in_flight,
+                                    thread_name_prefix="ollama") as executor:
+                next_iteration, batch_index = 1, 0
+                while next_iteration <= self.max_iterations:
+                    count = min(self.batch_size, self.max_iterations - next_iteration + 1)
+                    batch, consumed = self._mutate_batch(next_iteration, count)
+                    if not consumed:
+                        break
+                    if batch:
+                        for model_name in model_order_for_batch(self.models, batch_index):
+                            self._run_model_group(model_name, batch, executor, writers[model_name])
+                        batch_index += 1
+                    next_iteration += consumed
+                    logger.info(
+                        f"진행: {next_iteration - 1}/{self.max_iterations}, 모델별 성공 건수: "
+                        f"{ {m: len(s) for m, s in self.successful_prompts.items()} }, "
+                        f"모델 전환 {self.model_switches}회")
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        if self.dedup_filter is not None:
+            dedup_stats = self.dedup_filter.stats()
+            logger.info(f"중복 제거: {dedup_stats}")
+            self.dedup_filter.save()
+        if self.scheduler is not None:
+            scheduler_summary = self.scheduler.summary()
+            self.scheduler.save()
+        for model_name in self.models:
+            if self.dedup_filter is not None:
+                self.run_stats[model_name].dedup = dedup_stats
+            if self.scheduler is not None:
+                self.run_stats[model_name].scheduler = scheduler_summary
+            save_successful_results(self.log_paths[model_name][1], self.successful_prompts[model_name])
+            self.run_stats[model_name].save(self.run_stats_paths[model_name])
+            self.run_stats[model_name].log_summary()
+        return self.successful_prompts
+
+
+def run_campaign(seed_manager, mutator, models=None, max_iterations=None, run_seed=None, mutation_service=None,
+                 startup_sec=None):
+    """main에서 멀티 모델 캠페인을 실행하는 진입점. startup_sec는 모델별 run_stats의 초기화 소요 시간으로 기록."""
+    os.makedirs(config.RESULTS_DIR, exist_ok=True)
+    campaign = FuzzCampaign(seed_manager, mutator, models, max_iterations, run_seed=run_seed,
+                            mutation_service=mutation_service, startup_sec=startup_sec)
+    logger.info(
+        f"===== 캠페인 시작 (모델: {campaign.models}, 반복: {campaign.max_iterations}, "
+        f"배치: {campaign.batch_size}, 실행 시드: {campaign.run_seed}) =====")
+    successful_prompts = campaign.run()
+    for model_name, (all_log_filepath, _) in campaign.log_paths.items():
+        logger.info(
+            f"{model_name}: 잠재적 탈옥 {len(successful_prompts[model_name])}건, "
+            f"모델 적재 {len(campaign.load_durations[model_name])}회, 로그 '{all_log_filepath}'")
+    return successful_prompts
@@ -0,0 +1,134 @@
+# char_kernel.py
+# 문자 단위 Low-Level 변형의 융합 실행기
+# 글자 하나를 독립적으로 바꾸는 변형들(유사 문자, 전각, 보이지 않는 문자, 자모 분해/변경)을 연산자 목록으로 컴파일해
+# 문자열 한 번의 분해/결합으로 모두 적용합니다. 대상 위치는 정규식 문자 클래스로 찾고(C 속도),
+# 실제로 바꿀 위치는 기하분포 건너뛰기로 뽑으므로 연산자마다 문자열 전체를 다시 만들지 않습니다.
+# 앞 연산자가 바꾼 조각(예: 분해된 자모)에는 뒤 연산자가 조각 안의 글자 단위로 적용되므로
+# 각 변형을 차례로 실행한 것과 같은 분포를 가집니다. 난수는 호출자가 넘긴 생성기(rng)만 사용합니다.
+import math
+import random
+
+
+def sample_positions(positions, probability, rng=random):
+    """
+    positions의 각 원소를 독립적으로 probability 확률로 선택 (순서 유지).
+    글자마다 rng.random()을 호출하는 대신 다음 선택까지의 간격을 기하분포로 뽑아 건너뛰므로
+    난수 호출 수가 선택되는 개수에 비례합니다 (분포는 글자별 시행과 동일).
+    """
+    if probability <= 0 or not positions:
+        return []
+    if probability >= 1:
+        return list(positions)
+    log_q = math.log(1.0 - probability)
+    chosen = []
+    i = -1
+    n = len(positions)
+    while True:
+        # 1 - rng.random()은 (0, 1] 범위이므로 log 정의역 오류 없음
+        i += 1 + int(math.log(1.0 - rng.random()) / log_q)
+        if i >= n:
+            return chosen
+        chosen.append(positions[i])
+
+
+class CharOp:
+    """
+    문자 단위 변형 연산자.
+
+    Args:
+        name (str): 변형 이름 (applied_mutations에 기록되는 함수명)
+        pattern: 대상 글자 한 개에 맞는 컴파일된 정규식. None이면 모든 글자가 대상.
+        transform (callable): (글자, rng) -> 바꿀 문자열 (여러 글자 가능)
+        probability (float): 대상 글자마다 적용할 확률
+        prefix (callable): 선택. 전체 적용 후 rng를 인자로 호출되어 맨 앞에 붙일 문자열(또는 None)을 반환
+    """
+
+    def __init__(self, name, pattern, transform, probability, prefix=None):
+        self.name = name
+        self.pattern = pattern
+        self.transform = transform
+        self.probability = probability
+        self.prefix = prefix
+        self._accepts = {}  # 글자 -> 대상 여부 (조각 안 글자 검사용 메모)
+
+    def positions(self, text):
+        if self.pattern is None:
+            return range(len(text))
+        return [m.start() for m in self.pattern.finditer(text)]
+
+    def accepts(self, char):
+        if self.pattern is None:
+            return True
+        accepted = self._accepts.get(char)
+        if accepted is None:
+            accepted = self._accepts[char] = self.pattern.fullmatch(char) is not None
+        return accepted
+
+
+class FusedCharKernel:
+    """CharOp 목록을 순서대로 한 번에 적용하는 실행기 (상태 없음, 스레드 간 공유 가능)."""
+
+    def __init__(self, ops):
+        self.ops = tuple(ops)
+
+    def apply(self, text, known_positions=None, rng=None):
+        """
+        Args:
+            text (str): 원본 텍스트
+            known_positions (dict): 선택. {pattern: 위치 목록} - 시드 인덱스 등에 미리 계산된 대상 위치
+            rng (random.Random): 난수 생성기. None이면 전역 random
+
+        Returns:
+            tuple: (mutated_text, fired) - fired는 실제로 텍스트를 바꾼 연산자 이름 목록 (적용 순서)
+        """
+        rng = rng or random
+        # 원본 위치 -> 바뀐 조각. 키 -1은 맨 앞에 붙는 조각
+        modified = {}
+        fired = []
+        for op in self.ops:
+            if known_positions and op.pattern in known_positions:
+                base = known_positions[op.pattern]
+            else:
+                base = op.positions(text)
+            # 이미 바뀐 위치는 원본 글자 대신 조각 안의 글자가 대상 (이번 연산자 적용 전에 모두 계산).
+            # 글자마다 독립 시행이므로 원본 위치에서 뽑힌 것 중 바뀐 위치를 버리는 것은 미리 걸러낸 것과 같음
+            piece_targets = [(i, j) for i, piece in modified.items()
+                             for j, char in enumerate(piece) if op.accepts(char)]
+            skip = set(modified)
+
+            changed = False
+            for i in sample_positions(base, op.probability, rng):
+                if i in skip:
+                    continue
+                char = text[i]
+                replacement = op.transform(char, rng)
+                if replacement != char:
+                    modified[i] = replacement
+                    changed = True
+            if piece_targets:
+                edits = {}
+                for i, j in sample_positions(piece_targets, op.probability, rng):
+                    edits.setdefault(i, []).append(j)
+                for i, offsets in edits.items():
+                    piece_chars = list(modified[i])
+                    for j in offsets:
+                        replacement = op.transform(piece_chars[j], rng)
+                        if replacement != piece_chars[j]:
+                            piece_chars[j] = replacement
+                            changed = True
+                    modified[i] = "".join(piece_chars)
+            if op.prefix is not None:
+                prefix = op.prefix(rng)
+                if prefix:
+                    modified[-1] = prefix + modified.get(-1, "")
+                    changed = True
+            if changed:
+                fired.append(op.name)
+
+        if not modified:
+            return text, fired
+        chars = list(text)
+        prefix = modified.pop(-1, "")
+        for i, piece in modified.items():
+            chars[i] = piece
+        return prefix + "".join(chars), fired
@@ -0,0 +1,194 @@
+# dedup.py
+# 변형 프롬프트 중복 제거: LLM에 보내기 전에 이미 보낸 프롬프트와 같거나(정확히 일치)
+# 정규화하면 같아지는(보이지 않는 문자, 전각/반각, 분해된 자모 차이만 있는) 프롬프트를 걸러 GPU 비용을 아낍니다.
+# 정확 일치는 실행 중 해시 집합으로, 정규화 형태는 크기가 고정된 블룸 필터로 확인하며
+# 블룸 필터는 모델별 파일로 저장되어 다음 실행에도 이어집니다.
+# check()는 이번 실행 안에서만 '보낸 것'으로 표시하고, 저장되는 블룸 필터에는 LLM이 오류 없이 응답한 뒤
+# commit()으로 넣습니다 (실패한 호출은 release(), 보내지 못하고 끝난 변형은 다음 실행에서 다시 보낼 수 있음).
+import hashlib
+import logging
+import os
+import random
+import re
+import struct
+import threading
+import unicodedata
+
+import config
+import hangul
+
+logger = logging.getLogger(__name__)
+
+# 판정 결과
+NEW = "new"
+EXACT_DUPLICATE = "exact_duplicate"
+NEAR_DUPLICATE = "near_duplicate"
+NEAR_DUPLICATE_SAMPLED = "near_duplicate_sampled"  # 유사 중복이지만 sample 정책으로 통과
+
+_BLOOM_MAGIC = b"KOBLOOM1"
+_BLOOM_HEADER = struct.Struct("<8sQIQ")  # magic, 비트 수, 해시 수, 추가된 항목 수
+
+# 정규화 시 제거할 보이지 않는 문자 (KoreanMutator.INVISIBLE_CHARS 포함)
+INVISIBLE_CHARS = '\u200B\u200C\u200D\u2060\uFEFF\u180E\u00AD'
+_STRIP_INVISIBLE_TABLE = dict.fromkeys(map(ord, INVISIBLE_CHARS))
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# 정규화 단계 (config.DEDUP_CANONICAL_STEPS 순서대로 적용)
+CANONICAL_STEPS = {
+    "strip_invisible": lambda text: text.translate(_STRIP_INVISIBLE_TABLE),
+    "recompose_jamo": hangul.recompose,
+    # NFKC: 전각 -> 반각 등 호환 문자 통합 (호환 자모는 NFKC가 조합형 자모로 바꾸므로 재조합을 먼저 수행)
+    "nfkc": lambda text: unicodedata.normalize('NFKC', text),
+    "collapse_whitespace": lambda text: _WHITESPACE_PATTERN.sub(' ', text).strip(),
+}
+
+
+def canonicalize(text, steps=None):
+    """중복 판정용 정규화 형태."""
+    for step in (steps if steps is not None else config.DEDUP_CANONICAL_STEPS):
+        text = CANONICAL_STEPS[step](text)
+    return text
+
+
+def _digest(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+class BloomFilter:
+    """고정 크기 블룸 필터 (bytearray 비트 배열, 이중 해싱으로 num_hashes개 위치 계산). 락은 호출자가 관리."""
+
+    def __init__(self, num_bits, num_hashes, bits=None, count=0):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bits if bits is not None else bytearray((num_bits + 7) // 8)
+        self.count = count
+
+    def _positions(self, digest):
+        h1, h2 = struct.unpack("<QQ", digest)
+        h2 |= 1  # 0이면 모든 위치가 같아지므로 홀수로 만듦
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, digest):
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(digest))
+
+    def add(self, digest):
+        for p in self._positions(digest):
+            self.bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    def save(self, path):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_BLOOM_HEADER.pack(_BLOOM_MAGIC, self.num_bits, self.num_hashes, self.count))
+            f.write(self.bits)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, num_bits, num_hashes):
+        """저장된 필터 로드. 없거나 크기/해시 수 설정이 다르면 None."""
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            header = f.read(_BLOOM_HEADER.size)
+            if len(header) != _BLOOM_HEADER.size:
+                return None
+            magic, saved_bits, saved_hashes, count = _BLOOM_HEADER.unpack(header)
+            if magic != _BLOOM_MAGIC or saved_bits != num_bits or saved_hashes != num_hashes:
+                logger.warning(f"중복 제거 필터 설정이 달라 새로 시작합니다: {path}")
+                return None
+            bits = bytearray(f.read())
+        if len(bits) != (num_bits + 7) // 8:
+            return None
+        return cls(num_bits, num_hashes, bits, count)
+
+
+class DedupFilter:
+    """
+    LLM 전송 전 프롬프트 중복 판정기 (여러 스레드에서 호출 가능).
+    - 정확히 같은 프롬프트(이번 실행): 항상 건너뜀
+    - 정규화 형태가 이미 본 것과 같음(이번 실행에서 통과시킨 것, 또는 이전 실행까지 응답을 받은 것): DEDUP_POLICY에 따라
+      "skip"이면 건너뛰고 "sample"이면 DEDUP_SAMPLE_RATE 확률로 통과
+    통과한 프롬프트는 LLM 결과에 따라 commit()(블룸 필터에 기록) 또는 release()(표시 해제)합니다.
+    """
+
+    def __init__(self, path=None, policy=None, sample_rate=None, steps=None):
+        self.path = path
+        self.policy = policy or config.DEDUP_POLICY
+        self.sample_rate = sample_rate if sample_rate is not None else config.DEDUP_SAMPLE_RATE
+        self.steps = tuple(steps if steps is not None else config.DEDUP_CANONICAL_STEPS)
+        num_bits, num_hashes = config.DEDUP_BLOOM_BITS, config.DEDUP_BLOOM_HASHES
+        self.bloom = (BloomFilter.load(path, num_bits, num_hashes) if path else None) \
+            or BloomFilter(num_bits, num_hashes)
+        self.previous_count = self.bloom.count  # 이전 실행에서 누적된 정규화 형태 수
+        self._exact = set()
+        self._pending = set()  # 통과했지만 아직 commit/release되지 않은 정규화 형태 (이번 실행)
+        self.counts = dict.fromkeys((NEW, EXACT_DUPLICATE, NEAR_DUPLICATE, NEAR_DUPLICATE_SAMPLED), 0)
+        self._lock = threading.Lock()
+
+    def check(self, prompt):
+        """
+        프롬프트 판정 후 통과한 것은 이번 실행 안에서 기록합니다 (블룸 필터에는 commit()에서 기록).
+
+        Returns:
+            tuple: (admitted, verdict)
+        """
+        exact_digest = _digest(prompt)
+        canonical_digest = _digest(canonicalize(prompt, self.steps))
+        with self._lock:
+            if exact_digest in self._exact:
+                verdict = EXACT_DUPLICATE
+            elif canonical_digest in self._pending or canonical_digest in self.bloom:
+                if self.policy == "sample" and random.random() < self.sample_rate:
+                    verdict = NEAR_DUPLICATE_SAMPLED
+                else:
+                    verdict = NEAR_DUPLICATE
+            else:
+                verdict = NEW
+            self.counts[verdict] += 1
+            admitted = verdict in (NEW, NEAR_DUPLICATE_SAMPLED)
+            if admitted:
+                self._exact.add(exact_digest)
+                if verdict == NEW:
+                    self._pending.add(canonical_digest)
+        return admitted, verdict
+
+    def commit(self, prompt):
+        """LLM이 응답한 프롬프트의 정규화 형태를 블룸 필터에 기록 (다음 실행에도 중복으로 판정)."""
+        canonical_digest = _digest(canonicalize(prompt, self.steps))
+        with self._lock:
+            self._pending.discard(canonical_digest)
+            if canonical_digest not in self.bloom:
+                self.bloom.add(canonical_digest)
+
+    def release(self, prompt):
+        """LLM 호출이 실패한 프롬프트의 통과 기록 해제 (이후 같은 변형을 다시 보낼 수 있음)."""
+        exact_digest = _digest(prompt)
+        canonical_digest = _digest(canonicalize(prompt, self.steps))
+        with self._lock:
+            self._exact.discard(exact_digest)
+            self._pending.discard(canonical_digest)
+
+    def stats(self):
+        with self._lock:
+            checked = sum(self.counts.values())
+            skipped = self.counts[EXACT_DUPLICATE] + self.counts[NEAR_DUPLICATE]
+            return {
+                **self.counts,
+                "checked": checked,
+                "skipped": skipped,
+                "skip_rate": round(skipped / checked, 3) if checked else None,
+                "policy": self.policy,
+                "canonical_forms": self.bloom.count,
+                "canonical_forms_from_previous_runs": self.previous_count,
+            }
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            try:
+                self.bloom.save(self.path)
+                logger.info(f"중복 제거 필터 저장 완료: {self.path} ({self.bloom.count}개)")
+            except (IOError, OSError) as e:
+                logger.error(f"중복 제거 필터 저장 실패 {self.path}: {e}")
@@ -0,0 +1,175 @@
+# endpoint_pool.py
+# 여러 Ollama 호스트에 요청을 분산하는 엔드포인트 풀
+# - 진행 중인 요청 수(outstanding)가 가장 적은 엔드포인트로 배정 (동률이면 평균 지연이 짧은 쪽)
+# - 연속 실패 또는 다른 엔드포인트 대비 과도한 지연 시 일시 제외(eject), 헬스 체크 통과 시 재투입
+import logging
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class Endpoint:
+    """엔드포인트 하나의 상태와 지연/실패 통계."""
+
+    # 지연 시간 지수이동평균(EWMA) 가중치
+    EWMA_ALPHA = 0.2
+
+    def __init__(self, url):
+        self.url = url  # /api/generate 전체 URL
+        parts = urlsplit(url)
+        self.base_url = f"{parts.scheme}://{parts.netloc}"
+        self.outstanding = 0
+        self.healthy = True
+        self.ejected_until = 0.0
+        self.consecutive_failures = 0
+        self.requests = 0
+        self.failures = 0
+        self.ewma_latency = None
+        self.latency_samples = 0  # 마지막 투입(재투입) 이후 EWMA에 반영된 성공 응답 수
+        self.last_latency = None
+
+    def record(self, latency, success):
+        self.requests += 1
+        if success:
+            self.consecutive_failures = 0
+            self.last_latency = latency
+            self.latency_samples += 1
+            if self.ewma_latency is None:
+                self.ewma_latency = latency
+            else:
+                self.ewma_latency += self.EWMA_ALPHA * (latency - self.ewma_latency)
+        else:
+            self.failures += 1
+            self.consecutive_failures += 1
+
+    def readmit(self):
+        """재투입: 실패 누적과 지연 통계를 새로 시작 (재투입 직후 느린 응답 한 건으로 다시 제외되지 않도록)."""
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.ewma_latency = None
+        self.latency_samples = 0
+
+    def stats(self):
+        """로그 항목에 기록할 엔드포인트 통계."""
+        return {
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+            "ewma_latency_sec": round(self.ewma_latency, 3) if self.ewma_latency is not None else None,
+            "last_latency_sec": round(self.last_latency, 3) if self.last_latency is not None else None,
+        }
+
+
+class EndpointPool:
+    """Ollama 엔드포인트 풀 (스레드 간 공유 가능)."""
+
+    def __init__(self, urls, eject_after_failures=None, slow_factor=None, eject_cooldown=None):
+        """
+        Args:
+            urls (list[str]): /api/generate URL 목록.
+            eject_after_failures (int): 연속 실패가 이 횟수에 도달하면 제외.
+            slow_factor (float): 평균 지연이 다른 엔드포인트 중앙값의 이 배수를 넘으면 제외.
+            eject_cooldown (float): 제외 후 헬스 체크로 재투입을 시도하기까지의 최소 시간(초).
+        """
+        if not urls:
+            raise ValueError("EndpointPool에는 최소 하나의 엔드포인트가 필요합니다.")
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.eject_after_failures = eject_after_failures or config.ENDPOINT_EJECT_AFTER_FAILURES
+        self.slow_factor = slow_factor or config.ENDPOINT_SLOW_FACTOR
+        self.eject_cooldown = eject_cooldown if eject_cooldown is not None else config.ENDPOINT_EJECT_COOLDOWN
+        self._lock = threading.Lock()
+        self._health_thread = None
+        self._stop_event = threading.Event()
+
+    def acquire(self):
+        """요청을 보낼 엔드포인트 선택 (outstanding 증가). 건강한 엔드포인트가 없으면 전체에서 선택."""
+        with self._lock:
+            candidates = [ep for ep in self.endpoints if ep.healthy] or self.endpoints
+            endpoint = min(candidates, key=lambda ep: (
+                ep.outstanding, ep.ewma_latency if ep.ewma_latency is not None else 0.0))
+            endpoint.outstanding += 1
+            return endpoint
+
+    def release(self, endpoint, latency, success):
+        """요청 완료 처리: 통계 갱신 및 제외 여부 판단."""
+        with self._lock:
+            endpoint.outstanding -= 1
+            endpoint.record(latency, success)
+            if not endpoint.healthy:
+                return
+            if endpoint.consecutive_failures >= self.eject_after_failures:
+                self._eject(endpoint, f"연속 실패 {endpoint.consecutive_failures}회")
+            elif success and self._is_slow(endpoint):
+                self._eject(endpoint, f"지연 과다 (EWMA {endpoint.ewma_latency:.2f}s)")
+
+    def _is_slow(self, endpoint):
+        others = [ep.ewma_latency for ep in self.endpoints
+                  if ep is not endpoint and ep.healthy and ep.ewma_latency is not None]
+        if not others or endpoint.latency_samples < 5:
+            return False
+        return endpoint.ewma_latency > self.slow_factor * statistics.median(others)
+
+    def _eject(self, endpoint, reason):
+        # 마지막 남은 건강한 엔드포인트는 제외하지 않음 (전부 제외되면 배정 기준이 사라짐)
+        if sum(1 for ep in self.endpoints if ep.healthy) <= 1:
+            return
+        endpoint.healthy = False
+        endpoint.ejected_until = time.monotonic() + self.eject_cooldown
+        logger.warning(f"엔드포인트 제외: {endpoint.url} ({reason})")
+
+    # --- 헬스 체크 ---
+    def probe(self, endpoint, timeout=None):
+        """/api/version 호출로 생존 여부 확인."""
+        timeout = timeout if timeout is not None else config.ENDPOINT_HEALTH_TIMEOUT
+        try:
+            response = requests.get(f"{endpoint.base_url}/api/version", timeout=timeout)
+            return response.status_code == 200
+        except requests.exceptions.RequestException:
+            return False
+
+    def check_health(self):
+        """모든 엔드포인트 점검: 죽은 엔드포인트 제외, 회복한 엔드포인트 재투입."""
+        now = time.monotonic()
+        for endpoint in self.endpoints:
+            if not endpoint.healthy and now < endpoint.ejected_until:
+                continue  # 제외 유예 시간 동안은 재투입 시도 안 함
+            alive = self.probe(endpoint)
+            with self._lock:
+                if alive and not endpoint.healthy:
+                    endpoint.readmit()  # 지연 통계는 재투입 후 새로 측정
+                    logger.info(f"엔드포인트 재투입: {endpoint.url}")
+                elif not alive and endpoint.healthy:
+                    self._eject(endpoint, "헬스 체크 실패")
+
+    def start_health_checks(self, interval=None):
+        """백그라운드 스레드에서 주기적으로 check_health 실행."""
+        interval = interval or config.ENDPOINT_HEALTH_INTERVAL
+        if self._health_thread is not None:
+            return
+
+        def _loop():
+            while not self._stop_event.wait(interval):
+                try:
+                    self.check_health()
+                except Exception as e:
+                    logger.error(f"엔드포인트 헬스 체크 오류: {e}")
+
+        self._health_thread = threading.Thread(
+            target=_loop, name="ollama-health", daemon=True)
+        self._health_thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def stats(self):
+        """엔드포인트별 통계 (URL -> 통계 딕셔너리)."""
+        with self._lock:
+            return {ep.url: ep.stats() for ep in self.endpoints}
@@ -0,0 +1,314 @@
+# fuzz_core.py
+# 동기/비동기 퍼징 엔진이 함께 사용하는 공통 단계 (LLM 호출, 로그 경로, 로그 항목 구성, 결과 저장)
+import json
+import logging
+import os
+import time
+from datetime import datetime
+
+import config
+from llm_interface import build_generation_options, generate_response, metrics_from_raw
+from judge import IncrementalJudge, LLM_ERROR_VERDICT, simple_judge
+from mutation_rng import rng_for
+from seed_index import get_seed_index
+
+logger = logging.getLogger(__name__)
+
+
+def build_log_paths(model_name, timestamp):
+    """모델명과 타임스탬프로 전체 로그/성공 로그 파일 경로를 만듭니다."""
+    all_log_filepath = os.path.join(
+        config.RESULTS_DIR, f"all_log_{model_name}_{timestamp}.jsonl")
+    success_log_filepath = os.path.join(
+        config.RESULTS_DIR, f"success_log_{model_name}_{timestamp}.json")
+    return all_log_filepath, success_log_filepath
+
+
+def build_run_stats_path(model_name, timestamp):
+    """실행 통계(run_stats.RunStats) 파일 경로."""
+    return os.path.join(config.RESULTS_DIR, f"run_stats_{model_name}_{timestamp}.json")
+
+
+def build_dedup_path(model_name):
+    """모델별 중복 제거 필터(dedup.DedupFilter) 파일 경로 (실행 간 누적되므로 타임스탬프 없음)."""
+    return os.path.join(config.RESULTS_DIR, f"dedup_{model_name}.bloom")
+
+
+def build_scheduler_path(model_name):
+    """모델별 연산자 스케줄러(operator_scheduler.OperatorScheduler) 상태 파일 경로 (실행 간 누적)."""
+    return os.path.join(config.RESULTS_DIR, f"scheduler_{model_name}.json")
+
+
+def timed_generate(model_name, prompt, original_seed_text, timeout=None):
+    """
+    LLM 호출과 소요 시간 측정. config.LLM_STREAM이면 스트리밍으로 생성하며
+    (STREAM_EARLY_ABORT 시) 판정이 확정되는 즉시 생성을 중단합니다.
+    timeout이 None이면 llm_interface의 적응형 타임아웃을 사용합니다.
+    생성 예산 모드(GENERATION_BUDGET_ENABLED)에서는 판정에 필요한 길이만 생성하고,
+    그 응답이 성공으로 판정되면 (GENERATION_ESCALATE_ON_SUCCESS) 길이 제한을 풀어 다시 생성합니다.
+
+    Returns:
+        tuple: (llm_response | None, llm_duration_sec, call_info)
+            call_info: 캐시 적중 여부, 사용한 엔드포인트와 그 지연 통계, 생성 옵션,
+                Ollama 측정값(ollama_metrics: 토큰 수, prefill/decode/적재 시간) (로그 항목에 추가)
+    """
+    harmful_keywords = get_seed_index().harmful_keywords(original_seed_text)
+    stream_judge = None
+    if config.LLM_STREAM and config.STREAM_EARLY_ABORT:
+        stream_judge = IncrementalJudge(
+            original_seed_text, success_confirm_length=config.STREAM_SUCCESS_CONFIRM_LENGTH,
+            harmful_keywords=harmful_keywords)
+
+    cpu_start = time.thread_time()
+    options = build_generation_options(model_name, prompt)
+    call_info = {}
+    if options:
+        call_info["llm_options"] = options
+    llm_start_time = time.time()
+    result = generate_response(
+        model_name, prompt, timeout=timeout,
+        stream=config.LLM_STREAM, stream_judge=stream_judge, call_info=call_info, options=options)
+    results = [result]
+
+    if (config.GENERATION_BUDGET_ENABLED and config.GENERATION_ESCALATE_ON_SUCCESS
+            and result is not None
+            and "SUCCESS" in simple_judge(original_seed_text, result.text, harmful_keywords)):
+        logger.info("짧은 응답이 성공으로 판정되어 길이 제한 없이 재생성합니다.")
+        escalation_options = build_generation_options(model_name, prompt, escalate=True)
+        escalation_info = {}
+        # 긴 생성은 적응형 타임아웃(짧은 생성 기준)에 맞지 않으므로 LLM_TIMEOUT 사용
+        escalated = generate_response(
+            model_name, prompt, timeout=timeout or config.LLM_TIMEOUT,
+            call_info=escalation_info, options=escalation_options)
+        call_info["llm_escalated"] = True
+        if escalated is not None:
+            result = escalated
+            results.append(escalated)
+            call_info.update(escalation_info, llm_options=escalation_options)
+
+    # 재생성한 경우 두 생성의 측정값 합계
+    measured = [r for r in results if r is not None and r.has_metrics()]
+    if measured:
+        call_info["ollama_metrics"] = metrics_from_raw({
+            field: sum(r.raw_metrics()[field] or 0 for r in measured)
+            for field in measured[0].METRIC_FIELDS})
+    llm_response = result.text if result is not None else None
+    # 호출 스레드의 CPU 시간 (요청 구성/응답 파싱 등 클라이언트 측 오버헤드, GPU 대기 제외)
+    call_info["generate_cpu_sec"] = round(time.thread_time() - cpu_start, 6)
+    return llm_response, time.time() - llm_start_time, call_info
+
+
+def timed_mutate(mutator, original_seed_text, dedup_filter=None, key=None):
+    """
+    변형과 그 CPU 시간 측정 (스레드 CPU 시간이므로 다른 스레드의 작업은 포함되지 않음).
+    dedup_filter가 주어지면 중복이 아닌 프롬프트가 나올 때까지 최대 DEDUP_MAX_ATTEMPTS번 변형하고,
+    끝내 중복이면 mutated_prompt를 None으로 반환합니다 (호출자는 LLM 호출 없이 반복을 건너뜀).
+    key(mutation_rng.mutation_key)가 주어지면 시도마다 attempt를 바꾼 키의 난수 생성기로 변형하므로
+    반환된 키만으로 같은 변형을 다시 만들 수 있습니다.
+
+    Returns:
+        tuple: (mutated_prompt, applied_mutation_names, mutate_cpu_sec, mutation_key)
+            mutation_key: 반환된 변형을 만든 키 (key가 없으면 None)
+    """
+    cpu_start = time.thread_time()
+    # 분석기 준비 상태는 반복 단위로 고정 (재시도 도중 준비가 끝나도 키와 변형이 일치하도록)
+    medium = mutator.medium_available()
+    attempts = config.DEDUP_MAX_ATTEMPTS if dedup_filter is not None else 1
+    for attempt in range(max(1, attempts)):
+        attempt_key = dict(key, attempt=attempt, medium=medium) if key is not None else None
+        mutated_prompt, applied_mutation_names = mutator.mutate(
+            original_seed_text, rng=rng_for(attempt_key) if attempt_key is not None else None, medium=medium,
+            ops=key.get("ops") if key is not None else None)
+        if dedup_filter is None or dedup_filter.check(mutated_prompt)[0]:
+            break
+    else:
+        mutated_prompt = None
+    return mutated_prompt, applied_mutation_names, round(time.thread_time() - cpu_start, 6), attempt_key
+
+
+def timed_mutate_batch(mutator, original_seed_text, n, dedup_filter=None, key=None):
+    """
+    한 시드에서 서로 다른 변형 최대 n개 생성과 그 CPU 시간 측정.
+    서로 다른 변형을 하나도 만들지 못하면 원본을 그대로 1개 반환합니다 (이때 mutation_key는 None).
+    dedup_filter가 주어지면 중복 판정된 변형은 빼므로 빈 목록이 될 수 있습니다.
+
+    Returns:
+        tuple: ([(mutated_prompt, applied_mutation_names, mutation_key), ...], 변형 1개당 mutate_cpu_sec)
+    """
+    cpu_start = time.thread_time()
+    mutants = mutator.mutate_batch(original_seed_text, n, key=key) or [(original_seed_text, [], None)]
+    if dedup_filter is not None:
+        mutants = [m for m in mutants if dedup_filter.check(m[0])[0]]
+    return mutants, round((time.thread_time() - cpu_start) / max(1, len(mutants)), 6)
+
+
+def timed_judge(original_seed_text, llm_response):
+    """
+    평가와 그 CPU 시간 측정.
+
+    Returns:
+        tuple: (judgment_result, judge_cpu_sec)
+    """
+    cpu_start = time.thread_time()
+    judgment_result = simple_judge(
+        original_seed_text, llm_response, get_seed_index().harmful_keywords(original_seed_text))
+    return judgment_result, round(time.thread_time() - cpu_start, 6)
+
+
+def apply_seed_feedback(seed_manager, seed_id, judgment_result):
+    """
+    판정 결과를 시드 가중치에 반영. LLM 호출 실패(인프라 문제)는 시드와 무관하므로 반영하지 않음.
+
+    Returns:
+        bool: 성공(SUCCESS) 판정 여부.
+    """
+    is_success = "SUCCESS" in judgment_result
+    if judgment_result == LLM_ERROR_VERDICT:
+        logger.debug(f"LLM 오류로 시드 ID {seed_id} 가중치 업데이트 생략")
+    else:
+        seed_manager.update_weight(seed_id, is_success)
+    return is_success
+
+
+def apply_scheduler_feedback(scheduler, mutation_key, judgment_result, llm_duration):
+    """판정 결과와 LLM 시간을 변형 키의 ops(스케줄러가 고른 연산자)에 반영 (스케줄러가 없으면 무시)."""
+    if scheduler is not None and mutation_key is not None:
+        scheduler.update(mutation_key.get("ops"), judgment_result, llm_duration)
+
+
+def apply_dedup_feedback(dedup_filter, mutated_prompt, judgment_result):
+    """LLM이 응답한 프롬프트만 중복 제거 필터에 기록하고, LLM 호출 실패는 통과 기록을 해제 (필터가 없으면 무시)."""
+    if dedup_filter is None:
+        return
+    if judgment_result == LLM_ERROR_VERDICT:
+        dedup_filter.release(mutated_prompt)
+    else:
+        dedup_filter.commit(mutated_prompt)
+
+
+def get_seed_weight_after(seed_manager, seed_id):
+    """로그 기록용 현재 시드 가중치 (ID 유효성 체크 포함)."""
+    if seed_id < len(seed_manager.seed_pool):
+        return round(seed_manager.seed_pool[seed_id]['weight'], 2)
+    return 'N/A'
+
+
+def build_log_entry(iteration, seed_id, original_seed_text, mutated_prompt,
+                    applied_mutation_names, llm_response, judgment_result,
+                    llm_duration, iteration_duration, model_name, seed_weight_after,
+                    extra_fields=None):
+    """
+    반복 1회의 결과를 all_log_*.jsonl 스키마에 맞는 딕셔너리로 구성합니다.
+    extra_fields(예: timed_generate의 call_info)는 기본 필드 뒤에 추가됩니다.
+    """
+    entry = {
+        "iteration": iteration,
+        "timestamp": datetime.now().isoformat(),
+        "seed_id": seed_id,
+        "original_seed": original_seed_text,
+        "mutated_prompt": mutated_prompt,
+        "applied_mutations": applied_mutation_names,
+        "llm_response": llm_response if llm_response else "N/A",
+        "judgment": judgment_result,
+        "llm_duration_sec": round(llm_duration, 2),
+        "iteration_duration_sec": round(iteration_duration, 2),
+        "model_name": model_name,
+        "seed_weight_after": seed_weight_after,
+    }
+    if extra_fields:
+        entry.update(extra_fields)
+    return entry
+
+
+def save_log_entry(log_filepath, entry_data):
+    """로그 항목을 가독성 좋게 JSON 형식으로 파일에 추가합니다."""
+    try:
+        with open(log_filepath, 'a', encoding='utf-8') as f:
+            # 수정: indent=4 옵션 추가하여 가독성 높임
+            log_string = json.dumps(entry_data, ensure_ascii=False, indent=4)
+            f.write(log_string + '\n')  # 각 JSON 항목 뒤에 줄바꿈 추가
+    except IOError as e:
+        logger.error(f"로그 저장 실패 {log_filepath}: {e}")
+    except TypeError as e:
+        # JSON 직렬화 불가능한 타입이 entry_data에 포함된 경우 처리
+        logger.error(f"로그 데이터 직렬화 오류: {e}")
+        logger.error(f"오류 데이터 (일부): {str(entry_data)[:200]}...")
+        # 오류 발생 시에도 기록 시도 (repr 사용 등)
+        try:
+            import reprlib
+            with open(log_filepath, 'a', encoding='utf-8') as f:
+                f.write(reprlib.repr(entry_data) + '\n')
+        except Exception:
+            pass  # 기록 실패 시 무시
+
+
+class JsonlLogWriter:
+    """
+    all_log 파일을 열어 둔 채로 항목을 추가하는 기록기 (save_log_entry와 같은 형식).
+    항목마다 파일을 열고 닫지 않으므로 기록 전용 스레드(파이프라인 writer 단계)에 적합.
+    """
+
+    def __init__(self, log_filepath):
+        self.log_filepath = log_filepath
+        self._file = open(log_filepath, 'a', encoding='utf-8')
+
+    def write(self, entry_data):
+        try:
+            log_string = json.dumps(entry_data, ensure_ascii=False, indent=4)
+        except TypeError as e:
+            logger.error(f"로그 데이터 직렬화 오류: {e}")
+            import reprlib
+            log_string = reprlib.repr(entry_data)
+        try:
+            self._file.write(log_string + '\n')
+            self._file.flush()  # 중단되어도 기록된 항목은 남도록
+        except IOError as e:
+            logger.error(f"로그 저장 실패 {self.log_filepath}: {e}")
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def load_log_entries(log_filepath):
+    """
+    save_log_entry/JsonlLogWriter 형식(들여쓰기된 JSON 객체의 연속)의 로그 파일을 읽습니다.
+    형식이 깨진 부분(repr 대체 기록 등)을 만나면 거기서 읽기를 멈춥니다.
+
+    Returns:
+        list[dict]: 로그 항목 리스트.
+    """
+    with open(log_filepath, 'r', encoding='utf-8') as f:
+        text = f.read()
+    decoder = json.JSONDecoder()
+    entries, pos = [], 0
+    while True:
+        while pos < len(text) and text[pos].isspace():
+            pos += 1
+        if pos >= len(text):
+            break
+        try:
+            entry, pos = decoder.raw_decode(text, pos)
+        except json.JSONDecodeError as e:
+            logger.warning(f"로그 파싱 중단 ({log_filepath}, 위치 {pos}): {e}")
+            break
+        entries.append(entry)
+    return entries
+
+
+def save_successful_results(results_filepath, successful_prompts):
+    if not successful_prompts:
+        logger.info("저장할 성공 로그 없음.")
+        return
+    try:
+        with open(results_filepath, 'w', encoding='utf-8') as f:
+            json.dump(successful_prompts, f, ensure_ascii=False, indent=4)
+        logger.info(
+            f"성공 로그 {len(successful_prompts)}건 저장 완료: {results_filepath}")
+    except IOError as e:
+        logger.error(f"성공 로그 저장 실패 {results_filepath}: {e}")
@@ -0,0 +1,101 @@
+# hangul.py
+# 한글 음절/자모 변환 (유니코드 산술 + 미리 계산한 표)
+# 완성형 음절 = 0xAC00 + (초성 * 21 + 중성) * 28 + 종성 이므로 외부 라이브러리(jamo) 없이
+# 분해/조합/호환 자모 변환을 할 수 있고, 문자열 전체 변환은 str.translate 한 번으로 처리합니다.
+import re
+
+SYLLABLE_BASE = 0xAC00
+SYLLABLE_COUNT = 11172
+MEDIAL_COUNT = 21
+FINAL_COUNT = 28
+
+# 호환 자모(U+3131~) 기준 초성/중성/종성 목록 (인덱스 = 유니코드 배치 순서)
+INITIALS = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+MEDIALS = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+FINALS = ("",) + tuple("ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ")
+
+INITIAL_INDEX = {j: i for i, j in enumerate(INITIALS)}
+MEDIAL_INDEX = {j: i for i, j in enumerate(MEDIALS)}
+FINAL_INDEX = {j: i for i, j in enumerate(FINALS)}
+
+SYLLABLE_PATTERN = re.compile('[가-힣]')
+_SYLLABLE_WORD_PATTERN = re.compile('[가-힣]+')
+# 호환 자모 초성+중성(+뒤에 중성이 오지 않는 종성) 연속 -> 음절로 재조합할 대상
+_JAMO_SEQUENCE_PATTERN = re.compile(
+    f"([{INITIALS}])([{MEDIALS}])([{''.join(FINALS[1:])}](?![{MEDIALS}]))?")
+
+# 음절 코드포인트 -> 호환 자모 문자열 (예: '한' -> 'ㅎㅏㄴ'), str.translate용
+DECOMPOSE_TABLE = {
+    SYLLABLE_BASE + code: (INITIALS[code // (MEDIAL_COUNT * FINAL_COUNT)]
+                           + MEDIALS[(code // FINAL_COUNT) % MEDIAL_COUNT]
+                           + FINALS[code % FINAL_COUNT])
+    for code in range(SYLLABLE_COUNT)
+}
+
+
+def is_syllable(char):
+    """완성형 한글 음절(가~힣) 한 글자인지."""
+    return '가' <= char <= '힣'
+
+
+def is_syllable_word(text):
+    """비어 있지 않고 모든 글자가 완성형 한글 음절인지."""
+    return _SYLLABLE_WORD_PATTERN.fullmatch(text) is not None
+
+
+def syllable_positions(text):
+    """완성형 한글 음절의 인덱스 목록."""
+    return [m.start() for m in SYLLABLE_PATTERN.finditer(text)]
+
+
+def split_indices(char):
+    """음절 -> (초성, 중성, 종성) 인덱스. 종성 0은 받침 없음."""
+    code = ord(char) - SYLLABLE_BASE
+    if not 0 <= code < SYLLABLE_COUNT:
+        raise ValueError(f"완성형 한글 음절이 아닙니다: {char!r}")
+    return code // (MEDIAL_COUNT * FINAL_COUNT), (code // FINAL_COUNT) % MEDIAL_COUNT, code % FINAL_COUNT
+
+
+def join_indices(initial, medial, final=0):
+    """(초성, 중성, 종성) 인덱스 -> 음절."""
+    return chr(SYLLABLE_BASE + (initial * MEDIAL_COUNT + medial) * FINAL_COUNT + final)
+
+
+def decompose(char):
+    """음절 -> (초성, 중성, 종성) 호환 자모. 받침이 없으면 종성은 ''."""
+    initial, medial, final = split_indices(char)
+    return INITIALS[initial], MEDIALS[medial], FINALS[final]
+
+
+def compose(initial, medial, final=""):
+    """호환 자모 -> 음절. 초성/중성/종성 자리에 올 수 없는 자모면 ValueError."""
+    try:
+        return join_indices(INITIAL_INDEX[initial], MEDIAL_INDEX[medial], FINAL_INDEX[final or ""])
+    except KeyError as e:
+        raise ValueError(f"조합할 수 없는 자모: {e.args[0]!r}") from None
+
+
+def to_compat_jamo(text):
+    """문자열 전체의 음절을 호환 자모로 분해 (음절이 아닌 글자는 그대로)."""
+    return text.translate(DECOMPOSE_TABLE)
+
+
+def recompose(text):
+    """
+    분해된 호환 자모 연속(예: 'ㅎㅏㄴㄱㅡㄹ')을 다시 음절로 조합 (to_compat_jamo의 역변환).
+    종성 후보 뒤에 중성이 오면 다음 음절의 초성으로 봅니다. 조합할 수 없는 자모는 그대로 둡니다.
+    """
+    return _JAMO_SEQUENCE_PATTERN.sub(
+        lambda m: join_indices(INITIAL_INDEX[m.group(1)], MEDIAL_INDEX[m.group(2)],
+                               FINAL_INDEX[m.group(3) or ""]), text)
+
+
+def similar_index_table(similar_map, index):
+    """
+    {자모: [유사 자모, ...]} 를 {자모 인덱스: (유사 자모 인덱스 또는 None, ...)} 로 변환.
+    해당 자리에 올 수 없는 유사 자모는 None (선택되면 변경하지 않음)으로 남겨 선택 확률을 유지합니다.
+    """
+    return {
+        index[jamo_char]: tuple(index.get(candidate) for candidate in candidates)
+        for jamo_char, candidates in similar_map.items() if jamo_char in index
+    }
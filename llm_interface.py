@@ -1,88 +1,573 @@
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import logging # 로깅 추가
+import math
+import threading
+import time
 import config
+from response_cache import ResponseCache
+from endpoint_pool import EndpointPool
+from llm_resilience import (TRANSIENT_ERRORS, backoff_delay, get_circuit_breaker,
+                            get_latency_tracker)
 
 # 로거 설정 (필요에 따라 조정)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Ollama 서버 주소 (기본값)
-OLLAMA_ENDPOINT = "http://localhost:11434/api/generate" 
+# Ollama 서버 주소는 config.OLLAMA_ENDPOINTS (여러 호스트) 에서 설정
 # 타임아웃 설정 (초 단위, 응답이 길어질 수 있으므로 넉넉하게 설정)
 #REQUEST_TIMEOUT = 120 
 
-def get_ollama_response(model_name: str, prompt: str, timeout: int) -> str | None:
+
+class GenerationResult:
     """
-    Ollama API를 호출하여 지정된 모델로부터 프롬프트에 대한 응답을 받아옵니다.
+    생성 결과 텍스트와 Ollama가 최종 응답에 함께 돌려주는 서버 측 측정값.
+    (시간 필드는 Ollama와 같은 나노초 단위, 캐시 적중이나 조기 중단 시에는 측정값이 없음)
+    """
+
+    METRIC_FIELDS = ("eval_count", "eval_duration", "prompt_eval_count",
+                     "prompt_eval_duration", "load_duration", "total_duration")
+
+    def __init__(self, text, model_name=None, cached=False, aborted=False, **metrics):
+        self.text = text
+        self.model_name = model_name
+        self.cached = cached
+        self.aborted = aborted  # 스트리밍 조기 중단 (일부 응답)
+        for field in self.METRIC_FIELDS:
+            setattr(self, field, metrics.get(field))
+
+    @classmethod
+    def from_response(cls, text, final_part, model_name=None, aborted=False):
+        """Ollama 최종 응답(JSON) 딕셔너리에서 측정값을 추출."""
+        metrics = {field: final_part.get(field) for field in cls.METRIC_FIELDS} if final_part else {}
+        return cls(text, model_name=model_name, aborted=aborted, **metrics)
+
+    def has_metrics(self):
+        return self.eval_count is not None
+
+    def metrics(self):
+        """
+        로그 항목용 측정값 딕셔너리 (시간은 초 단위).
+        decode_tokens_per_sec: 생성 속도, prefill_tokens_per_sec: 프롬프트 처리 속도.
+        """
+        if not self.has_metrics():
+            return None
+        return metrics_from_raw(self.raw_metrics())
+
+    def raw_metrics(self):
+        """Ollama 원시 측정값 (나노초 단위)."""
+        return {field: getattr(self, field) for field in self.METRIC_FIELDS}
+
+
+def _ns_to_sec(value):
+    return round(value / 1e9, 4) if value is not None else None
+
+
+def _rate(count, duration_ns):
+    return round(count / (duration_ns / 1e9), 2) if count and duration_ns else None
+
+
+def metrics_from_raw(raw):
+    """Ollama 원시 측정값(나노초)을 로그용 딕셔너리로 변환 (여러 생성의 합계에도 사용)."""
+    return {
+        "eval_count": raw.get("eval_count"),
+        "prompt_eval_count": raw.get("prompt_eval_count"),
+        "eval_duration_sec": _ns_to_sec(raw.get("eval_duration")),
+        "prompt_eval_duration_sec": _ns_to_sec(raw.get("prompt_eval_duration")),
+        "load_duration_sec": _ns_to_sec(raw.get("load_duration")),
+        "total_duration_sec": _ns_to_sec(raw.get("total_duration")),
+        "decode_tokens_per_sec": _rate(raw.get("eval_count"), raw.get("eval_duration")),
+        "prefill_tokens_per_sec": _rate(raw.get("prompt_eval_count"), raw.get("prompt_eval_duration")),
+    }
+
+
+class OllamaClient:
+    """
+    Ollama /api/generate 호출용 재사용 클라이언트.
+    requests.Session 하나에 연결 풀(keep-alive)을 유지하고, 요청 본문의 고정 부분을
+    모델별로 미리 인코딩해 두어 매 반복마다 TCP 연결/헤더/JSON을 다시 만들지 않습니다.
+    스레드 간 공유 가능 (동기 루프와 async 엔진의 실행기 스레드 모두 같은 인스턴스 사용).
+    엔드포인트가 여러 개면 EndpointPool이 요청마다 호스트를 배정합니다.
+    """
+
+    def __init__(self, endpoints=None, pool_size=None):
+        """
+        Args:
+            endpoints (str | list[str]): /api/generate URL (목록). None이면 config.OLLAMA_ENDPOINTS.
+            pool_size (int): 호스트당 유지할 최대 keep-alive 연결 수. None이면 config.OLLAMA_POOL_SIZE.
+        """
+        if isinstance(endpoints, str):
+            endpoints = [endpoints]
+        self.endpoints = list(endpoints or config.OLLAMA_ENDPOINTS)
+        self.pool_size = max(1, pool_size or config.OLLAMA_POOL_SIZE)
+        self.endpoint_pool = EndpointPool(self.endpoints)
+        if len(self.endpoints) > 1:
+            self.endpoint_pool.start_health_checks()
+
+        self.session = requests.Session()
+        # pool_block=True: 풀 크기 이상의 동시 요청은 새 연결을 만들지 않고 빈 연결을 기다림
+        adapter = HTTPAdapter(pool_connections=len(self.endpoints), pool_maxsize=self.pool_size,
+                              pool_block=True, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            'Content-Type': 'application/json',
+            'Connection': 'keep-alive',
+        })
+
+        # (model, stream, options, keep_alive) -> 미리 인코딩된 요청 본문 앞부분 (prompt 직전까지)
+        self._body_prefixes = {}
+        self._prefix_lock = threading.Lock()
+
+    def _body_prefix(self, model_name, stream, options=None):
+        options_key = json.dumps(options, sort_keys=True) if options else None
+        keep_alive = config.OLLAMA_KEEP_ALIVE
+        key = (model_name, stream, options_key, keep_alive)
+        prefix = self._body_prefixes.get(key)
+        if prefix is None:
+            body = {"model": model_name, "stream": stream}
+            if options:
+                body["options"] = options
+            if keep_alive is not None:
+                body["keep_alive"] = keep_alive
+            template = json.dumps(body)
+            # '{"model": ..., "stream": ...}' 의 닫는 괄호를 떼고 prompt 필드를 이어 붙일 수 있게 함
+            prefix = (template[:-1] + ', "prompt": ').encode('utf-8')
+            with self._prefix_lock:
+                self._body_prefixes[key] = prefix
+        return prefix
+
+    def build_request_body(self, model_name, prompt, stream=False, options=None):
+        """요청 본문(bytes) 생성: 고정 부분은 캐시된 템플릿, prompt만 매번 인코딩."""
+        return (self._body_prefix(model_name, stream, options)
+                + json.dumps(prompt).encode('utf-8') + b'}')
+
+    def _dispatch(self, request_func, call_info, *args, **kwargs):
+        """
+        엔드포인트를 배정받아 요청을 실행하고, 결과(성공 여부/지연)를 풀에 반영.
+        request_func는 (응답 텍스트 | None, 오류 종류 | None)을 반환.
+        """
+        endpoint = self.endpoint_pool.acquire()
+        start_time = time.monotonic()
+        llm_answer, error_kind = None, "unexpected"
+        try:
+            llm_answer, error_kind = request_func(endpoint.url, *args, **kwargs)
+            return llm_answer
+        finally:
+            self.endpoint_pool.release(
+                endpoint, time.monotonic() - start_time, llm_answer is not None)
+            if call_info is not None:
+                call_info["llm_endpoint"] = endpoint.url
+                call_info["llm_endpoint_stats"] = endpoint.stats()
+                if error_kind is not None:
+                    call_info["llm_error"] = error_kind
+
+    def generate(self, model_name: str, prompt: str, timeout: int = None,
+                 call_info: dict = None, options: dict = None) -> GenerationResult | None:
+        """
+        프롬프트에 대한 전체 응답을 한 번에 받아옵니다 ("stream": False).
+
+        Args:
+            call_info (dict): 주어지면 사용한 엔드포인트와 그 통계, 오류 종류를 기록.
+            options (dict): Ollama 생성 옵션 (num_predict, num_ctx 등).
+
+        Returns:
+            GenerationResult | None: 응답 텍스트와 서버 측 측정값. 오류 발생 시 None 반환.
+        """
+        return self._dispatch(self._generate, call_info, model_name, prompt, timeout, options)
+
+    def _generate(self, url, model_name, prompt, timeout, options):
+        effective_timeout = timeout if timeout is not None else config.LLM_TIMEOUT
+
+        logger.info(
+            f"Ollama 모델에 요청 전송: {model_name} @ {url} (Timeout: {effective_timeout}s)")
+        logger.debug(f"프롬프트 (일부): {prompt[:80]}...")
+
+        try:
+            # Ollama API에 POST 요청 보내기 (풀에 있는 keep-alive 연결 재사용)
+            response = self.session.post(
+                url,
+                data=self.build_request_body(model_name, prompt, stream=False, options=options),
+                timeout=effective_timeout
+            )
+
+            # HTTP 오류 코드 확인 (4xx, 5xx)
+            response.raise_for_status()
+
+        except requests.exceptions.Timeout:
+            logger.error(f"Ollama request timed out after {effective_timeout} seconds.")
+            return None, "timeout"
+        except requests.exceptions.ConnectionError:
+            logger.error("Could not connect to Ollama server. Is Ollama running?")
+            return None, "connection"
+        except requests.exceptions.HTTPError as e:
+            logger.error(f"Ollama returned an HTTP error: {e}")
+            status_code = e.response.status_code if e.response is not None else 500
+            return None, "http_5xx" if status_code >= 500 else "http_4xx"
+        except requests.exceptions.RequestException as e:
+            logger.error(f"An error occurred during the Ollama request: {e}")
+            return None, "request"
+
+        logger.info(f"Received response from Ollama (status code: {response.status_code})")
+
+        try:
+            # 응답 JSON 파싱
+            result = response.json()
+
+            # 응답 데이터 구조에서 실제 응답 텍스트 추출
+            if 'response' in result:
+                llm_answer = result['response'].strip()
+                logger.debug(f"Ollama Response: {llm_answer[:100]}...") # 디버깅 시 응답 일부 로깅
+                return GenerationResult.from_response(llm_answer, result, model_name), None
+            else:
+                logger.error(f"Ollama response does not contain 'response' key: {result}")
+                return None, "bad_response"
+
+        except json.JSONDecodeError:
+            logger.error(f"Failed to decode JSON response from Ollama: {response.text}")
+            return None, "bad_response"
+        except Exception as e:
+            logger.error(f"An unexpected error occurred processing Ollama response: {e}")
+            return None, "bad_response"
+
+    def generate_stream(self, model_name: str, prompt: str, timeout: int = None,
+                        judge=None, call_info: dict = None,
+                        options: dict = None) -> GenerationResult | None:
+        """
+        스트리밍 모드("stream": True)로 토큰을 받아오며, judge(IncrementalJudge)가
+        판정을 확정하면 즉시 연결을 끊어 Ollama 쪽 생성을 중단시킵니다.
+
+        Args:
+            judge: feed(chunk) -> 확정 판정 | None 인터페이스를 가진 객체. None이면 끝까지 수신.
+
+        Returns:
+            GenerationResult | None: 수신한 (조기 중단 시 일부) 응답 텍스트와 서버 측 측정값
+                (조기 중단 시에는 측정값 없음). 오류 발생 시 None 반환.
+        """
+        return self._dispatch(
+            self._generate_stream, call_info, model_name, prompt, timeout, judge, options)
+
+    def _generate_stream(self, url, model_name, prompt, timeout, judge, options):
+        effective_timeout = timeout if timeout is not None else config.LLM_TIMEOUT
+        # requests의 timeout은 읽기 간격 기준이므로 전체 생성 시간 제한은 직접 확인
+        deadline = time.monotonic() + effective_timeout
+
+        logger.info(
+            f"Ollama 모델에 스트리밍 요청 전송: {model_name} @ {url} (Timeout: {effective_timeout}s)")
+        logger.debug(f"프롬프트 (일부): {prompt[:80]}...")
+
+        chunks = []
+        final_part, aborted = None, False
+        try:
+            with self.session.post(
+                url,
+                data=self.build_request_body(model_name, prompt, stream=True, options=options),
+                timeout=effective_timeout,
+                stream=True,
+            ) as response:
+                response.raise_for_status()
+
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    part = json.loads(line)
+                    if 'error' in part:
+                        logger.error(f"Ollama streaming error: {part['error']}")
+                        return None, "bad_response"
+
+                    token = part.get('response', '')
+                    chunks.append(token)
+                    if judge is not None and judge.feed(token) is not None:
+                        # with 블록을 벗어나면 연결이 닫히고 Ollama가 생성을 취소함
+                        logger.info(
+                            f"스트리밍 조기 중단: {judge.verdict} ({sum(map(len, chunks))}자 수신)")
+                        aborted = True
+                        break
+                    if part.get('done'):
+                        final_part = part  # 마지막 청크에 측정값이 담겨 옴
+                        break
+                    if time.monotonic() > deadline:
+                        logger.error(f"Ollama streaming request exceeded {effective_timeout} seconds.")
+                        return None, "timeout"
+
+        except requests.exceptions.Timeout:
+            logger.error(f"Ollama request timed out after {effective_timeout} seconds.")
+            return None, "timeout"
+        except requests.exceptions.ConnectionError:
+            logger.error("Could not connect to Ollama server. Is Ollama running?")
+            return None, "connection"
+        except requests.exceptions.HTTPError as e:
+            logger.error(f"Ollama returned an HTTP error: {e}")
+            status_code = e.response.status_code if e.response is not None else 500
+            return None, "http_5xx" if status_code >= 500 else "http_4xx"
+        except requests.exceptions.RequestException as e:
+            logger.error(f"An error occurred during the Ollama request: {e}")
+            return None, "request"
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to decode streaming JSON chunk from Ollama: {e}")
+            return None, "bad_response"
+
+        llm_answer = "".join(chunks).strip()
+        logger.debug(f"Ollama Response: {llm_answer[:100]}...")
+        return GenerationResult.from_response(llm_answer, final_part, model_name, aborted), None
+
+    def preload(self, model_name, timeout=None):
+        """
+        prompt 없는 요청으로 모든 엔드포인트에 모델을 미리 적재 (keep_alive 적용).
+        모델 적재 시간이 첫 생성 요청의 지연으로 잡히지 않게 합니다.
+
+        Returns:
+            float: 적재에 걸린 시간(초, 가장 느린 엔드포인트 기준).
+        """
+        timeout = timeout if timeout is not None else config.LLM_TIMEOUT
+        body = {"model": model_name}
+        if config.OLLAMA_KEEP_ALIVE is not None:
+            body["keep_alive"] = config.OLLAMA_KEEP_ALIVE
+        data = json.dumps(body).encode('utf-8')
+        start_time = time.monotonic()
+        for url in self.endpoints:
+            try:
+                response = self.session.post(url, data=data, timeout=timeout)
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"모델 사전 적재 실패: {model_name} @ {url} ({e})")
+        return time.monotonic() - start_time
+
+    def close(self):
+        self.endpoint_pool.stop()
+        self.session.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> OllamaClient:
+    """프로세스 전체에서 공유하는 기본 클라이언트 (최초 호출 시 생성)."""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                # async 엔진의 동시 요청 수보다 풀이 작으면 연결 대기가 생기므로 둘 중 큰 값 사용
+                pool_size = max(config.OLLAMA_POOL_SIZE, config.MAX_IN_FLIGHT)
+                _default_client = OllamaClient(pool_size=pool_size)
+    return _default_client
+
+
+def reset_default_client():
+    """설정 변경(엔드포인트, 풀 크기 등) 후 기본 클라이언트를 다시 만들도록 초기화."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is not None:
+            _default_client.close()
+        _default_client = None
+
+
+_response_cache = None
+_response_cache_failed = False  # 초기화에 실패했으면 이후 호출에서 다시 열지 않음 (오류 로그도 한 번만)
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache | None:
+    """공유 응답 캐시 (config.RESPONSE_CACHE_ENABLED가 False이거나 초기화에 실패했으면 None)."""
+    global _response_cache, _response_cache_failed
+    if not config.RESPONSE_CACHE_ENABLED:
+        return None
+    if _response_cache is None and not _response_cache_failed:
+        with _response_cache_lock:
+            if _response_cache is None and not _response_cache_failed:
+                try:
+                    _response_cache = ResponseCache(config.RESPONSE_CACHE_PATH)
+                except Exception as e:
+                    _response_cache_failed = True
+                    logger.error(f"응답 캐시 초기화 실패 ({config.RESPONSE_CACHE_PATH}): {e}. 캐시 없이 진행.")
+                    return None
+    return _response_cache
+
+
+def _cache_options(stream, stream_judge, options):
+    """캐시 키에 들어갈 생성 옵션. 조기 중단된 (일부) 응답은 전체 응답과 다른 키를 사용."""
+    # num_ctx는 응답 내용과 무관하고 실행 중 커질 수 있으므로 키에서 제외
+    cache_options = {k: v for k, v in (options or {}).items() if k != "num_ctx"}
+    if stream and stream_judge is not None:
+        cache_options["early_abort_confirm_length"] = stream_judge.success_confirm_length
+    return cache_options
+
+
+# 모델별로 지금까지 사용한 가장 큰 num_ctx (num_ctx가 바뀌면 Ollama가 모델을 다시 로드하므로
+# 프롬프트마다 줄였다 늘렸다 하지 않고 증가만 허용)
+_num_ctx_high_water = {}
+_num_ctx_lock = threading.Lock()
+
+
+def build_generation_options(model_name, prompt, escalate=False):
+    """
+    생성 예산 모드(config.GENERATION_BUDGET_ENABLED)의 Ollama 옵션 구성.
+    - num_predict: 판정에 필요한 글자 수(JUDGE_MIN_SUCCESS_LENGTH, GENERATION_BUDGET_CHARS 중 큰 값)를
+      토큰 수로 환산. escalate=True면 GENERATION_ESCALATION_NUM_PREDICT.
+    - num_ctx: 프롬프트 추정 토큰 수 + num_predict 를 담는 2의 거듭제곱 (모델별로 증가만 함).
+
+    Returns:
+        dict | None: 옵션 딕셔너리. 예산 모드가 꺼져 있으면 GENERATION_OPTIONS (비어 있으면 None).
+    """
+    options = dict(config.GENERATION_OPTIONS)
+    if not config.GENERATION_BUDGET_ENABLED:
+        return options or None
+
+    if escalate:
+        num_predict = config.GENERATION_ESCALATION_NUM_PREDICT
+    else:
+        budget_chars = max(config.JUDGE_MIN_SUCCESS_LENGTH, config.GENERATION_BUDGET_CHARS)
+        num_predict = math.ceil(budget_chars / config.GENERATION_CHARS_PER_TOKEN)
+    options["num_predict"] = num_predict
+
+    prompt_tokens = math.ceil(len(prompt) / config.GENERATION_CHARS_PER_TOKEN)
+    needed_ctx = prompt_tokens + max(num_predict, 0) + config.GENERATION_CTX_MARGIN
+    num_ctx = max(config.GENERATION_MIN_NUM_CTX, 1 << (needed_ctx - 1).bit_length())
+    with _num_ctx_lock:
+        num_ctx = max(num_ctx, _num_ctx_high_water.get(model_name, 0))
+        _num_ctx_high_water[model_name] = num_ctx
+    options["num_ctx"] = num_ctx
+    return options
+
+
+def _wait_for_circuit(breaker):
+    """
+    서킷이 열려 있으면 시험 요청이 허용될 때까지 대기 (CIRCUIT_OPEN_POLICY="wait").
+    "fail" 정책이면 대기하지 않고 False 반환.
+    """
+    warned = False
+    while not breaker.allow_request():
+        if config.CIRCUIT_OPEN_POLICY == "fail":
+            return False
+        if not warned:
+            logger.warning(
+                f"서킷 브레이커 open: {breaker.name} - {breaker.retry_after():.0f}초 후 시험 요청까지 대기")
+            warned = True
+        time.sleep(min(max(breaker.retry_after(), 0.1), 5.0))
+    return True
+
+
+def _generate_with_retries(client, model_name, prompt, timeout, stream, stream_judge,
+                           options, call_info):
+    """
+    일시적 오류(타임아웃/연결/5xx)는 지터 포함 지수 백오프로 최대 LLM_MAX_RETRIES회 재시도.
+    타임아웃으로 실패한 경우 다음 시도의 타임아웃은 두 배(최대 LLM_TIMEOUT)로 늘림.
+    적응형 타임아웃으로 성공한 (조기 중단되지 않은) 응답의 지연은 적응형 타임아웃 계산에 사용.
+    """
+    tracker = get_latency_tracker()
+    breaker = get_circuit_breaker(model_name)
+    effective_timeout = timeout if timeout is not None else tracker.timeout_for(model_name)
+
+    result = None
+    for attempt in range(config.LLM_MAX_RETRIES + 1):
+        if not _wait_for_circuit(breaker):
+            logger.error(f"서킷 브레이커 open 상태로 요청 생략: {model_name}")
+            call_info["llm_error"] = "circuit_open"
+            break
+
+        call_info.pop("llm_error", None)
+        if stream_judge is not None:
+            stream_judge.reset()  # 판정은 이번 시도의 응답만으로
+        call_info["llm_attempts"] = attempt + 1
+        call_info["llm_timeout_sec"] = round(effective_timeout, 2)
+        start_time = time.monotonic()
+        # 모든 요청(특히 half-open 시험 요청)의 결과를 브레이커에 기록: 예외로 빠져나가면 실패로 기록
+        outcome_recorded = False
+        try:
+            if stream:
+                result = client.generate_stream(
+                    model_name, prompt, effective_timeout, judge=stream_judge,
+                    call_info=call_info, options=options)
+            else:
+                result = client.generate(
+                    model_name, prompt, effective_timeout, call_info=call_info, options=options)
+            error_kind = call_info.get("llm_error") if result is None else None
+            if error_kind in TRANSIENT_ERRORS:
+                breaker.record_failure()
+            else:
+                breaker.record_success()  # 4xx, 잘못된 응답도 서버에 도달했다는 뜻
+            outcome_recorded = True
+        finally:
+            if not outcome_recorded:
+                breaker.record_failure()
+
+        if result is not None:
+            # 타임아웃을 직접 지정한 호출(예: 생성 예산 재생성)은 지연 분포가 달라 표본에서 제외
+            if timeout is None and not result.aborted:
+                tracker.record(model_name, time.monotonic() - start_time)
+            break
+        if error_kind not in TRANSIENT_ERRORS:
+            break  # 4xx, 잘못된 응답 등은 재시도해도 같은 결과
+        if attempt < config.LLM_MAX_RETRIES:
+            if error_kind == "timeout":
+                effective_timeout = min(config.LLM_TIMEOUT, effective_timeout * 2)
+            delay = backoff_delay(attempt)
+            logger.warning(
+                f"LLM 요청 실패 ({error_kind}), {delay:.1f}초 후 재시도 ({attempt + 1}/{config.LLM_MAX_RETRIES})")
+            time.sleep(delay)
+    return result
+
+
+def generate_response(model_name: str, prompt: str, timeout: int = None,
+                      client: OllamaClient = None, stream: bool = False,
+                      stream_judge=None, use_cache: bool = None,
+                      call_info: dict = None, options: dict = None) -> GenerationResult | None:
+    """
+    Ollama API를 호출하여 지정된 모델로부터 프롬프트에 대한 응답과 서버 측 측정값을 받아옵니다.
 
     Args:
         model_name (str): 사용할 Ollama 모델 이름 (예: "cogito").
         prompt (str): LLM에게 전달할 프롬프트 텍스트.
+        timeout (int): 요청 타임아웃(초). None이면 관측 지연 기반 적응형 타임아웃
+            (표본이 부족하거나 ADAPTIVE_TIMEOUT_ENABLED=False면 config.LLM_TIMEOUT).
+        client (OllamaClient): 사용할 클라이언트. None이면 공유 기본 클라이언트.
+        stream (bool): True면 스트리밍 모드로 생성 (config.LLM_STREAM).
+        stream_judge (IncrementalJudge): 스트리밍 중 판정이 확정되는 즉시 생성을 중단.
+        use_cache (bool): 응답 캐시 사용 여부. None이면 config.RESPONSE_CACHE_ENABLED.
+        call_info (dict): 주어지면 캐시 적중 여부, 사용한 엔드포인트와 그 지연 통계,
+            시도 횟수, 오류 종류를 기록.
+        options (dict): Ollama 생성 옵션 (build_generation_options 참고). 캐시 키에도 포함.
 
     Returns:
-        str | None: LLM의 응답 텍스트. 오류 발생 시 None 반환.
+        GenerationResult | None: 응답 텍스트와 측정값 (캐시 적중 시 cached=True, 측정값 없음).
+            (재시도 후에도) 오류 발생 시 None 반환.
     """
-    headers = {'Content-Type': 'application/json'}
-    # Ollama /api/generate 요청 본문 구성
-    data = {
-        "model": model_name,
-        "prompt": prompt,
-        "stream": False, # 스트리밍 응답 대신 전체 응답을 한 번에 받음
-        # "options": { # 필요시 추가 옵션 설정 가능
-        #     "temperature": 0.7,
-        #     "num_predict": 512 # 최대 생성 토큰 수 등
-        # }
-    }
-    effective_timeout = timeout if timeout is not None else config.LLM_TIMEOUT
-
-    logger.info(
-        f"Ollama 모델에 요청 전송: {model_name} (Timeout: {effective_timeout}s)")
-    logger.debug(f"프롬프트 (일부): {prompt[:80]}...")
-
-    try:
-        # Ollama API에 POST 요청 보내기
-        response = requests.post(
-            OLLAMA_ENDPOINT,
-            headers=headers,
-            data=json.dumps(data), # 데이터를 JSON 문자열로 변환
-            timeout=effective_timeout 
-        )
-        
-        # HTTP 오류 코드 확인 (4xx, 5xx)
-        response.raise_for_status() 
-
-    except requests.exceptions.Timeout:
-        logger.error(f"Ollama request timed out after {effective_timeout} seconds.")
-        return None
-    except requests.exceptions.ConnectionError:
-        logger.error("Could not connect to Ollama server. Is Ollama running?")
-        return None
-    except requests.exceptions.RequestException as e:
-        logger.error(f"An error occurred during the Ollama request: {e}")
-        return None
+    cache = get_response_cache() if use_cache is not False else None
+    if cache is not None:
+        cache_options = _cache_options(stream, stream_judge, options)
+        cached_response = cache.get(model_name, prompt, cache_options)
+        if call_info is not None:
+            call_info["llm_cache_hit"] = cached_response is not None
+        if cached_response is not None:
+            logger.info(f"응답 캐시 적중: {model_name} (프롬프트 일부: {prompt[:30]}...)")
+            return GenerationResult(cached_response, model_name=model_name, cached=True)
 
-    logger.info(f"Received response from Ollama (status code: {response.status_code})")
+    client = client or get_default_client()
+    result = _generate_with_retries(
+        client, model_name, prompt, timeout, stream, stream_judge, options,
+        call_info if call_info is not None else {})
 
-    try:
-        # 응답 JSON 파싱
-        result = response.json()
-        
-        # 응답 데이터 구조에서 실제 응답 텍스트 추출
-        if 'response' in result:
-            llm_answer = result['response'].strip()
-            logger.debug(f"Ollama Response: {llm_answer[:100]}...") # 디버깅 시 응답 일부 로깅
-            return llm_answer
-        else:
-            logger.error(f"Ollama response does not contain 'response' key: {result}")
-            return None
+    if cache is not None and result is not None:
+        cache.put(model_name, prompt, result.text, cache_options)
+    return result
 
-    except json.JSONDecodeError:
-        logger.error(f"Failed to decode JSON response from Ollama: {response.text}")
-        return None
-    except Exception as e:
-        logger.error(f"An unexpected error occurred processing Ollama response: {e}")
-        return None
+
+def get_ollama_response(model_name: str, prompt: str, timeout: int = None,
+                        client: OllamaClient = None, stream: bool = False,
+                        stream_judge=None, use_cache: bool = None,
+                        call_info: dict = None, options: dict = None) -> str | None:
+    """
+    Ollama API를 호출하여 지정된 모델로부터 프롬프트에 대한 응답을 받아옵니다.
+    인자는 generate_response와 같으며, 응답 텍스트만 필요할 때 사용합니다.
+
+    Returns:
+        str | None: LLM의 응답 텍스트. (재시도 후에도) 오류 발생 시 None 반환.
+    """
+    result = generate_response(model_name, prompt, timeout, client, stream, stream_judge,
+                               use_cache, call_info, options)
+    return result.text if result is not None else None
 
 # --- 모듈 테스트용 코드 ---
 if __name__ == '__main__':
@@ -0,0 +1,147 @@
+# llm_resilience.py
+# LLM 호출 안정화: 관측 지연 기반 적응형 타임아웃, 지터 포함 재시도 백오프, 서킷 브레이커
+import collections
+import logging
+import random
+import threading
+import time
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# 재시도할 가치가 있는 일시적 오류 종류 (OllamaClient가 call_info["llm_error"]에 기록)
+TRANSIENT_ERRORS = {"timeout", "connection", "http_5xx"}
+
+
+def percentile(sorted_values, percent):
+    """정렬된 리스트의 백분위수 (최근접 순위 방식)."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(percent / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+class LatencyTracker:
+    """모델별 최근 성공 응답 지연을 보관하고 그 백분위수로 타임아웃을 계산."""
+
+    def __init__(self, window=None):
+        self.window = window or config.LATENCY_WINDOW
+        self._samples = collections.defaultdict(lambda: collections.deque(maxlen=self.window))
+        self._lock = threading.Lock()
+
+    def record(self, model_name, latency):
+        with self._lock:
+            self._samples[model_name].append(latency)
+
+    def percentile(self, model_name, percent):
+        with self._lock:
+            samples = sorted(self._samples[model_name])
+        return percentile(samples, percent)
+
+    def timeout_for(self, model_name):
+        """
+        적응형 타임아웃 = p(ADAPTIVE_TIMEOUT_PERCENTILE) × ADAPTIVE_TIMEOUT_MULTIPLIER,
+        [ADAPTIVE_TIMEOUT_MIN, LLM_TIMEOUT] 범위로 제한. 표본이 부족하면 LLM_TIMEOUT.
+        """
+        with self._lock:
+            samples = self._samples.get(model_name)
+            n_samples = len(samples) if samples else 0
+        if not config.ADAPTIVE_TIMEOUT_ENABLED or n_samples < config.ADAPTIVE_TIMEOUT_MIN_SAMPLES:
+            return config.LLM_TIMEOUT
+        p = self.percentile(model_name, config.ADAPTIVE_TIMEOUT_PERCENTILE)
+        timeout = p * config.ADAPTIVE_TIMEOUT_MULTIPLIER
+        return max(config.ADAPTIVE_TIMEOUT_MIN, min(config.LLM_TIMEOUT, timeout))
+
+
+def backoff_delay(attempt, base=None, cap=None):
+    """지수 백오프 + full jitter: [0, min(cap, base * 2^attempt)] 범위의 무작위 대기 시간."""
+    base = base if base is not None else config.RETRY_BACKOFF_BASE
+    cap = cap if cap is not None else config.RETRY_BACKOFF_MAX
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    연속된 인프라 오류가 임계치에 도달하면 열림(open) 상태가 되어 reset_timeout 동안 요청을 막고,
+    이후 한 건의 시험 요청(half-open)이 성공하면 다시 닫힘(closed) 상태로 돌아갑니다.
+    시험 요청이 probe_timeout 안에 결과를 기록하지 않으면 다시 열림 상태가 되어 대기가 무한히 이어지지 않습니다.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name, failure_threshold=None, reset_timeout=None, probe_timeout=None):
+        self.name = name
+        self.failure_threshold = failure_threshold or config.CIRCUIT_FAILURE_THRESHOLD
+        self.reset_timeout = reset_timeout if reset_timeout is not None else config.CIRCUIT_RESET_TIMEOUT
+        self.probe_timeout = probe_timeout if probe_timeout is not None else config.CIRCUIT_PROBE_TIMEOUT
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probe_started_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        """지금 요청을 보내도 되는지 여부 (open 유예가 끝나면 시험 요청 한 건만 허용)."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            now = time.monotonic()
+            if self.state == self.HALF_OPEN and now - self.probe_started_at >= self.probe_timeout:
+                # 결과를 기록하지 않은 채 오래 걸리는 시험 요청은 실패로 보고 다시 open
+                logger.warning(f"서킷 브레이커 open: {self.name} (시험 요청이 {self.probe_timeout}초 안에 끝나지 않음)")
+                self.state = self.OPEN
+                self.opened_at = now
+                return False
+            if self.state == self.OPEN and now - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self.probe_started_at = now
+                logger.info(f"서킷 브레이커 half-open: {self.name} (시험 요청 허용)")
+                return True
+            return False
+
+    def retry_after(self):
+        """요청이 다시 허용될 때까지(half-open이면 시험 요청 제한 시간까지) 남은 시간(초)."""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.OPEN:
+                return max(0.0, self.reset_timeout - (now - self.opened_at))
+            if self.state == self.HALF_OPEN:
+                return max(0.0, self.probe_timeout - (now - self.probe_started_at))
+            return 0.0
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"서킷 브레이커 closed: {self.name}")
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(
+                        f"서킷 브레이커 open: {self.name} (연속 오류 {self.consecutive_failures}회, "
+                        f"{self.reset_timeout}초간 요청 차단)")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+_latency_tracker = LatencyTracker()
+_circuit_breakers = {}
+_circuit_breakers_lock = threading.Lock()
+
+
+def get_latency_tracker():
+    return _latency_tracker
+
+
+def get_circuit_breaker(model_name):
+    """모델별 서킷 브레이커 (최초 호출 시 생성)."""
+    with _circuit_breakers_lock:
+        breaker = _circuit_breakers.get(model_name)
+        if breaker is None:
+            breaker = _circuit_breakers[model_name] = CircuitBreaker(model_name)
+        return breaker
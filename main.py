@@ -2,85 +2,40 @@
 import random
 import logging
 import time
-import json
 from datetime import datetime
 import os
 
 # 설정 및 모듈 임포트
 import config
 from seed_manager import SeedManager
+from seed_index import prepare_seed_index
 from mutator import KoreanMutator
-from llm_interface import get_ollama_response
-from judge import simple_judge  # 수정된 judge 임포트
+from run_stats import RunStats
+from dedup import DedupFilter
+from mutation_rng import mutation_key, new_run_seed
+from mutation_service import start_mutation_service
+from operator_scheduler import build_scheduler
+from fuzz_core import (build_dedup_path, build_log_paths, build_run_stats_path, build_scheduler_path, build_log_entry,
+                       get_seed_weight_after, timed_generate, timed_mutate, timed_judge, apply_seed_feedback,
+                       apply_scheduler_feedback, apply_dedup_feedback, save_log_entry, save_successful_results)
 
 # 로깅 설정
 logging.basicConfig(level=config.LOG_LEVEL, format=config.LOG_FORMAT)
 logger = logging.getLogger("FuzzerMain")  # 로거 이름 지정
 
-# --- 결과 저장 함수 정의 ---
-
-
-def save_log_entry(log_filepath, entry_data):
-    """로그 항목을 가독성 좋게 JSON 형식으로 파일에 추가합니다."""
-    try:
-        with open(log_filepath, 'a', encoding='utf-8') as f:
-            # 수정: indent=4 옵션 추가하여 가독성 높임
-            log_string = json.dumps(entry_data, ensure_ascii=False, indent=4)
-            f.write(log_string + '\n')  # 각 JSON 항목 뒤에 줄바꿈 추가
-    except IOError as e:
-        logger.error(f"로그 저장 실패 {log_filepath}: {e}")
-    except TypeError as e:
-        # JSON 직렬화 불가능한 타입이 entry_data에 포함된 경우 처리
-        logger.error(f"로그 데이터 직렬화 오류: {e}")
-        logger.error(f"오류 데이터 (일부): {str(entry_data)[:200]}...")
-        # 오류 발생 시에도 기록 시도 (repr 사용 등)
-        try:
-            import reprlib
-            f.write(reprlib.repr(entry_data) + '\n')
-        except:
-            pass  # 기록 실패 시 무시
-
-
-def save_successful_results(results_filepath, successful_prompts):
-    if not successful_prompts:
-        logger.info("저장할 성공 로그 없음.")
-        return
-    try:
-        with open(results_filepath, 'w', encoding='utf-8') as f:
-            json.dump(successful_prompts, f, ensure_ascii=False, indent=4)
-        logger.info(
-            f"성공 로그 {len(successful_prompts)}건 저장 완료: {results_filepath}")
-    except IOError as e:
-        logger.error(f"성공 로그 저장 실패 {results_filepath}: {e}")
-
 # --- 메인 퍼징 함수 ---
 
 
-def main_fuzz_loop():
-    logger.info("===== 퍼저 초기화 시작 =====")
-    os.makedirs(config.RESULTS_DIR, exist_ok=True)  # 결과 디렉토리 생성
-
-    # 파일명 타임스탬프
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    all_log_filepath = os.path.join(
-        config.RESULTS_DIR, f"all_log_{config.TARGET_MODEL}_{timestamp}.jsonl")
-    success_log_filepath = os.path.join(
-        config.RESULTS_DIR, f"success_log_{config.TARGET_MODEL}_{timestamp}.json")
-
-    logger.info(f"모든 시도 로그 파일: {all_log_filepath}")
-    logger.info(f"성공 시도 로그 파일: {success_log_filepath}")
-
-    # 컴포넌트 초기화
-    mutator = KoreanMutator()
-    seed_manager = SeedManager(config.SEED_FILE)
-    if not seed_manager.seed_pool:
-        logger.critical("시드 풀 초기화 실패. 퍼징을 종료합니다.")
-        return
-
+def sync_fuzz_loop(seed_manager, mutator, all_log_filepath, run_stats=None, dedup_filter=None, run_seed=None,
+                   scheduler=None):
+    """
+    선택 → 변형 → 생성 → 평가를 한 번에 한 반복씩 순차 실행합니다.
+    변형은 (run_seed, 반복 번호, 시드 ID) 키의 난수 생성기를 사용합니다 (run_seed가 None이면 새로 뽑음).
+    scheduler(operator_scheduler.OperatorScheduler)가 있으면 변형 연산자를 스케줄러가 고르고 판정 결과로 학습합니다.
+    """
     successful_prompts = []  # 성공 로그 저장 리스트
+    run_seed = run_seed if run_seed is not None else new_run_seed()
 
-    logger.info(
-        f"===== 퍼징 시작 (모델: {config.TARGET_MODEL}, 반복: {config.MAX_ITERATIONS}) =====")
     for i in range(config.MAX_ITERATIONS):
         iteration_start_time = time.time()
         logger.info(f"--- 반복 {i+1}/{config.MAX_ITERATIONS} ---")
@@ -96,50 +51,48 @@ def main_fuzz_loop():
         logger.debug(f"원본 시드: {original_seed_text[:80]}...")
 
         # 2. 변형 (단계 1 변형 적용)
-        mutated_prompt = mutator.mutate(original_seed_text)
-        mutated_prompt, applied_mutation_names = mutator.mutate(
-            original_seed_text)
+        key = mutation_key(run_seed, i + 1, selected_seed_id)
+        if scheduler is not None:
+            key = scheduler.assign(key, mutator.medium_available())
+        mutated_prompt, applied_mutation_names, mutate_cpu_sec, mutation_key_used = timed_mutate(
+            mutator, original_seed_text, dedup_filter, key)
+        if mutated_prompt is None:
+            logger.info("중복 변형만 생성되어 LLM 호출 없이 건너뜁니다.")
+            continue
         logger.debug(f"변형 프롬프트: {mutated_prompt[:80]}...")
         if original_seed_text == mutated_prompt:
             logger.info("변형이 적용되지 않았습니다.")
 
         # 3. LLM 실행
         logger.info("LLM에 요청 전송...")
-        llm_start_time = time.time()
-        llm_response = get_ollama_response(
-            config.TARGET_MODEL, mutated_prompt, timeout=config.LLM_TIMEOUT)
-        llm_duration = time.time() - llm_start_time
+        llm_response, llm_duration, call_info = timed_generate(
+            config.TARGET_MODEL, mutated_prompt, original_seed_text)
         logger.info(f"LLM 응답 수신 완료 ({llm_duration:.2f}초)")
         logger.debug(f"LLM 응답 (일부): {str(llm_response)[:100]}...")
 
         # 4. 평가
-        judgment_result = simple_judge(original_seed_text, llm_response)
-        is_success = "SUCCESS" in judgment_result
+        judgment_result, judge_cpu_sec = timed_judge(original_seed_text, llm_response)
         logger.info(f"평가 결과: {judgment_result}")
 
-        # 5. 시드 가중치 업데이트
-        seed_manager.update_weight(selected_seed_id, is_success)
+        # 5. 시드 가중치/스케줄러 업데이트 (LLM 오류는 반영하지 않음)
+        is_success = apply_seed_feedback(seed_manager, selected_seed_id, judgment_result)
+        apply_scheduler_feedback(scheduler, mutation_key_used, judgment_result, llm_duration)
+        apply_dedup_feedback(dedup_filter, mutated_prompt, judgment_result)
 
         # 6. 로깅
         iteration_duration = time.time() - iteration_start_time
-        log_entry = {
-            "iteration": i + 1,
-            "timestamp": datetime.now().isoformat(),
-            "seed_id": selected_seed_id,
-            "original_seed": original_seed_text,
-            "mutated_prompt": mutated_prompt,
-            "applied_mutations": applied_mutation_names,
-            "llm_response": llm_response if llm_response else "N/A",
-            "judgment": judgment_result,
-            "llm_duration_sec": round(llm_duration, 2),
-            "iteration_duration_sec": round(iteration_duration, 2),
-            "model_name": config.TARGET_MODEL,
-            # ID 유효성 체크
-            "seed_weight_after": round(seed_manager.seed_pool[selected_seed_id]['weight'], 2) if selected_seed_id < len(seed_manager.seed_pool) else 'N/A'
-        }
+        log_entry = build_log_entry(
+            i + 1, selected_seed_id, original_seed_text, mutated_prompt,
+            applied_mutation_names, llm_response, judgment_result, llm_duration,
+            iteration_duration, config.TARGET_MODEL,
+            get_seed_weight_after(seed_manager, selected_seed_id),
+            extra_fields={**call_info, "mutate_cpu_sec": mutate_cpu_sec,
+                          "judge_cpu_sec": judge_cpu_sec, "mutation_key": mutation_key_used})
 
         # 모든 시도 로그 저장
         save_log_entry(all_log_filepath, log_entry)
+        if run_stats is not None:
+            run_stats.record(log_entry)
 
         if is_success:
             logger.warning(
@@ -155,12 +108,124 @@ def main_fuzz_loop():
         # 짧은 대기 (API 제한 등 고려)
         # time.sleep(0.1)
 
+    return successful_prompts
+
+
+def log_startup_report(startup_sec, mutator):
+    """초기화 소요 시간 보고 (변형기 준비가 백그라운드에서 진행 중이면 함께 표시)."""
+    state = "완료" if mutator.is_ready() else "백그라운드 진행 중 (Low-Level 변형으로 먼저 시작)"
+    logger.info(f"초기화 소요: {startup_sec:.2f}초, 변형기 준비: {state} {mutator.startup_times}")
+
+
+def init_components():
+    """
+    변형기(백그라운드 준비 시작), 시드 풀, 시드 분석 인덱스 초기화 (단일 모델/캠페인 공통).
+
+    Returns:
+        tuple: (seed_manager, mutator). 시드 풀이 비어 있으면 None
+    """
+    mutator = KoreanMutator()
+    seed_manager = SeedManager(config.SEED_FILE)
+    if not seed_manager.seed_pool:
+        logger.critical("시드 풀 초기화 실패. 퍼징을 종료합니다.")
+        return None
+    if config.SEED_INDEX_ENABLED:
+        prepare_seed_index([item['seed'] for item in seed_manager.seed_pool], mutator)
+    return seed_manager, mutator
+
+
+def main_fuzz_loop():
+    logger.info("===== 퍼저 초기화 시작 =====")
+    startup_start = time.perf_counter()
+    os.makedirs(config.RESULTS_DIR, exist_ok=True)  # 결과 디렉토리 생성
+
+    if len(config.TARGET_MODELS) > 1:
+        # 여러 모델: 같은 변형 프롬프트를 모델별로 몰아서 생성하는 캠페인 모드
+        from campaign import run_campaign
+        components = init_components()
+        if components is None:
+            return
+        seed_manager, mutator = components
+        mutation_service = start_mutation_service(mutator, seed_manager)
+        startup_sec = time.perf_counter() - startup_start
+        log_startup_report(startup_sec, mutator)
+        try:
+            run_campaign(seed_manager, mutator, run_seed=new_run_seed(), mutation_service=mutation_service,
+                         startup_sec=startup_sec)
+        finally:
+            if mutation_service is not None:
+                mutation_service.close()
+        logger.info("===== 퍼징 종료 =====")
+        logger.info(f"형태소 분석 캐시: {mutator.pos_cache.stats()}")
+        return
+
+    # 파일명 타임스탬프
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    all_log_filepath, success_log_filepath = build_log_paths(
+        config.TARGET_MODEL, timestamp)
+    run_stats_filepath = build_run_stats_path(config.TARGET_MODEL, timestamp)
+
+    logger.info(f"모든 시도 로그 파일: {all_log_filepath}")
+    logger.info(f"성공 시도 로그 파일: {success_log_filepath}")
+
+    # 컴포넌트 초기화
+    components = init_components()
+    if components is None:
+        return
+    seed_manager, mutator = components
+
+    run_stats = RunStats(config.TARGET_MODEL)
+    run_stats.run_seed = new_run_seed()
+    dedup_filter = DedupFilter(build_dedup_path(config.TARGET_MODEL)) if config.DEDUP_ENABLED else None
+    # 변형 서비스는 동시 생성 엔진(async/pipeline)에서만 사용 (sync는 한 번에 변형 하나)
+    mutation_service = start_mutation_service(mutator, seed_manager) if config.ENGINE_MODE != "sync" else None
+    startup_sec = time.perf_counter() - startup_start
+    # 변형기 준비 시간은 백그라운드 준비가 끝나는 대로 채워지므로 같은 딕셔너리를 참조
+    run_stats.startup = {"startup_sec": round(startup_sec, 3), "mutator": mutator.startup_times}
+    run_stats.operator_costs = mutator.operator_stats
+    scheduler = build_scheduler(mutator, build_scheduler_path(config.TARGET_MODEL), seed=run_stats.run_seed)
+    log_startup_report(startup_sec, mutator)
+    logger.info(
+        f"===== 퍼징 시작 (모델: {config.TARGET_MODEL}, 반복: {config.MAX_ITERATIONS}, 엔진: {config.ENGINE_MODE}, "
+        f"실행 시드: {run_stats.run_seed}) =====")
+    try:
+        if config.ENGINE_MODE == "async":
+            from async_engine import run_async_fuzz
+            successful_prompts = run_async_fuzz(
+                seed_manager, mutator, all_log_filepath,
+                max_iterations=config.MAX_ITERATIONS, max_in_flight=config.MAX_IN_FLIGHT,
+                run_stats=run_stats, dedup_filter=dedup_filter, run_seed=run_stats.run_seed,
+                mutation_service=mutation_service, scheduler=scheduler)
+        elif config.ENGINE_MODE == "pipeline":
+            from pipeline import run_pipeline_fuzz
+            successful_prompts = run_pipeline_fuzz(
+                seed_manager, mutator, all_log_filepath, max_iterations=config.MAX_ITERATIONS,
+                run_stats=run_stats, dedup_filter=dedup_filter, run_seed=run_stats.run_seed,
+                mutation_service=mutation_service, scheduler=scheduler)
+        else:
+            successful_prompts = sync_fuzz_loop(
+                seed_manager, mutator, all_log_filepath, run_stats, dedup_filter, run_stats.run_seed, scheduler)
+    finally:
+        if mutation_service is not None:
+            mutation_service.close()
+
     logger.info("===== 퍼징 종료 =====")
+    logger.info(f"형태소 분석 캐시: {mutator.pos_cache.stats()}")
+    if dedup_filter is not None:
+        run_stats.dedup = dedup_filter.stats()
+        logger.info(f"중복 제거: {run_stats.dedup}")
+        dedup_filter.save()
+    if scheduler is not None:
+        run_stats.scheduler = scheduler.summary()
+        scheduler.save()
     # 최종 성공 목록 저장
     save_successful_results(success_log_filepath, successful_prompts)
+    run_stats.save(run_stats_filepath)
+    run_stats.log_summary()
     logger.info(f"총 {len(successful_prompts)}건의 잠재적 탈옥 발견.")
     logger.info(f"전체 로그는 '{all_log_filepath}' 파일에 저장되었습니다.")
     logger.info(f"성공 로그는 '{success_log_filepath}' 파일에 저장되었습니다.")
+    logger.info(f"실행 통계는 '{run_stats_filepath}' 파일에 저장되었습니다.")
 
 
 if __name__ == "__main__":
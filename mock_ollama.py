@@ -0,0 +1,273 @@
+# mock_ollama.py
+# 실제 GPU 모델 없이 퍼저 자체의 오버헤드를 측정하기 위한 Ollama 대역 서버
+# llm_interface가 사용하는 /api/generate (stream / non-stream), /api/version, /api/tags 를 흉내냅니다.
+#
+# 실행 예: python mock_ollama.py --port 11435 --latency-ms 200 --tokens-per-sec 80 --refusal-rate 0.6
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+REFUSAL_TEXT = "죄송합니다. 요청하신 내용은 안전 정책상 도와드릴 수 없습니다."
+COMPLIANT_PREFIX = "요청하신 내용에 대해 단계별로 설명드리겠습니다. "
+
+
+class MockSettings:
+    """대역 서버 동작 설정 (실행 중에도 속성을 바꿔 적용 가능)."""
+
+    def __init__(self, latency_ms=100.0, latency_dist="lognormal", latency_sigma=0.5,
+                 tokens_per_sec=100.0, response_tokens=120, refusal_rate=0.5,
+                 failure_rate=0.0, failure_mode="http_500", load_ms=0.0, seed=None):
+        """
+        Args:
+            latency_ms (float): 첫 토큰까지의 지연(prefill) 평균/중앙값(ms).
+            latency_dist (str): "fixed" | "uniform"([0, 2×평균]) | "lognormal"(중앙값=latency_ms).
+            latency_sigma (float): lognormal 분포의 sigma.
+            tokens_per_sec (float): 디코딩 속도. 0 이하면 디코딩 지연 없음.
+            response_tokens (int): 응답 길이(토큰). 요청의 options.num_predict가 더 작으면 그 값.
+            refusal_rate (float): 거절 응답 비율.
+            failure_rate (float): 실패 주입 비율.
+            failure_mode (str): "http_500" | "disconnect"(응답 없이 연결 종료) | "hang"(클라이언트 타임아웃 유도).
+            load_ms (float): 처음 보는 모델의 적재 지연(ms, load_duration으로 보고).
+            seed (int): 난수 시드 (재현 가능한 벤치마크용).
+        """
+        self.latency_ms = latency_ms
+        self.latency_dist = latency_dist
+        self.latency_sigma = latency_sigma
+        self.tokens_per_sec = tokens_per_sec
+        self.response_tokens = response_tokens
+        self.refusal_rate = refusal_rate
+        self.failure_rate = failure_rate
+        self.failure_mode = failure_mode
+        self.load_ms = load_ms
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+
+    def sample_latency(self):
+        """prefill 지연(초) 샘플."""
+        with self.rng_lock:
+            if self.latency_dist == "fixed":
+                ms = self.latency_ms
+            elif self.latency_dist == "uniform":
+                ms = self.rng.uniform(0, 2 * self.latency_ms)
+            else:
+                ms = self.latency_ms * self.rng.lognormvariate(0, self.latency_sigma)
+        return ms / 1000.0
+
+    def roll(self, rate):
+        with self.rng_lock:
+            return self.rng.random() < rate
+
+
+def _build_tokens(prompt, refused, n_tokens):
+    """응답 토큰 목록. 순응 응답은 프롬프트의 단어를 되풀이해 판정기의 유해 키워드 검사에 걸리게 함."""
+    if refused:
+        words = REFUSAL_TEXT.split(' ')
+    else:
+        prompt_words = prompt.split() or ["내용"]
+        words = COMPLIANT_PREFIX.split(' ')
+        while len(words) < n_tokens:
+            words.extend(prompt_words)
+    return [w + ' ' for w in words[:max(1, n_tokens)]]
+
+
+class MockOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # keep-alive 연결에서 작은 응답이 지연 ACK(~40ms)에 걸리지 않도록
+    disable_nagle_algorithm = True
+
+    # 서버 인스턴스에서 설정을 가져옴
+    @property
+    def settings(self):
+        return self.server.settings
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/api/version":
+            self._send_json({"version": "0.0.0-mock"})
+        elif self.path == "/api/tags":
+            models = sorted(self.server.loaded_models)
+            self._send_json({"models": [{"name": m, "model": m} for m in models]})
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        if self.path != "/api/generate":
+            self._send_json({"error": "not found"}, status=404)
+            return
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            request = json.loads(self.rfile.read(length))
+        except json.JSONDecodeError:
+            self._send_json({"error": "invalid JSON"}, status=400)
+            return
+        model_name = request.get("model")
+        if not model_name:
+            self._send_json({"error": "model is required"}, status=400)
+            return
+
+        settings = self.settings
+        start_ns = time.perf_counter_ns()
+        load_duration_ns = 0
+        with self.server.models_lock:
+            first_load = model_name not in self.server.loaded_models
+            self.server.loaded_models.add(model_name)
+        if first_load and settings.load_ms > 0:
+            time.sleep(settings.load_ms / 1000.0)
+            load_duration_ns = int(settings.load_ms * 1e6)
+
+        if "prompt" not in request:
+            # prompt 없는 요청 = 모델 적재만 수행
+            self._send_json({"model": model_name, "response": "", "done": True,
+                             "load_duration": load_duration_ns})
+            return
+
+        if settings.roll(settings.failure_rate):
+            self._inject_failure()
+            return
+
+        prompt = request["prompt"]
+        options = request.get("options") or {}
+        n_tokens = settings.response_tokens
+        num_predict = options.get("num_predict")
+        if isinstance(num_predict, int) and num_predict > 0:
+            n_tokens = min(n_tokens, num_predict)
+        tokens = _build_tokens(prompt, settings.roll(settings.refusal_rate), n_tokens)
+
+        prefill_sec = settings.sample_latency()
+        time.sleep(prefill_sec)
+        token_interval = 1.0 / settings.tokens_per_sec if settings.tokens_per_sec > 0 else 0.0
+        prompt_eval_count = max(1, len(prompt) // 2)
+
+        def final_metrics(eval_count, eval_start_ns):
+            now_ns = time.perf_counter_ns()
+            return {
+                "model": model_name, "response": "", "done": True,
+                "total_duration": now_ns - start_ns,
+                "load_duration": load_duration_ns,
+                "prompt_eval_count": prompt_eval_count,
+                "prompt_eval_duration": int(prefill_sec * 1e9),
+                "eval_count": eval_count,
+                "eval_duration": now_ns - eval_start_ns,
+            }
+
+        eval_start_ns = time.perf_counter_ns()
+        if request.get("stream", True):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            try:
+                for token in tokens:
+                    if token_interval:
+                        time.sleep(token_interval)
+                    self._write_chunk({"model": model_name, "response": token, "done": False})
+                self._write_chunk(final_metrics(len(tokens), eval_start_ns))
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # 클라이언트의 조기 중단
+        else:
+            if token_interval:
+                time.sleep(token_interval * len(tokens))
+            result = final_metrics(len(tokens), eval_start_ns)
+            result["response"] = ''.join(tokens)
+            self._send_json(result)
+
+    def _write_chunk(self, payload):
+        line = (json.dumps(payload, ensure_ascii=False) + "\n").encode('utf-8')
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+        self.wfile.flush()
+
+    def _inject_failure(self):
+        mode = self.settings.failure_mode
+        if mode == "disconnect":
+            self.close_connection = True
+            self.connection.close()
+        elif mode == "hang":
+            time.sleep(self.server.hang_seconds)
+            self.close_connection = True
+        else:
+            self._send_json({"error": "injected failure"}, status=500)
+
+
+class MockOllamaServer(ThreadingHTTPServer):
+    """요청마다 스레드를 쓰는 대역 서버. start()로 백그라운드 실행."""
+
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, settings=None, hang_seconds=600):
+        super().__init__((host, port), MockOllamaHandler)
+        self.settings = settings or MockSettings()
+        self.hang_seconds = hang_seconds
+        self.loaded_models = set()
+        self.models_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def generate_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api/generate"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="mock-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def add_settings_arguments(parser):
+    """MockSettings 인자를 argparse에 등록 (benchmark.py와 공유)."""
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="첫 토큰까지 지연 중앙값(ms)")
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--tokens-per-sec", type=float, default=100.0)
+    parser.add_argument("--response-tokens", type=int, default=120)
+    parser.add_argument("--refusal-rate", type=float, default=0.5)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--failure-mode", choices=["http_500", "disconnect", "hang"], default="http_500")
+    parser.add_argument("--load-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def settings_from_args(args):
+    return MockSettings(
+        latency_ms=args.latency_ms, latency_dist=args.latency_dist, latency_sigma=args.latency_sigma,
+        tokens_per_sec=args.tokens_per_sec, response_tokens=args.response_tokens,
+        refusal_rate=args.refusal_rate, failure_rate=args.failure_rate,
+        failure_mode=args.failure_mode, load_ms=args.load_ms, seed=args.seed)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Ollama 대역(mock) 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    add_settings_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    server = MockOllamaServer(args.host, args.port, settings_from_args(args))
+    print(f"Mock Ollama listening on {server.generate_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,41 @@
+# mutation_rng.py
+# 변형별 난수 생성기: (실행 시드, 반복 번호, 시드 ID, 시도 번호)로 된 변형 키에서 random.Random을 파생합니다.
+# 변형기는 전역 random 대신 이 생성기만 사용하므로, 로그에 키만 남기면 같은 변형을 그대로 다시 만들 수 있고
+# 여러 워커가 동시에 변형해도 서로의 난수 상태에 영향을 주지 않습니다 (재현: replay.py).
+import hashlib
+import random
+import secrets
+
+import config
+
+
+def new_run_seed():
+    """실행 시드. config.MUTATION_RUN_SEED가 있으면 그 값(실행 전체 재현용), 없으면 새 64비트 난수."""
+    if config.MUTATION_RUN_SEED is not None:
+        return int(config.MUTATION_RUN_SEED)
+    return secrets.randbits(64)
+
+
+def mutation_key(run_seed, iteration, seed_id, attempt=0, medium=True):
+    """
+    변형 1회의 키 (로그 항목의 mutation_key).
+
+    Args:
+        run_seed (int): 실행 시드
+        iteration (int): 변형을 만든 반복 번호 (배치 변형은 배치를 만든 반복)
+        seed_id (int): 원본 시드 ID
+        attempt (int): 같은 반복 안의 시도 번호 (중복 제거 재시도, mutate_batch 시도)
+        medium (bool): Medium-Level 변형 사용 여부 (형태소 분석기 준비 전의 변형은 False)
+
+    연산자 스케줄러를 쓰면 operator_scheduler.OperatorScheduler.assign이 선택한 연산자(ops)를 키에 추가합니다
+    (난수 생성기 파생에는 쓰이지 않음).
+    """
+    return {"run_seed": run_seed, "iteration": iteration, "seed_id": seed_id,
+            "attempt": attempt, "medium": medium}
+
+
+def rng_for(key):
+    """변형 키 -> 전용 random.Random (같은 키면 프로세스/실행과 무관하게 같은 난수열)."""
+    material = f"{key['run_seed']}:{key['iteration']}:{key['seed_id']}:{key['attempt']}"
+    digest = hashlib.blake2b(material.encode('utf-8'), digest_size=8).digest()
+    return random.Random(int.from_bytes(digest, 'little'))
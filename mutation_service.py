@@ -0,0 +1,202 @@
+# mutation_service.py
+# 변형 서비스: 워커 프로세스 N개가 각자 준비(warm-up)를 마친 KoreanMutator로 변형을 만들어, 형태소 분석(Okt/JVM)과
+# 문자 단위 변형의 파이썬 루프가 프로세스 하나의 GIL에 묶이지 않게 합니다 (여러 GPU/엔드포인트로 동시 생성할 때).
+# 워커에는 변형 키(mutation_rng.mutation_key)만 넘기고, 시드 원문과 사전 분석 결과는 seed_index.SharedSeedIndex,
+# 유의어 사전은 thesaurus_store.ThesaurusStore로 같은 파일을 mmap해 공유하므로 워커마다 복사본을 만들지 않습니다.
+# 같은 키면 어느 워커에서 만들어도 같은 변형이 나오므로 replay.py로 그대로 재현됩니다.
+#
+# 중복 제거 필터(dedup.DedupFilter)는 부모 프로세스에 두고, 중복이면 attempt를 올린 키로 다시 요청합니다.
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import config
+from mutation_rng import rng_for
+from mutator import KoreanMutator
+from seed_index import SharedSeedIndex, get_seed_index
+
+logger = logging.getLogger(__name__)
+
+# --- 워커 프로세스 ---
+_worker_mutator = None
+
+
+def _config_values():
+    """spawn 워커는 config를 새로 import하므로 부모에서 바꾼 값(benchmark 등)을 넘겨 그대로 적용."""
+    return {name: value for name, value in vars(config).items() if name.isupper()}
+
+
+def _init_worker(config_values, log_level, seed_index, thesaurus, ready_barrier):
+    """워커 초기화: 설정과 부모의 로그 레벨 적용, 변형기 준비(eager), 모든 워커가 준비될 때까지 대기."""
+    global _worker_mutator
+    for name, value in config_values.items():
+        setattr(config, name, value)
+    logging.basicConfig(format=config.LOG_FORMAT)
+    logging.getLogger().setLevel(log_level)  # 다시 import된 모듈이 먼저 basicConfig를 호출했어도 부모 레벨로 맞춤
+    mutator = KoreanMutator(warm_up="eager", thesaurus=thesaurus)
+    mutator.seed_index = seed_index
+    _worker_mutator = mutator
+    ready_barrier.wait(config.MUTATION_SERVICE_START_TIMEOUT)
+
+
+def _worker_ready():
+    return os.getpid(), _worker_mutator.medium_available()
+
+
+def _mutate_task(text, key, n):
+    """
+    워커에서 변형 실행. text가 None이면 공유 시드 인덱스에서 key의 seed_id로 원문을 찾습니다.
+    n이 0이면 mutate() 1회(key의 medium이 None이면 이 워커의 분석기 상태로 채움), 아니면 mutate_batch(n).
+
+    Returns:
+        tuple: ([(mutated_prompt, applied_mutation_names, mutation_key), ...], mutate_cpu_sec,
+                이 작업의 연산자별 비용 (OperatorStats.drain, 부모의 집계에 합침))
+    """
+    mutator = _worker_mutator
+    cpu_start = time.thread_time()
+    if text is None:
+        text = mutator.seed_index.seed_text(key["seed_id"])
+    if n:
+        mutants = mutator.mutate_batch(text, n, key=key)
+    else:
+        if key is not None and key["medium"] is None:
+            key = dict(key, medium=mutator.medium_available())
+        mutated_prompt, applied_mutation_names = mutator.mutate(
+            text, rng=rng_for(key) if key is not None else None,
+            medium=key["medium"] if key is not None else None, ops=key.get("ops") if key is not None else None)
+        mutants = [(mutated_prompt, applied_mutation_names, key)]
+    return mutants, time.thread_time() - cpu_start, mutator.operator_stats.drain()
+
+
+# --- 부모 프로세스 ---
+class MutationService:
+    """
+    변형 워커 프로세스 풀. fuzz_core.timed_mutate/timed_mutate_batch와 같은 형태의 결과를 반환하므로
+    엔진은 변형기 대신 이 서비스를 호출하기만 하면 됩니다 (호출 스레드는 결과를 기다리는 동안 GIL을 놓음).
+    close()(또는 with 블록 종료) 시 워커를 종료하고 공유 시드 인덱스 파일을 지웁니다.
+    """
+
+    def __init__(self, mutator, seed_texts, workers=None, start_method=None):
+        """
+        Args:
+            mutator (KoreanMutator): 부모의 변형기 (시드 인덱스와 유의어 사전을 워커와 공유)
+            seed_texts (list): 시드 ID 순의 시드 원문 (SeedManager.seed_pool 순서)
+            workers (int): 워커 프로세스 수. None이면 config.MUTATION_SERVICE_WORKERS
+            start_method (str): multiprocessing 시작 방식. None이면 config.MUTATION_SERVICE_START_METHOD
+        """
+        self.workers = max(1, workers or config.MUTATION_SERVICE_WORKERS)
+        if mutator.analyzer_enabled:
+            # 유의어 사전 컴파일/로드를 부모에서 끝내 두고 워커는 같은 파일을 열기만 함
+            mutator.wait_until_ready()
+        self._seed_texts = list(seed_texts)
+        self.operator_stats = mutator.operator_stats  # 워커의 연산자별 비용을 부모 변형기의 집계에 합침
+        fd, self._index_path = tempfile.mkstemp(prefix="kofuzz_seed_index_", suffix=".bin")
+        os.close(fd)
+        self.seed_index = SharedSeedIndex.export(
+            mutator.seed_index or get_seed_index(), self._seed_texts, self._index_path)
+        context = multiprocessing.get_context(start_method or config.MUTATION_SERVICE_START_METHOD)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=context, initializer=_init_worker,
+            initargs=(_config_values(), logging.getLogger().getEffectiveLevel(), self.seed_index, mutator.korean_thesaurus,
+                      context.Barrier(self.workers)))
+        self._closed = False
+        self.medium = False
+
+    def start(self):
+        """워커를 모두 띄우고 변형기 준비가 끝날 때까지 대기. 준비 소요 시간(초) 반환."""
+        start = time.perf_counter()
+        futures = [self._executor.submit(_worker_ready) for _ in range(self.workers)]
+        ready = [future.result(timeout=config.MUTATION_SERVICE_START_TIMEOUT) for future in futures]
+        self.medium = all(medium for _, medium in ready)
+        elapsed = time.perf_counter() - start
+        logger.info(f"변형 서비스 준비 완료: 워커 {self.workers}개, Medium-Level 변형 {self.medium}, "
+                    f"{elapsed:.2f}초 (공유 시드 인덱스 {len(self.seed_index)}개)")
+        return elapsed
+
+    def _submit(self, text, key, n=0):
+        # 공유 인덱스에 같은 원문이 있는 시드는 ID(키)만 보냄
+        if key is not None and 0 <= key["seed_id"] < len(self._seed_texts) \
+                and self._seed_texts[key["seed_id"]] == text:
+            text = None
+        return self._executor.submit(_mutate_task, text, key, n)
+
+    def _result(self, future):
+        mutants, mutate_cpu_sec, operator_costs = future.result()
+        self.operator_stats.merge(operator_costs)
+        return mutants, mutate_cpu_sec
+
+    # --- fuzz_core와 같은 형태의 변형 ---
+    def timed_mutate_many(self, requests, dedup_filter=None):
+        """
+        [(original_seed_text, key), ...]를 한꺼번에 워커에 나눠 변형. 중복 판정은 요청 순서대로 하므로
+        같은 요청을 차례로 timed_mutate한 결과와 같습니다.
+
+        Returns:
+            list: 요청별 (mutated_prompt, applied_mutation_names, mutate_cpu_sec, mutation_key)
+        """
+        futures = [self._submit(text, None if key is None else dict(key, medium=None))
+                   for text, key in requests]
+        results = []
+        for (text, _), future in zip(requests, futures):
+            mutants, mutate_cpu_sec = self._result(future)
+            mutated_prompt, applied_mutation_names, attempt_key = mutants[0]
+            attempts = config.DEDUP_MAX_ATTEMPTS if dedup_filter is not None else 1
+            for attempt in range(1, max(1, attempts) + 1):
+                if dedup_filter is None or dedup_filter.check(mutated_prompt)[0]:
+                    break
+                if attempt >= attempts:
+                    mutated_prompt = None
+                    break
+                # 분석기 상태(medium)는 첫 시도의 값으로 고정
+                retry_key = dict(attempt_key, attempt=attempt) if attempt_key is not None else None
+                mutants, retry_cpu_sec = self._result(self._submit(text, retry_key))
+                mutated_prompt, applied_mutation_names, attempt_key = mutants[0]
+                mutate_cpu_sec += retry_cpu_sec
+            results.append((mutated_prompt, applied_mutation_names, round(mutate_cpu_sec, 6), attempt_key))
+        return results
+
+    def timed_mutate(self, original_seed_text, dedup_filter=None, key=None):
+        """fuzz_core.timed_mutate와 같은 형태: (mutated_prompt, applied_mutation_names, mutate_cpu_sec, mutation_key)."""
+        return self.timed_mutate_many([(original_seed_text, key)], dedup_filter)[0]
+
+    def timed_mutate_batch(self, original_seed_text, n, dedup_filter=None, key=None):
+        """fuzz_core.timed_mutate_batch와 같은 형태: ([(mutated_prompt, applied_mutation_names, mutation_key), ...], 1개당 CPU 초)."""
+        mutants, mutate_cpu_sec = self._result(self._submit(original_seed_text, key, n))
+        mutants = mutants or [(original_seed_text, [], None)]
+        if dedup_filter is not None:
+            mutants = [m for m in mutants if dedup_filter.check(m[0])[0]]
+        return mutants, round(mutate_cpu_sec / max(1, len(mutants)), 6)
+
+    # --- 종료 ---
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self.seed_index.close()
+        try:
+            os.remove(self._index_path)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def start_mutation_service(mutator, seed_manager):
+    """config.MUTATION_SERVICE_WORKERS가 1 이상이면 변형 서비스를 띄워 반환, 아니면 None (프로세스 안에서 변형)."""
+    if config.MUTATION_SERVICE_WORKERS <= 0:
+        return None
+    service = MutationService(mutator, [item['seed'] for item in seed_manager.seed_pool])
+    try:
+        service.start()
+    except Exception:
+        service.close()
+        raise
+    return service
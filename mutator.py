@@ -4,32 +4,35 @@ import unicodedata # 난독화 위해 추가
 import logging
 import re
 import os
-import pickle
+import threading
+import time
 import traceback
+from importlib.util import find_spec
 
-# 'jamo' 라이브러리 시도 및 확인
-try:
-    import jamo
-    JAMO_AVAILABLE = True
-except ImportError:
-    JAMO_AVAILABLE = False
-    print("경고: 'jamo' 라이브러리를 찾을 수 없습니다. 일부 자모 관련 기능이 제한됩니다.")
-    print("설치 명령어: pip install jamo")
-
-# konlpy 임포트 시도 및 확인
-try:
-    from konlpy.tag import Okt
-    KONLPY_AVAILABLE = True
-except ImportError:
-    KONLPY_AVAILABLE = False
+# konlpy 설치 여부만 확인 (실제 임포트와 JVM 기동은 KoreanMutator 준비 단계에서 수행)
+KONLPY_AVAILABLE = find_spec("konlpy") is not None
+if not KONLPY_AVAILABLE:
     print("경고: 'konlpy' 라이브러리를 찾을 수 없습니다. 형태소 분석 기반 변형이 제한됩니다.")
     print("설치 명령어: pip install konlpy") # 또는 JPype1, JDK 설치 필요 명시
 
 import config  # config 임포트
+import hangul
+from pos_cache import get_pos_cache
+from char_kernel import CharOp, FusedCharKernel
+from mutation_rng import rng_for
+from operator_stats import OperatorStats
+from seed_index import analyze_seed
+from thesaurus_store import open_thesaurus
+from token_ir import Token, TokenText
 
 logger = logging.getLogger(__name__)
 
 
+def _has_text(tokens):
+    """어절(토큰 묶음)에 남은 글자가 있는지 (조사 삭제 등으로 모두 ''이 된 어절 제외)."""
+    return any(token.text for token in tokens)
+
+
 class KoreanMutator:
     """
     한국어 텍스트에 다양한 변형(Mutation/Obfuscation)을 적용하는 클래스.
@@ -68,6 +71,7 @@ class KoreanMutator:
         '지만': ['는데', '나', '고'], '는데': ['지만', '며', '고'], '아서': ['어서', '니까', '고'],
         '어서': ['아서', '니까', '고'], '니까': ['아서', '어서', '므로'], '(으)면': ['거든', '어야']
     }
+    _endings_by_length = sorted(endings_to_mutate, key=len, reverse=True)  # 긴 어미부터 비교
     fillers = ["음 ", "그 ", "좀 ", "약간 ", "뭔가 ", "사실 ", "이제 ", "막 ", "뭐랄까 "]
     typo_map = {
         'ㅏ': 'ㅑ', 'ㅓ': 'ㅕ', 'ㅗ': 'ㅛ', 'ㅜ': 'ㅠ', 'ㅡ': 'ㅣ', 'ㅣ': 'ㅡ', 'ㅐ': 'ㅒ', 'ㅔ': 'ㅖ', 'ㅒ': 'ㅐ', 'ㅖ': 'ㅔ',
@@ -101,22 +105,65 @@ class KoreanMutator:
         'ㅈ': ['ㅊ', 'ㄷ', 'ㅅ'], 'ㅊ': ['ㅈ', 'ㅌ', 'ㅎ'], 'ㅌ': ['ㄷ', 'ㅊ', 'ㅅ'], 'ㅎ': ['ㄶ', 'ㅀ', 'ㄷ']
     }
     finals_for_addition = list("ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ") # 'ㅇ' 제외? 필요시 포함
+    # 위 유사 자모 규칙의 인덱스 표 (mutate_jamo_alter가 hangul 산술로 바로 재조합)
+    _similar_initial_table = hangul.similar_index_table(similar_initials, hangul.INITIAL_INDEX)
+    _similar_medial_table = hangul.similar_index_table(similar_medials, hangul.MEDIAL_INDEX)
+    _similar_final_table = hangul.similar_index_table(similar_finals, hangul.FINAL_INDEX)
+    _finals_for_addition_indices = [hangul.FINAL_INDEX[j] for j in finals_for_addition]
+    # 문자 단위 변형의 대상 글자 패턴
+    _HOMOGLYPH_PATTERN = re.compile('[' + ''.join(re.escape(c) for c in KOR_TO_HOMOGLYPHS) + ']')
+    _FULLWIDTH_PATTERN = re.compile('[' + ''.join(re.escape(c) for c in ASCII_TO_FULLWIDTH) + ']')
+    # 글자 하나를 독립적으로 바꾸는 Low-Level 변형 (mutate()에서 연속으로 선택되면 한 번에 실행) -> 기본 확률
+    CHAR_OP_DEFAULT_PROBS = {
+        "mutate_jamo_alter": config.DEFAULT_PROB_JAMO_ALTER,
+        "decompose_jamo": config.DEFAULT_PROB_JAMO_DECOMPOSE,
+        "apply_homoglyphs": config.DEFAULT_PROB_HOMOGLYPH,
+        "insert_invisible_chars": config.DEFAULT_PROB_INVISIBLE,
+        "apply_fullwidth": config.DEFAULT_PROB_FULLWIDTH,
+    }
+    # 토큰 표현(token_ir.TokenText)을 제자리에서 고치는 변형 -> 토큰 버전 메서드
+    # (mutate()에서 연속으로 선택되면 토큰을 한 번만 만들고 마지막에 한 번만 렌더링)
+    TOKEN_OPS = {
+        "mutate_particles": "_particles_on",
+        "mutate_endings": "_endings_on",
+        "mutate_word_order": "_word_order_on",
+        "insert_korean_fillers": "_fillers_on",
+    }
 
 
-    def __init__(self):
-        """형태소 분석기 초기화"""
+    def __init__(self, warm_up=None, thesaurus=None):
+        """
+        변형기 초기화. 형태소 분석기(Okt/JVM)와 유의어 사전은 준비(warm-up) 단계에서 로드하며,
+        기본값("background")은 백그라운드 스레드에서 준비하므로 준비가 끝나기 전까지는
+        Low-Level 변형만 적용됩니다. Medium-Level 변형이 꺼져 있으면(MUTATE_PROB_MEDIUM=0) 로드하지 않음.
+
+        Args:
+            warm_up (str): "background" | "eager"(생성자에서 준비 완료까지 대기). None이면 config.MUTATOR_WARMUP.
+            thesaurus (ThesaurusStore): 이미 연 유의어 사전 (변형 서비스 워커는 부모의 사전을 경로로 넘겨받아
+                                        같은 파일을 mmap). None이면 준비 단계에서 open_thesaurus()로 엶.
+        """
+        init_start = time.perf_counter()
         self.analyzer = None
-        if KONLPY_AVAILABLE:
-            try:
-                self.analyzer = Okt()
-                logger.info("Okt 형태소 분석기 초기화 완료.")
-            except Exception as e:
-                logger.error(f"Okt 형태소 분석기 초기화 오류: {e}. 형태소 기반 변형 비활성화.")
-        else:
-             logger.warning("Konlpy/Okt 미설치. 형태소 기반 변형 비활성화.")
-
-        # ★★★ 유의어 사전 로드 ★★★
-        self.korean_thesaurus = self.load_korean_thesaurus()
+        self.korean_thesaurus = None  # thesaurus_store.ThesaurusStore
+        self._preloaded_thesaurus = thesaurus
+        # 형태소 분석 결과 캐시 (모든 KoreanMutator 인스턴스가 공유)
+        self.pos_cache = get_pos_cache()
+        # 시드 사전 분석 인덱스 (seed_index.prepare_seed_index가 연결, 시드 원문에만 적용)
+        self.seed_index = None
+        # mutate_batch 동안 원본 텍스트의 분석 결과를 공유 (시드 인덱스에 없는 텍스트용, 스레드별)
+        self._batch_local = threading.local()
+        # (변형 이름, 확률) 조합 -> 컴파일된 FusedCharKernel
+        self._char_kernels = {}
+        # 연산자별 호출 수/변경 수/소요 시간 (run_stats가 실행 종료 시 하류 결과와 함께 저장)
+        self.operator_stats = OperatorStats()
+        # 준비 단계별 소요 시간(초)
+        self.startup_times = {}
+        self._ready = threading.Event()
+        self.analyzer_enabled = KONLPY_AVAILABLE and config.MUTATE_PROB_MEDIUM > 0
+        if not KONLPY_AVAILABLE:
+            logger.warning("Konlpy/Okt 미설치. 형태소 기반 변형 비활성화.")
+        elif not self.analyzer_enabled:
+            logger.info("Medium-Level 변형 비활성화(MUTATE_PROB_MEDIUM=0): 형태소 분석기/유의어 사전 로드 생략.")
 
         # --- 변형 함수 목록 정의 ---
         self.low_level_funcs = [
@@ -140,105 +187,135 @@ class KoreanMutator:
             self.insert_korean_fillers,
         ]
 
-    def load_korean_thesaurus(self):
-        """전처리된 유의어 사전 파일(.pkl)을 로드합니다."""
-        thesaurus_path = getattr(
-            config, 'THESAURUS_PATH', 'korean_thesaurus.pkl')
-        if os.path.exists(thesaurus_path):
-            try:
-                with open(thesaurus_path, 'rb') as f:
-                    thesaurus_data = pickle.load(f)
-                logger.info(
-                    f"유의어 사전 로드 완료: {thesaurus_path} ({len(thesaurus_data)} 단어)")
-                return thesaurus_data
-            except Exception as e:
-                logger.error(f"유의어 사전 로드 실패 ({thesaurus_path}): {e}")
-                return {}  # 로드 실패 시 빈 딕셔너리 반환
+        self.startup_times["init"] = round(time.perf_counter() - init_start, 3)
+        warm_up = warm_up or config.MUTATOR_WARMUP
+        if warm_up == "eager":
+            self._warm_up()
         else:
-            logger.warning(
-                f"유의어 사전 파일을 찾을 수 없습니다: {thesaurus_path}. 유의어 변형 비활성화.")
-            return {}  # 파일 없으면 빈 딕셔너리 반환
+            threading.Thread(target=self._warm_up, name="mutator-warmup", daemon=True).start()
 
-    def get_related_words(self, word, pos_tag):
+    @property
+    def analyzer_name(self):
         """
-        통합 사전에서 주어진 단어/품사에 대한 관련 단어(유의어, 상위어, 하위어) 리스트를 반환합니다.
+        사용(예정)인 형태소 분석기 이름 (준비 완료 전에도 결정됨, 시드 인덱스 서명에 사용).
+        준비가 끝났는데 분석기 기동에 실패했으면 None (분석 없이 만든 인덱스를 Okt 결과로 저장하지 않도록).
         """
-        related_words = set() # 중복 제거용 세트
-        if not self.korean_thesaurus:
-            return []
+        if not self.analyzer_enabled or (self.is_ready() and self.analyzer is None):
+            return None
+        return "Okt"
 
-        # 사전 구조: thesaurus[word][pos_tag] = {'synonyms': [], 'hypernym': str|None, 'hyponyms': []}
-        if word in self.korean_thesaurus and pos_tag in self.korean_thesaurus[word]:
-            entry = self.korean_thesaurus[word][pos_tag]
+    def is_ready(self):
+        return self._ready.is_set()
 
-            # 1. 유의어 추가 (synonyms 키 확인)
-            synonyms = entry.get('synonyms')
-            if synonyms and isinstance(synonyms, (list, set)):
-                related_words.update(s for s in synonyms if isinstance(s, str)) # 문자열만 추가
+    def operator_names(self):
+        """스케줄러가 고를 수 있는 전체 연산자 이름 (유의어 변형 포함)."""
+        return [f.__name__ for f in self.low_level_funcs + self.medium_level_funcs + self.high_level_funcs]
 
-            # 2. 상위어 추가 (hypernym 키 확인)
-            hypernym = entry.get('hypernym')
-            if hypernym and isinstance(hypernym, str):
-                related_words.add(hypernym)
+    def medium_operator_names(self):
+        """형태소 분석기가 준비되어야 적용되는 연산자 이름 (Medium/High)."""
+        return [f.__name__ for f in self.medium_level_funcs + self.high_level_funcs]
 
-            # 3. 하위어 추가 (hyponyms 키 확인)
-            hyponyms = entry.get('hyponyms')
-            if hyponyms and isinstance(hyponyms, (list, set)):
-                related_words.update(h for h in hyponyms if isinstance(h, str)) # 문자열만 추가
+    def medium_available(self):
+        """지금 Medium-Level(형태소 기반) 변형을 사용할 수 있는지 (변형 키의 medium 값)."""
+        return self.analyzer is not None
 
-        # 원본 단어는 치환 대상에서 제외
-        related_words.discard(word)
+    def wait_until_ready(self, timeout=None):
+        """형태소 분석기/유의어 사전 준비가 끝날 때까지 대기. 준비 완료 여부 반환."""
+        return self._ready.wait(timeout)
+
+    def _warm_up(self):
+        """형태소 분석기 기동(+첫 분석으로 JIT 예열)과 유의어 사전 로드. 실패해도 Low-Level 변형은 계속 사용 가능."""
+        try:
+            if not self.analyzer_enabled:
+                return
+            start = time.perf_counter()
+            analyzer = self._load_analyzer()
+            self.startup_times["analyzer"] = round(time.perf_counter() - start, 3)
+
+            start = time.perf_counter()
+            thesaurus = self._preloaded_thesaurus or self.load_korean_thesaurus()
+            self.startup_times["thesaurus"] = round(time.perf_counter() - start, 3)
+
+            # 사전을 먼저 연결한 뒤 분석기를 연결 (분석기가 보이는 시점에는 유의어 변형도 사용 가능)
+            self.korean_thesaurus = thesaurus
+            self.analyzer = analyzer
+            logger.info(f"변형기 준비 완료 (소요 시간: {self.startup_times})")
+        except Exception as e:
+            logger.error(f"변형기 준비 중 오류: {e}. 형태소 기반 변형 비활성화.")
+        finally:
+            self._ready.set()
+
+    def _load_analyzer(self):
+        try:
+            from konlpy.tag import Okt
+            analyzer = Okt()
+            analyzer.pos("형태소 분석기 예열", norm=True, stem=False)  # 첫 호출의 JVM 클래스 로딩/JIT 비용을 미리 지불
+            logger.info("Okt 형태소 분석기 초기화 완료.")
+            return analyzer
+        except Exception as e:
+            logger.error(f"Okt 형태소 분석기 초기화 오류: {e}. 형태소 기반 변형 비활성화.")
+            return None
+
+    def load_korean_thesaurus(self):
+        """
+        컴파일된 유의어 사전(mmap)을 엽니다. 피클(THESAURUS_PATH)만 있으면 처음 한 번 변환합니다.
+        사전이 없으면 None (유의어 변형 비활성화).
+        """
+        return open_thesaurus()
+
+    def get_related_words(self, word, pos_tag):
+        """
+        통합 사전에서 주어진 단어/품사에 대한 관련 단어(유의어, 상위어, 하위어) 리스트를 반환합니다.
+        (컴파일 시 중복 제거/정렬되어 있으며 원본 단어는 제외됨)
+        """
+        if not self.korean_thesaurus:
+            return []
+        return self.korean_thesaurus.related(word, pos_tag)
+
+    def _seed_analysis(self, text):
+        """text가 시드 원문(또는 mutate_batch의 원본)이면 사전 분석 결과, 아니면 None."""
+        batch_analysis = getattr(self._batch_local, "analysis", None)
+        if batch_analysis is not None and batch_analysis[0] == text:
+            return batch_analysis[1]
+        if self.seed_index is None:
+            return None
+        return self.seed_index.get(text)
+
+    def _hangul_positions(self, text):
+        """완성형 한글 음절 위치 (시드 원문이면 사전 계산된 위치 사용)."""
+        analysis = self._seed_analysis(text)
+        return analysis["hangul_positions"] if analysis is not None else hangul.syllable_positions(text)
+
+    def synonym_candidate_indices(self, pos_tags):
+        """유의어 사전에 관련 단어가 있는 (단어, 품사)인 치환 가능 형태소의 인덱스 목록."""
+        if not self.korean_thesaurus:
+            return []
+        # 교체 가능한 품사 목록 (명사, 동사, 형용사, 부사 등)
+        replaceable_pos = ['Noun', 'Verb', 'Adjective', 'Adverb']
+        return [i for i, (word, tag) in enumerate(pos_tags)
+                if tag in replaceable_pos
+                and self.korean_thesaurus.contains(word, tag)]
 
-        # 최종적으로 리스트로 변환하여 반환
-        return list(related_words)
-        
     def _get_pos(self, text):
-        """텍스트의 형태소 및 품사 태그 반환 (Okt 사용)"""
+        """텍스트의 형태소 및 품사 태그 반환 (Okt 사용, 시드 인덱스 → pos_cache 순으로 재사용)"""
         if not self.analyzer:
             return []
+        analysis = self._seed_analysis(text)
+        if analysis is not None and analysis["pos"] is not None:
+            return analysis["pos"]
         try:
             # norm=True 옵션은 '사랑햌ㅋㅋ' -> '사랑하다ㅋㅋ' 와 같이 정규화
             # stem=False 옵션은 '그렇다' -> '그렇다' (원형 복원 안함)
-            return self.analyzer.pos(text, norm=True, stem=False)
+            return self.pos_cache.get_or_analyze(self.analyzer, text, norm=True, stem=False)
         except Exception as e:
             logger.error(f"Okt 형태소 분석 오류: {e}")
             return []
 
     # --- 기존 Low-Level 변형 함수들 (mutate_random_syllable 제외) ---
-    # ★★★★★ 신규 변형 함수 1: 단어 순서 변경 ★★★★★
-    def mutate_word_order(self, text, probability=config.DEFAULT_PROB_WORD_ORDER):
-        """문장 내 인접한 단어의 순서를 확률적으로 변경합니다."""
-        if not isinstance(text, str) or len(text.strip()) == 0:
-            return text
-
-        # 간단하게 공백 기준으로 단어 분리 (더 정교하게 하려면 형태소 분석기 사용 가능)
-        words = text.split(' ')
-        if len(words) < 2:  # 단어가 2개 미만이면 순서 변경 불가
-            return text
-
-        mutated_words = list(words)  # 수정 가능한 리스트로 복사
-        num_swapped = 0
-
-        for i in range(len(mutated_words) - 1):
-            # 현재 단어와 다음 단어 모두 비어있지 않을 때만 시도
-            if mutated_words[i] and mutated_words[i+1] and random.random() < probability:
-                # 인접한 두 단어의 순서를 바꿈
-                mutated_words[i], mutated_words[i +
-                                                1] = mutated_words[i+1], mutated_words[i]
-                num_swapped += 1
-                # 한 번 바꾼 후에는 다음 인덱스로 건너뛰어 중복 스왑 방지 (선택적)
-                # i += 1 # 이 줄을 활성화하면 연속된 스왑은 일어나지 않음
-
-        if num_swapped > 0:
-            logger.debug(
-                f"Word order mutation applied: swapped {num_swapped} pairs.")
-            return ' '.join(mutated_words)  # 재조합
-        else:
-            return text  # 변경 없으면 원본 반환
-
     # ★★★★★ 신규 변형 함수 2: 음절 순서 변경 ★★★★★
-    def mutate_syllable_order(self, text, probability=config.DEFAULT_PROB_SYLLABLE_ORDER):
+    def mutate_syllable_order(self, text, probability=config.DEFAULT_PROB_SYLLABLE_ORDER, rng=None):
         """단어 내 음절(글자)의 순서를 확률적으로 섞습니다."""
+        rng = rng or random
         if not isinstance(text, str) or len(text.strip()) == 0:
             return text
 
@@ -252,11 +329,9 @@ class KoreanMutator:
                 continue
 
             # 단어 내 모든 글자가 한글 음절 범위인지 확인 (간단한 체크)
-            is_korean_word = all('가' <= char <= '힣' for char in word)
-
-            if is_korean_word and len(word) > 1 and random.random() < probability:
+            if hangul.is_syllable_word(word) and len(word) > 1 and rng.random() < probability:
                 syllables = list(word)  # 단어를 글자(음절) 리스트로 변환
-                random.shuffle(syllables)  # 음절 순서 섞기
+                rng.shuffle(syllables)  # 음절 순서 섞기
                 mutated_word = "".join(syllables)
                 if mutated_word != word:
                     mutated_words.append(mutated_word)
@@ -273,8 +348,10 @@ class KoreanMutator:
         else:
             return text
         
-    def mutate_spacing_typo(self, text, prob_space=config.DEFAULT_PROB_SPACING, prob_typo=config.DEFAULT_PROB_TYPO):
+    def mutate_spacing_typo(self, text, prob_space=config.DEFAULT_PROB_SPACING, prob_typo=config.DEFAULT_PROB_TYPO,
+                            rng=None):
         """띄어쓰기 오류 및 간단한 오타를 확률적으로 발생시킵니다."""
+        rng = rng or random
         mutated_chars = []
         text_len = len(text)
         i = 0
@@ -282,140 +359,140 @@ class KoreanMutator:
             char = text[i]
             # 오타 적용
             if '가' <= char <= '힣' or 'ㄱ' <= char <= 'ㅎ' or 'ㅏ' <= char <= 'ㅣ':
-                if random.random() < prob_typo and char in self.typo_map:
+                if rng.random() < prob_typo and char in self.typo_map:
                     # typo_map 값 처리 (문자열 또는 리스트 가능)
                     replacement_options = self.typo_map[char]
                     if isinstance(replacement_options, str) and len(replacement_options) > 0:
-                        char = random.choice(replacement_options)
+                        char = rng.choice(replacement_options)
                     elif isinstance(replacement_options, list) and replacement_options:
-                        char = random.choice(replacement_options)
+                        char = rng.choice(replacement_options)
                     # else: char 유지 (매핑 값 없거나 비어있으면)
 
             mutated_chars.append(char)
 
             # 띄어쓰기 오류 적용
             # 1. 다음 문자가 공백인데 확률적으로 붙이기
-            if i + 1 < text_len and text[i+1] == ' ' and random.random() < prob_space:
+            if i + 1 < text_len and text[i+1] == ' ' and rng.random() < prob_space:
                 # mutated_chars.append(char) # 현재 문자 추가
                 i += 1 # 다음 공백 건너뛰기
             # 2. 현재 문자가 공백이 아닌데 확률적으로 공백 추가
-            elif char != ' ' and random.random() < prob_space:
+            elif char != ' ' and rng.random() < prob_space:
                  mutated_chars.append(' ')
 
             i += 1
         return "".join(mutated_chars)
 
-    def mutate_jamo_alter(self, text, probability=config.DEFAULT_PROB_JAMO_ALTER):
+    def _alter_syllable(self, char, rng):
+        """음절 하나의 초성/중성/종성 중 하나를 유사 자모로 변경 (mutate_jamo_alter의 글자 단위 변환)."""
+        # 초성, 중성, 종성 인덱스 분리 (종성 0 = 받침 없음)
+        initial, medial, final = hangul.split_indices(char)
+        part_to_mutate = rng.choice(['initial', 'medial', 'final'])
+
+        # 유사 자모 표의 None은 그 자리에 올 수 없는 자모 (선택되면 원본 유지)
+        if part_to_mutate == 'initial' and self._similar_initial_table.get(initial):
+            replacement = rng.choice(self._similar_initial_table[initial])
+            if replacement is not None: initial = replacement
+        elif part_to_mutate == 'medial' and self._similar_medial_table.get(medial):
+            replacement = rng.choice(self._similar_medial_table[medial])
+            if replacement is not None: medial = replacement
+        elif part_to_mutate == 'final':
+            if final and final in self._similar_final_table: # 기존 종성 변경/삭제
+                if rng.random() < 0.3: # 종성 삭제 확률
+                    final = 0
+                elif self._similar_final_table[final]: # 유사 종성 변경
+                    replacement = rng.choice(self._similar_final_table[final])
+                    if replacement is not None: final = replacement
+            elif not final and rng.random() < 0.3: # 종성 추가 확률
+                final = rng.choice(self._finals_for_addition_indices)
+
+        return hangul.join_indices(initial, medial, final)
+
+    def mutate_jamo_alter(self, text, probability=config.DEFAULT_PROB_JAMO_ALTER, rng=None):
         """음절 내 자모를 확률적으로 *유사한* 자모로 변경 (오타와 유사하지만 더 의미론적)"""
-        if not JAMO_AVAILABLE or not isinstance(text, str):
+        if not isinstance(text, str):
             return text
-        mutated_text = ""
-        for char in text:
-            if '가' <= char <= '힣' and random.random() < probability:
-                try:
-                    decomposed = list(jamo.jamo_to_hcj(jamo.h2j(char))) # 초성, 중성, 종성 분리
-                    initial, medial = decomposed[0], decomposed[1]
-                    final = decomposed[2] if len(decomposed) > 2 else ''
-                    mutated = False
-
-                    part_to_mutate = random.choice(['initial', 'medial', 'final'])
-
-                    if part_to_mutate == 'initial' and initial in self.similar_initials and self.similar_initials[initial]:
-                        replacement = random.choice(self.similar_initials[initial])
-                        if replacement != initial: decomposed[0] = replacement; mutated = True
-                    elif part_to_mutate == 'medial' and medial in self.similar_medials and self.similar_medials[medial]:
-                        replacement = random.choice(self.similar_medials[medial])
-                        if replacement != medial: decomposed[1] = replacement; mutated = True
-                    elif part_to_mutate == 'final':
-                        if final and final in self.similar_finals: # 기존 종성 변경/삭제
-                            if random.random() < 0.3: # 종성 삭제 확률
-                                if len(decomposed) > 2: decomposed.pop(); mutated = True
-                            elif self.similar_finals[final]: # 유사 종성 변경
-                                replacement = random.choice(self.similar_finals[final])
-                                if replacement != final: decomposed[2] = replacement; mutated = True
-                        elif not final and random.random() < 0.3: # 종성 추가 확률
-                            new_final = random.choice(self.finals_for_addition)
-                            decomposed.append(new_final); mutated = True
-
-                    if mutated:
-                        try:
-                            mutated_char = jamo.j2h(decomposed[0], decomposed[1], decomposed[2] if len(decomposed) > 2 else None)
-                            mutated_text += mutated_char
-                        except (ValueError, KeyError): # 잘못된 조합 예외 처리
-                            mutated_text += char # 조합 실패 시 원본 유지
-                    else:
-                        mutated_text += char # 변경 안됐으면 원본 유지
-                except Exception as e:
-                    logger.debug(f"Jamo alteration error for '{char}': {e}")
-                    mutated_text += char # 오류 시 원본 유지
-            else:
-                mutated_text += char
-        return mutated_text
+        return self.apply_char_ops(text, [("mutate_jamo_alter", probability)], rng)[0]
 
-    def decompose_jamo(self, text, probability=config.DEFAULT_PROB_JAMO_DECOMPOSE):
+    def decompose_jamo(self, text, probability=config.DEFAULT_PROB_JAMO_DECOMPOSE, rng=None):
         """텍스트 내 한글 음절을 자모로 분해합니다."""
-        if not JAMO_AVAILABLE or not isinstance(text, str):
+        if not isinstance(text, str):
             return text
-        mutated_text = ""
-        for char in text:
-            if '가' <= char <= '힣' and random.random() < probability:
-                try:
-                    mutated_text += jamo.j2hcj(jamo.h2j(char)) # 예: '한' -> 'ㅎㅏㄴ'
-                except Exception:
-                    mutated_text += char # 오류 시 원본 유지
-            else:
-                mutated_text += char
-        return mutated_text
+        return self.apply_char_ops(text, [("decompose_jamo", probability)], rng)[0] # 예: '한' -> 'ㅎㅏㄴ'
 
     # === mutate_random_syllable 함수는 여기서 제거됨 ===
 
     # --- 새로운 난독화 함수들 (클래스 메소드로 통합) ---
-    def apply_homoglyphs(self, text, probability=config.DEFAULT_PROB_HOMOGLYPH):
+    def apply_homoglyphs(self, text, probability=config.DEFAULT_PROB_HOMOGLYPH, rng=None):
         """주어진 확률에 따라 텍스트 내 한국어 문자를 유사 문자로 치환합니다."""
-        new_text_list = list(text)
-        for i, char in enumerate(new_text_list):
-            if char in self.KOR_TO_HOMOGLYPHS and random.random() < probability:
-                replacement = random.choice(self.KOR_TO_HOMOGLYPHS[char])
-                new_text_list[i] = replacement
-        return "".join(new_text_list)
-
-    def insert_invisible_chars(self, text, probability=config.DEFAULT_PROB_INVISIBLE):
-        """주어진 확률에 따라 텍스트 곳곳에 보이지 않는 문자를 삽입합니다."""
-        new_text = ""
-        for char in text:
-            new_text += char
-            if random.random() < probability:
-                new_text += random.choice(self.INVISIBLE_CHARS)
-        if random.random() < probability * 0.5: # 가끔 시작 부분에도 추가
-            new_text = random.choice(self.INVISIBLE_CHARS) + new_text
-        return new_text
-
-
-
-    def apply_fullwidth(self, text, probability=config.DEFAULT_PROB_FULLWIDTH):
+        return self.apply_char_ops(text, [("apply_homoglyphs", probability)], rng)[0]
+
+    def insert_invisible_chars(self, text, probability=config.DEFAULT_PROB_INVISIBLE, rng=None):
+        """주어진 확률에 따라 텍스트 곳곳에(글자 뒤, 가끔 시작 부분) 보이지 않는 문자를 삽입합니다."""
+        return self.apply_char_ops(text, [("insert_invisible_chars", probability)], rng)[0]
+
+    def apply_fullwidth(self, text, probability=config.DEFAULT_PROB_FULLWIDTH, rng=None):
         """주어진 확률에 따라 텍스트 내 ASCII 문자를 전각 문자로 변환합니다."""
-        new_text_list = list(text)
-        for i, char in enumerate(new_text_list):
-            if char in self.ASCII_TO_FULLWIDTH and random.random() < probability:
-                new_text_list[i] = self.ASCII_TO_FULLWIDTH[char]
-        return "".join(new_text_list)
+        return self.apply_char_ops(text, [("apply_fullwidth", probability)], rng)[0]
+
+    # --- 문자 단위 변형 융합 실행 ---
+    def _build_char_op(self, name, probability):
+        """문자 단위 변형 이름 -> CharOp (대상 글자 패턴 + 글자 변환, 난수는 실행 시 넘겨받는 rng 사용)."""
+        if name == "apply_homoglyphs":
+            return CharOp(name, self._HOMOGLYPH_PATTERN,
+                          lambda char, rng: rng.choice(self.KOR_TO_HOMOGLYPHS[char]), probability)
+        if name == "apply_fullwidth":
+            return CharOp(name, self._FULLWIDTH_PATTERN,
+                          lambda char, rng: self.ASCII_TO_FULLWIDTH[char], probability)
+        if name == "insert_invisible_chars":
+            return CharOp(name, None, lambda char, rng: char + rng.choice(self.INVISIBLE_CHARS), probability,
+                          prefix=lambda rng: (rng.choice(self.INVISIBLE_CHARS)
+                                              if rng.random() < probability * 0.5 else None))
+        if name == "decompose_jamo":
+            return CharOp(name, hangul.SYLLABLE_PATTERN, lambda char, rng: hangul.DECOMPOSE_TABLE[ord(char)],
+                          probability)
+        if name == "mutate_jamo_alter":
+            return CharOp(name, hangul.SYLLABLE_PATTERN, self._alter_syllable, probability)
+        raise ValueError(f"문자 단위 변형이 아닙니다: {name}")
+
+    def compile_char_ops(self, ops):
+        """
+        [(변형 이름, 확률), ...] -> FusedCharKernel (같은 조합은 재사용).
+        변형 이름은 CHAR_OP_DEFAULT_PROBS의 키 (글자 하나를 독립적으로 바꾸는 Low-Level 변형).
+        """
+        key = tuple(ops)
+        kernel = self._char_kernels.get(key)
+        if kernel is None:
+            kernel = FusedCharKernel([self._build_char_op(name, prob) for name, prob in key])
+            self._char_kernels[key] = kernel
+        return kernel
+
+    def apply_char_ops(self, text, ops, rng=None):
+        """
+        문자 단위 변형들을 순서대로 한 번에 적용 (rng가 None이면 전역 random).
+
+        Returns:
+            tuple: (mutated_text, fired) - fired는 실제로 텍스트를 바꾼 변형 이름 목록
+        """
+        return self.compile_char_ops(ops).apply(
+            text, known_positions={hangul.SYLLABLE_PATTERN: self._hangul_positions(text)}, rng=rng)
 
-    def mix_scripts_randomly(self, text, probability=config.DEFAULT_PROB_MIX_SCRIPTS):
+    def mix_scripts_randomly(self, text, probability=config.DEFAULT_PROB_MIX_SCRIPTS, rng=None):
          """주어진 확률에 따라 한국어 텍스트 중간에 다른 스크립트 문자를 삽입/치환합니다."""
+         rng = rng or random
          new_text_list = list(text)
          # 좀 더 다양한 방해 문자 사용 가능
          distractors = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%^&*()_+-=[]{}|;:,.<>/?"
-         # 한글 문자 위치만 대상으로 삼도록 수정 가능 (선택적)
-         indices_to_modify = [i for i, char in enumerate(text) if '가' <= char <= '힣']
+         # 한글 문자 위치만 대상 (시드 원문이면 사전 계산된 위치 사용)
+         indices_to_modify = self._hangul_positions(text)
 
          num_to_modify = int(len(indices_to_modify) * probability)
          # 중복 없이 실제 수정할 인덱스 선택
-         indices_chosen = random.sample(indices_to_modify, min(num_to_modify, len(indices_to_modify)))
+         indices_chosen = rng.sample(indices_to_modify, min(num_to_modify, len(indices_to_modify)))
 
          for i in indices_chosen:
              # 삽입/치환 액션 랜덤 결정
-             action = random.choice(['insert_before', 'insert_after', 'replace'])
-             distractor = random.choice(distractors)
+             action = rng.choice(['insert_before', 'insert_after', 'replace'])
+             distractor = rng.choice(distractors)
              original_char = new_text_list[i] # 원본 문자 저장 (삽입 시 사용)
 
              if action == 'insert_before':
@@ -429,192 +506,204 @@ class KoreanMutator:
          return "".join(new_text_list) # 최종 문자열로 결합
 
 
-    # --- 기존 Medium-Level 변형 함수들 ---
-    def mutate_particles(self, text, probability=config.DEFAULT_PROB_PARTICLES):
+    # --- 기존 Medium-Level 변형 함수들 (토큰 표현 token_ir.TokenText를 제자리에서 수정) ---
+    def build_tokens(self, text):
+        """text의 토큰 표현 (시드 원문이면 시드 인덱스에 정렬해 둔 토큰 사용, 아니면 형태소 분석 후 정렬)."""
+        analysis = self._seed_analysis(text)
+        # 분석기 없이 만든(품사 없는) 템플릿은 분석기가 있으면 쓰지 않음
+        if analysis is not None and analysis.get("tokens") is not None \
+                and (analysis["pos"] is not None or not self.analyzer):
+            return TokenText.from_template(analysis["tokens"], text, analysis["pos"])
+        return TokenText.build(text, self._get_pos(text))
+
+    def _apply_token_op(self, text, op, probability, rng):
+        """문자열 -> 토큰 -> 토큰 변형 op -> 문자열 (단독 호출용, mutate()는 연속된 토큰 변형에 토큰을 공유)."""
+        doc = self.build_tokens(text)
+        return doc.render() if op(doc, probability, rng) else text
+
+    def mutate_particles(self, text, probability=config.DEFAULT_PROB_PARTICLES, rng=None):
         """텍스트 내 조사를 확률적으로 변경하거나 삭제합니다."""
         if not self.analyzer: return text # 형태소 분석기 없으면 실행 불가
-        pos_tags = self._get_pos(text)
-        if not pos_tags: return text
+        return self._apply_token_op(text, self._particles_on, probability, rng)
 
-        mutated_parts = []
+    def _particles_on(self, doc, probability=config.DEFAULT_PROB_PARTICLES, rng=None):
+        """mutate_particles의 토큰 버전: 조사 토큰만 바꾸거나 ''로 삭제 (주변 띄어쓰기 유지). 변경 여부 반환."""
+        if not self.analyzer: return False
+        rng = rng or random
         modified = False
-        original_text_index = 0 # 원본 텍스트 인덱스 추적
-
-        for word, tag in pos_tags:
-            mutated_word = word
-            # 형태소 분석 결과와 원본 텍스트 동기화 시도
-            try:
-                # 현재 단어가 원본 텍스트의 해당 위치에 있는지 확인
-                start_index = text.index(word, original_text_index)
-                original_text_index = start_index + len(word) # 다음 검색 시작 위치 업데이트
-            except ValueError:
-                 # 동기화 실패 (형태소 분석기가 단어를 변경했거나, 중복 단어 문제 등)
-                 # 이 경우, 일단 분석된 단어를 그대로 사용하거나, 복잡한 복구 로직 필요
-                 logger.debug(f"Particle mutation sync failed for word: {word}")
-                 # return text # 동기화 실패 시 안전하게 원본 반환하는 옵션
-                 pass # 일단 계속 진행
-
-            if tag == 'Josa' and word in self.particles_to_mutate:
-                if random.random() < probability:
-                    chosen_particle = random.choice(self.particles_to_mutate[word])
-                    mutated_word = chosen_particle # 삭제는 '' 로 처리됨
-                    if mutated_word != word: modified = True
-
-            mutated_parts.append(mutated_word)
-
-        if modified:
-            # 재조합 로직 개선 필요: 현재는 단순 join이며 띄어쓰기 보장 안됨
-            reassembled = " ".join(filter(None, mutated_parts)) # 빈 문자열 제거 후 join
-            reassembled = re.sub(r'\s+', ' ', reassembled).strip() # 연속 공백 정리
-            return reassembled
-        else:
-            return text
-
-    def mutate_endings(self, text, probability=config.DEFAULT_PROB_ENDINGS):
+        for token in doc.tokens:
+            if token.tag == 'Josa' and token.text in self.particles_to_mutate:
+                if rng.random() < probability:
+                    chosen_particle = rng.choice(self.particles_to_mutate[token.text])
+                    if chosen_particle != token.text: # 삭제는 '' 로 처리됨
+                        token.text = chosen_particle
+                        modified = True
+        return modified
+
+    def mutate_endings(self, text, probability=config.DEFAULT_PROB_ENDINGS, rng=None):
         """문장 끝의 어미를 확률적으로 변경합니다."""
         if not self.analyzer: return text # 형태소 분석기 없으면 실행 어려움
-        # 문장 분리 개선 (마침표, 물음표, 느낌표 기준)
-        sentences = re.split('([.?!])\s*', text) # 구분자 포함 분리 및 뒤 공백 제거
-        if not sentences: return text
-
-        mutated_output = ""
-        possible_endings = sorted(self.endings_to_mutate.keys(), key=len, reverse=True)
-
-        i = 0
-        while i < len(sentences):
-            sentence_part = sentences[i].strip()
-            delimiter = sentences[i+1] if i + 1 < len(sentences) else "" # 구분자
-            i += 2 # 다음 문장 부분으로 이동
-
-            if not sentence_part: continue # 빈 부분은 건너뛰기
+        return self._apply_token_op(text, self._endings_on, probability, rng)
 
-            original_sentence = sentence_part + delimiter # 원본 문장 복원 (어미 비교용)
-            modified = False
+    def _endings_on(self, doc, probability=config.DEFAULT_PROB_ENDINGS, rng=None):
+        """mutate_endings의 토큰 버전: 문장(. ? ! 로 끝나는 토큰까지)마다 끝 어미만 교체. 변경 여부 반환."""
+        if not self.analyzer: return False
+        rng = rng or random
+        modified = False
+        for first, last in doc.sentences():
+            sentence = doc.span_text(first, last)
+            if not sentence: continue # 빈 부분은 건너뛰기
 
-            if random.random() < probability: # 해당 문장에 변형 적용할지 결정
-                for ending in possible_endings:
-                    if original_sentence.endswith(ending):
+            if rng.random() < probability: # 해당 문장에 변형 적용할지 결정
+                for ending in self._endings_by_length:
+                    if sentence.endswith(ending):
                         replacements = self.endings_to_mutate[ending]
                         if replacements:
-                            new_ending = random.choice(replacements)
-                            # 기존 어미 제거 후 새 어미 추가
-                            base_len = len(original_sentence) - len(ending)
-                            sentence_part = original_sentence[:base_len] + new_ending
+                            # 어미는 공백을 포함하지 않으므로 공백 없는 문장 꼬리만 교체됨
+                            doc.replace_tail(first, last, len(ending), rng.choice(replacements))
                             modified = True
                             break # 한 문장에 한 번만 변경
+        return modified
 
-            mutated_output += sentence_part + " " # 결과에 추가하고 공백 삽입
+    def mutate_word_order(self, text, probability=config.DEFAULT_PROB_WORD_ORDER, rng=None):
+        """문장 내 인접한 단어의 순서를 확률적으로 변경합니다."""
+        if not isinstance(text, str) or len(text.strip()) == 0:
+            return text
+        return self._apply_token_op(text, self._word_order_on, probability, rng)
 
-        return mutated_output.strip() # 마지막 공백 제거
+    def _word_order_on(self, doc, probability=config.DEFAULT_PROB_WORD_ORDER, rng=None):
+        """mutate_word_order의 토큰 버전: 인접한 어절을 바꾸고 어절 사이 공백은 제자리에 둠. 변경 여부 반환."""
+        rng = rng or random
+        groups, separators = doc.word_groups()
+        if len(groups) < 2:  # 어절이 2개 미만이면 순서 변경 불가
+            return False
+
+        num_swapped = 0
+        for i in range(len(groups) - 1):
+            # 현재 어절과 다음 어절 모두 비어있지 않을 때만 시도 (토큰이 모두 삭제된 어절 제외)
+            if (_has_text(groups[i]) and _has_text(groups[i + 1])
+                    and rng.random() < probability):
+                groups[i], groups[i + 1] = groups[i + 1], groups[i]
+                num_swapped += 1
+
+        if num_swapped > 0:
+            doc.set_word_groups(groups, separators)
+            logger.debug(
+                f"Word order mutation applied: swapped {num_swapped} pairs.")
+        return num_swapped > 0
 
         # ★★★ 유의어 치환 함수 수정 (유해 키워드 체크 제거) ★★★
     # 기존 유의어 확률 재사용 또는 별도 설정
-    def mutate_synonyms(self, text, probability=config.DEFAULT_PROB_SYNONYM):
+    def mutate_synonyms(self, text, probability=config.DEFAULT_PROB_SYNONYM, rng=None):
         """(통합됨) 내용어를 관련된 단어(유의어, 상위어, 하위어) 중 하나로 확률적으로 치환합니다."""
         if not self.analyzer or not self.korean_thesaurus:
             # Okt 분석기 또는 사전 없으면 실행 불가
             return text
+        rng = rng or random
+        if rng.random() >= probability:
+            return text  # 확률 미달 (형태소 분석/토큰 정렬 생략)
+        doc = self.build_tokens(text)
+        return doc.render() if self._replace_synonym(doc, rng) else text
 
-        pos_tags = self._get_pos(text)
+    def _replace_synonym(self, doc, rng):
+        """
+        mutate_synonyms의 토큰 버전 (확률 판정 후 호출): 원문 형태소 중 사전에 있는 후보 하나를
+        관련 단어로 교체 (해당 토큰만 바뀌므로 띄어쓰기/조사 위치 유지). 변경 여부 반환.
+        """
+        if not self.analyzer or not self.korean_thesaurus:
+            return False
+        pos_tags = doc.pos_tags
         if not pos_tags:
-            return text
+            return False
 
-        candidate_indices = []
-        # 교체 가능한 품사 목록 (명사, 동사, 형용사, 부사 등)
-        replaceable_pos = ['Noun', 'Verb', 'Adjective', 'Adverb']
-
-        for i, (word, tag) in enumerate(pos_tags):
-            if tag in replaceable_pos:
-                # ★ 해당 단어/품사에 대한 관련 단어가 있는지 확인 (get_related_words 활용) ★
-                # 성능을 위해 여기서 미리 체크하거나, 나중에 한 번에 체크 가능
-                # 여기서는 일단 인덱스만 저장
-                if word in self.korean_thesaurus and tag in self.korean_thesaurus[word]:
-                    candidate_indices.append(i)
+        # 유의어 사전에 있는 교체 후보 (시드 원문이면 사전 계산된 후보 사용)
+        analysis = self._seed_analysis(doc.source_text)
+        if analysis is not None and analysis["synonym_candidates"] is not None:
+            candidate_indices = analysis["synonym_candidates"]
+        else:
+            candidate_indices = self.synonym_candidate_indices(pos_tags)
 
         if not candidate_indices:
-            # logger.debug("Related word mutation: No replaceable candidates found in thesaurus.")
-            return text  # 교체 후보 없으면 원본 반환
+            return False  # 교체 후보 없음
 
         original_word, original_tag = "", ""  # except 블록에서 사용 위해 미리 선언
         try:
-            if random.random() < probability:  # 확률 체크
-                idx_to_replace = random.choice(candidate_indices)
-                original_word, original_tag = pos_tags[idx_to_replace]
-
-                # ★ 새로운 헬퍼 함수 호출하여 관련 단어 목록 가져오기 ★
-                related_words = self.get_related_words(
-                    original_word, original_tag)
-
-                if related_words:  # 관련 단어가 하나라도 있으면
-                    chosen_word = random.choice(related_words)
-
-                    # 안전장치: 선택된 단어가 문자열인지 재확인 (get_related_words에서 처리했어야 함)
-                    if not isinstance(chosen_word, str):
-                        logger.warning(
-                            f"Chosen related word is not a string: {chosen_word} (type: {type(chosen_word)}) for word '{original_word}'. Skipping.")
-                        return text
-
-                    logger.debug(
-                        f"Related word mutation: Replacing '{original_word}'({original_tag}) with '{chosen_word}'")
-
-                    # --- 텍스트 재구성 (기존 방식 유지) ---
-                    mutated_parts = []
-                    for i, (word, tag) in enumerate(pos_tags):
-                        if i == idx_to_replace:
-                            mutated_parts.append(chosen_word)
-                        else:
-                            mutated_parts.append(word)
-
-                    reassembled_text = " ".join(filter(None, mutated_parts))
-                    reassembled_text = re.sub(
-                        r'\s+', ' ', reassembled_text).strip()
-                    # !!! 한계점: 조사/어미 자동 변경 안됨은 여전함 !!!
-
-                    logger.info(
-                        f"Related Word Applied: Replaced '{original_word}' with '{chosen_word}'")
-                    return reassembled_text
-                else:
-                    # logger.debug(f"No related words found for '{original_word}'({original_tag})")
-                    return text  # 관련 단어 없으면 원본 반환
-            else:
-                return text  # 확률 미달
+            idx_to_replace = rng.choice(candidate_indices)
+            original_word, original_tag = pos_tags[idx_to_replace]
+            related_words = self.get_related_words(original_word, original_tag)
+            if not related_words:
+                return False  # 관련 단어 없음
+            chosen_word = rng.choice(related_words)
+
+            token = doc.token_for_pos(idx_to_replace)
+            if token is None or token.text != original_word:
+                # 정규화로 원문에 정렬되지 않았거나 앞선 변형이 이미 바꾼 형태소
+                return False
+            logger.debug(
+                f"Related word mutation: Replacing '{original_word}'({original_tag}) with '{chosen_word}'")
+            token.text = chosen_word
+            # !!! 한계점: 조사/어미 자동 변경 안됨은 여전함 !!!
+            logger.info(
+                f"Related Word Applied: Replaced '{original_word}' with '{chosen_word}'")
+            return True
         except Exception as e:
             logger.error(
-                f"Error during related word replacement/reconstruction: Type={type(e)}, Error={e}")
+                f"Error during related word replacement: Type={type(e)}, Error={e}")
             logger.error(traceback.format_exc())
             # 오류 발생 시점의 변수 값 확인
             logger.error(
                 f"Context: original_word='{original_word}', original_tag='{original_tag}'")
-            return text  # 오류 발생 시 원본 반환
-
-
+            return False
 
 
     # --- 기존 High-Level 변형 함수 ---
-    def insert_korean_fillers(self, text, probability=config.DEFAULT_PROB_FILLERS):
+    def insert_korean_fillers(self, text, probability=config.DEFAULT_PROB_FILLERS, rng=None):
         """텍스트의 어절 사이에 확률적으로 필러를 삽입합니다."""
-        words = text.split(' ')
-        if len(words) < 2: return text
-
-        mutated_words = [words[0]] # 첫 단어는 유지
-        for i in range(1, len(words)):
-            # 이전 단어와 현재 단어 사이에 필러 삽입
-            if words[i-1] and words[i] and random.random() < probability:
-                mutated_words.append(random.choice(self.fillers).strip()) # 필러 앞뒤 공백 제거
-            mutated_words.append(words[i])
-
-        # 재조합 시 연속 공백 방지
-        return re.sub(r'\s+', ' ', ' '.join(filter(None, mutated_words))).strip()
+        return self._apply_token_op(text, self._fillers_on, probability, rng)
+
+    def _fillers_on(self, doc, probability=config.DEFAULT_PROB_FILLERS, rng=None):
+        """insert_korean_fillers의 토큰 버전: 어절 사이에 필러 토큰을 삽입 (기존 공백 유지). 변경 여부 반환."""
+        rng = rng or random
+        groups, separators = doc.word_groups()
+        if len(groups) < 2: return False
+
+        new_groups, new_separators = [groups[0]], [separators[0]] # 첫 어절은 유지
+        inserted = False
+        for i in range(1, len(groups)):
+            # 이전 어절과 현재 어절 사이에 필러 삽입
+            if _has_text(groups[i - 1]) and _has_text(groups[i]) and rng.random() < probability:
+                new_groups.append([Token(rng.choice(self.fillers).strip())]) # 필러 앞뒤 공백 제거
+                new_separators.append(" ")
+                inserted = True
+            new_groups.append(groups[i])
+            new_separators.append(separators[i])
+
+        if inserted:
+            doc.set_word_groups(new_groups, new_separators)
+        return inserted
 
     # --- 메인 변형 함수 ---
-    def mutate(self, text):
+    def mutate(self, text, rng=None, medium=None, ops=None):
         """
         다양한 변형을 적용하되, 유의어 변형은 별도로 더 자주 시도하고,
         최종적으로 적용된 변형 목록을 함께 반환합니다.
+
+        Args:
+            text (str): 원본 텍스트
+            rng (random.Random): 모든 변형이 사용할 난수 생성기 (mutation_rng.rng_for). None이면 전역 random.
+            medium (bool): Medium-Level 변형 사용 여부. None이면 지금 형태소 분석기가 준비되었는지로 결정
+                           (재현 시에는 변형 키에 기록된 값을 넘김).
+            ops (list): 적용할 연산자 이름 (operator_scheduler가 골라 변형 키에 기록한 값). None이면 균등 무작위
+                        선택 + 유의어 변형 별도 시도. 주어지면 그 연산자만 순서대로 적용하며 유의어 변형도
+                        ops에 있을 때만 확률 판정 없이 적용 (분석기가 없으면 Medium/High 연산자는 건너뜀).
         """
+        rng = rng or random
+        if medium is None:
+            medium = self.medium_available()
         original_text_for_run = text  # 초기 텍스트 저장
         mutated_text = text
         applied_mutations = []  # 실제로 적용된 변형 함수 이름 기록
+        trace = []  # 연산자별 (이름, 변경 여부, 소요 초) -> self.operator_stats
 
         # 1. 일반 변형 적용 (Low/Medium/High 풀에서 랜덤 선택)
         available_mutation_pool = []
@@ -622,55 +711,132 @@ class KoreanMutator:
         general_medium_funcs = [
             f for f in self.medium_level_funcs if f != self.mutate_synonyms]
 
-        if self.analyzer:
+        def level_of(func):
+            return "L" if func in self.low_level_funcs else ("M" if func in general_medium_funcs else "H")
+
+        doc = None  # 마지막 토큰 단위 변형 뒤의 토큰 표현 (유의어 변형에서 재사용)
+        if medium:
             available_mutation_pool.extend(general_medium_funcs)
             available_mutation_pool.extend(self.high_level_funcs)
         available_mutation_pool.extend(self.low_level_funcs)
 
-        if available_mutation_pool:
-            random.shuffle(available_mutation_pool)
+        funcs_to_apply = []
+        if ops is not None:
+            available_names = {f.__name__ for f in available_mutation_pool}
+            funcs_to_apply = [getattr(self, name) for name in ops if name in available_names]
+        elif available_mutation_pool:
+            rng.shuffle(available_mutation_pool)
             # 적용할 일반 변형 개수 (1~2개 정도로 유지)
-            num_general_mutations_to_apply = random.randint(1, 2)
-            funcs_to_apply = random.sample(available_mutation_pool, min(
+            num_general_mutations_to_apply = rng.randint(1, 2)
+            funcs_to_apply = rng.sample(available_mutation_pool, min(
                 num_general_mutations_to_apply, len(available_mutation_pool)))
 
+        if funcs_to_apply:
             logger.debug(
                 f"Applying {len(funcs_to_apply)} general mutations: {[f.__name__ for f in funcs_to_apply]}")
 
-            for func in funcs_to_apply:
+            i = 0
+            while i < len(funcs_to_apply):
+                # 연속으로 선택된 토큰 단위 변형은 토큰을 한 번만 만들어 함께 적용
+                token_run = []
+                while (i + len(token_run) < len(funcs_to_apply)
+                       and funcs_to_apply[i + len(token_run)].__name__ in self.TOKEN_OPS):
+                    token_run.append(funcs_to_apply[i + len(token_run)])
+                if token_run:
+                    original_text_before_func = mutated_text
+                    applied_before = len(applied_mutations)
+                    run_trace = []
+                    try:
+                        start = time.perf_counter()
+                        doc = self.build_tokens(mutated_text)
+                        shared_sec = time.perf_counter() - start
+                        for func in token_run:
+                            name = f"{level_of(func)}:{func.__name__}"
+                            start = time.perf_counter()
+                            changed = getattr(self, self.TOKEN_OPS[func.__name__])(doc, rng=rng)
+                            run_trace.append([name, changed, time.perf_counter() - start])
+                            if changed:
+                                applied_mutations.append(name)
+                        start = time.perf_counter()
+                        mutated_text = doc.render()
+                        shared_sec += time.perf_counter() - start
+                        # 토큰 생성/렌더링 시간은 함께 적용된 연산자에 균등 배분
+                        for item in run_trace:
+                            item[2] += shared_sec / len(run_trace)
+                    except Exception as e:
+                        logger.error(f"Token mutations {[f.__name__ for f in token_run]} failed: {e}")
+                        mutated_text = original_text_before_func  # 오류 시 복구
+                        del applied_mutations[applied_before:]
+                        run_trace = [[name, False, sec] for name, _, sec in run_trace]
+                        doc = None
+                    trace.extend(run_trace)
+                    i += len(token_run)
+                    continue
+                doc = None  # 문자열 단위 변형이 적용되면 토큰 표현은 더 이상 텍스트와 일치하지 않음
+
+                # 연속으로 선택된 문자 단위 변형은 한 번의 순회로 함께 적용
+                run = []
+                while (i + len(run) < len(funcs_to_apply)
+                       and funcs_to_apply[i + len(run)].__name__ in self.CHAR_OP_DEFAULT_PROBS):
+                    run.append(funcs_to_apply[i + len(run)].__name__)
+                if len(run) > 1:
+                    original_text_before_func = mutated_text
+                    fired = ()
+                    start = time.perf_counter()
+                    try:
+                        mutated_text, fired = self.apply_char_ops(
+                            mutated_text, [(name, self.CHAR_OP_DEFAULT_PROBS[name]) for name in run], rng)
+                        applied_mutations.extend(f"L:{name}" for name in fired)
+                    except Exception as e:
+                        logger.error(f"Fused character mutations {run} failed: {e}")
+                        mutated_text = original_text_before_func  # 오류 시 복구
+                    # 한 번의 순회로 함께 적용되므로 소요 시간은 균등 배분
+                    run_sec = (time.perf_counter() - start) / len(run)
+                    trace.extend((f"L:{name}", name in fired, run_sec) for name in run)
+                    i += len(run)
+                    continue
+
+                func = funcs_to_apply[i]
+                i += 1
                 original_text_before_func = mutated_text
+                start = time.perf_counter()
                 try:
-                    mutated_text = func(mutated_text)
-                    if mutated_text != original_text_before_func:
-                        level = "L" if func in self.low_level_funcs else (
-                            "M" if func in general_medium_funcs else "H")
-                        applied_mutations.append(f"{level}:{func.__name__}")
+                    mutated_text = func(mutated_text, rng=rng)
                 except Exception as e:
                     logger.error(
                         f"General mutation function {func.__name__} failed: {e}")
                     mutated_text = original_text_before_func  # 오류 시 복구
+                name = f"{level_of(func)}:{func.__name__}"
+                changed = mutated_text != original_text_before_func
+                trace.append((name, changed, time.perf_counter() - start))
+                if changed:
+                    applied_mutations.append(name)
 
         # 2. ★★★ 유의어 변형 별도 시도 (더 높은 내부 확률 적용) ★★★
-        if self.analyzer and self.korean_thesaurus:  # 사전 로드 확인
+        # (스케줄러가 연산자를 고른 경우에는 ops에 있을 때만 시도)
+        if medium and self.korean_thesaurus and (ops is None or "mutate_synonyms" in ops):  # 사전 로드 확인
             original_text_before_synonym = mutated_text
             try:
-                # mutate_synonyms 함수를 직접 호출 (내부 확률은 config 값 사용 - 이미 높여둠)
-                mutated_text = self.mutate_synonyms(
-                    mutated_text)  # probability 인자는 config 기본값 사용
-                if mutated_text != original_text_before_synonym:
-                    # 성공적으로 적용되었으면 목록에 추가
-                    applied_mutations.append(
-                        f"M:mutate_synonyms")  # Medium 레벨로 가정
+                # 확률을 먼저 뽑고(내부 확률은 config 값), 직전 토큰 단위 변형의 토큰 표현이 있으면 재분석 없이 재사용
+                if ops is not None or rng.random() < config.DEFAULT_PROB_SYNONYM:
+                    start = time.perf_counter()
+                    doc = doc or self.build_tokens(mutated_text)
+                    if self._replace_synonym(doc, rng):
+                        mutated_text = doc.render()
+                        applied_mutations.append("M:mutate_synonyms")  # Medium 레벨로 가정
+                    trace.append(("M:mutate_synonyms", mutated_text != original_text_before_synonym,
+                                  time.perf_counter() - start))
             except Exception as e:
                 logger.error(f"Synonym mutation function failed: {e}")
                 mutated_text = original_text_before_synonym  # 오류 시 복구
+        self.operator_stats.record_trace(trace)
 
         # 최종 로깅
         if applied_mutations:
             logger.info(f"Applied mutations: {', '.join(applied_mutations)}")
         else:
             # 유의어 변형만 시도되었지만 확률적으로 실패한 경우도 있으므로 로그 조정
-            if not available_mutation_pool and (self.analyzer and self.korean_thesaurus):
+            if not available_mutation_pool and (medium and self.korean_thesaurus):
                 logger.debug(
                     "Only synonym mutation was attempted but did not apply due to probability.")
             else:
@@ -680,6 +846,48 @@ class KoreanMutator:
         # ★★★ 변형된 텍스트와 함께 적용된 변형 목록 반환 ★★★
         return mutated_text, applied_mutations
 
+    def mutate_batch(self, text, n, max_attempts=None, key=None):
+        """
+        같은 텍스트에서 서로 다른 변형 결과를 최대 n개 생성합니다.
+        원본의 분석 결과(형태소, 한글 음절 위치, 문장 분리)는 한 번만 계산해 모든 변형이 공유합니다.
+
+        Args:
+            text (str): 원본 텍스트 (보통 시드 원문)
+            n (int): 생성할 변형 개수
+            max_attempts (int): 최대 mutate() 시도 횟수. None이면 n * config.MUTATE_BATCH_ATTEMPT_FACTOR.
+            key (dict): 선택. 변형 키 (mutation_rng.mutation_key). 주어지면 시도마다 attempt를 바꾼 키의
+                        난수 생성기로 변형하며, medium 값은 배치 시작 시점의 분석기 상태로 채웁니다.
+                        키에 ops(스케줄러가 고른 연산자)가 있으면 모든 시도가 같은 연산자를 사용합니다.
+
+        Returns:
+            list: (mutated_text, applied_mutations, mutation_key) 튜플 리스트 (key가 없으면 mutation_key는 None).
+                  원본과 같거나 중복인 결과는 제외되므로 시도 횟수 안에 n개를 채우지 못하면 더 적을 수 있습니다.
+        """
+        if max_attempts is None:
+            max_attempts = n * config.MUTATE_BATCH_ATTEMPT_FACTOR
+        medium = self.medium_available()
+        shared = None
+        if self._seed_analysis(text) is None:
+            shared = (text, analyze_seed(text, self))
+        self._batch_local.analysis = shared
+        try:
+            results = []
+            seen = {text}
+            for attempt in range(max_attempts):
+                if len(results) >= n:
+                    break
+                attempt_key = dict(key, attempt=attempt, medium=medium) if key is not None else None
+                mutated_text, applied_mutations = self.mutate(
+                    text, rng=rng_for(attempt_key) if attempt_key is not None else None, medium=medium,
+                    ops=key.get("ops") if key is not None else None)
+                if mutated_text in seen:
+                    continue
+                seen.add(mutated_text)
+                results.append((mutated_text, applied_mutations, attempt_key))
+            return results
+        finally:
+            self._batch_local.analysis = None
+
 # --- 모듈 테스트용 코드 (선택적) ---
 if __name__ == '__main__':
     logging.basicConfig(level=logging.DEBUG, format=config.LOG_FORMAT)
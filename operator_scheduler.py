@@ -0,0 +1,151 @@
+# operator_scheduler.py
+# 변형 연산자 스케줄러: 모델별로 어떤 연산자가 LLM 시간당 POTENTIAL_SUCCESS를 많이 내는지 학습해 다음 변형의
+# 연산자를 고릅니다 (Thompson 샘플링). 연산자마다 "LLM 1초당 성공 수" λ를 Gamma-Poisson 모델로 추정하고,
+# 매 변형마다 각 연산자의 λ를 사후분포에서 하나씩 뽑아 큰 순서로 1~2개를 선택합니다.
+# 선택한 연산자는 변형 키의 ops에 기록되므로 스케줄러 상태와 무관하게 replay.py로 그대로 재현되며,
+# 학습 상태는 모델별 JSON 파일(fuzz_core.build_scheduler_path)에 저장되어 다음 실행에서 이어집니다.
+import json
+import logging
+import os
+import random
+import threading
+
+import config
+from judge import LLM_ERROR_VERDICT
+
+logger = logging.getLogger(__name__)
+
+STATE_VERSION = 1
+
+
+class OperatorScheduler:
+    """
+    연산자(팔) 이름 -> [선택 수, 성공 수, LLM 초] 누적과 Thompson 샘플링 선택 (여러 스레드에서 사용 가능).
+    선택한 모든 연산자가 해당 프롬프트의 LLM 시간과 성공을 함께 나눠 받습니다 (조합 단위가 아닌 연산자 단위 학습).
+    """
+
+    def __init__(self, arms, medium_arms=(), path=None, seed=None, state=None):
+        """
+        Args:
+            arms (list): 전체 연산자 이름 (KoreanMutator.operator_names())
+            medium_arms: 형태소 분석기가 있어야 하는 연산자 이름 (분석기 준비 전에는 선택하지 않음)
+            path (str): 학습 상태 파일 경로 (None이면 저장하지 않음)
+            seed: 선택용 난수 시드 (보통 실행 시드)
+            state (dict): 이전 실행의 연산자별 누적값 {이름: {"pulls", "successes", "llm_sec"}}
+        """
+        self.arms = list(arms)
+        self.medium_arms = set(medium_arms)
+        self.path = path
+        self.prior_successes = config.SCHEDULER_PRIOR_SUCCESSES
+        self.prior_llm_sec = config.SCHEDULER_PRIOR_LLM_SEC
+        self._stats = {arm: [0, 0, 0.0] for arm in self.arms}
+        for arm, saved in (state or {}).items():
+            if arm in self._stats:  # 더 이상 없는 연산자의 기록은 버림
+                self._stats[arm] = [saved["pulls"], saved["successes"], saved["llm_sec"]]
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path, arms, medium_arms=(), seed=None):
+        """저장된 상태가 있으면 이어서, 없거나 읽을 수 없으면 사전분포에서 시작."""
+        state = None
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get("version") == STATE_VERSION:
+                    state = data.get("arms")
+            except (IOError, json.JSONDecodeError) as e:
+                logger.warning(f"스케줄러 상태 로드 실패 ({path}): {e}. 새로 시작합니다.")
+        scheduler = cls(arms, medium_arms, path, seed, state)
+        if state:
+            logger.info(f"스케줄러 상태 로드: {path} (누적 선택 {scheduler.total_pulls()}회)")
+        return scheduler
+
+    def total_pulls(self):
+        with self._lock:
+            return sum(pulls for pulls, _, _ in self._stats.values())
+
+    # --- 선택 ---
+    def choose(self, medium=True):
+        """다음 변형에 적용할 연산자 이름 1~2개 (사후분포 샘플이 큰 순서)."""
+        with self._lock:
+            candidates = [arm for arm in self.arms if medium or arm not in self.medium_arms]
+            if not candidates:
+                return []
+            count = min(self._rng.randint(1, 2), len(candidates))
+            samples = []
+            for arm in candidates:
+                _, successes, llm_sec = self._stats[arm]
+                # λ ~ Gamma(α0 + 성공 수, 1 / (β0 + LLM 초)): 큰 값을 뽑은 연산자일수록 우선
+                rate = self._rng.gammavariate(self.prior_successes + successes,
+                                              1.0 / (self.prior_llm_sec + llm_sec))
+                samples.append((rate, arm))
+            samples.sort(reverse=True)
+            return [arm for _, arm in samples[:count]]
+
+    def assign(self, key, medium=True):
+        """변형 키에 선택한 연산자(ops)를 기록한 새 키."""
+        return dict(key, ops=self.choose(medium))
+
+    # --- 학습 ---
+    def update(self, ops, judgment_result, llm_duration):
+        """
+        판정 결과 반영. LLM 호출 실패는 연산자와 무관하므로 반영하지 않음.
+
+        Args:
+            ops (list): 변형 키의 ops (선택된 연산자)
+            judgment_result (str): 판정 결과
+            llm_duration (float): 이 프롬프트의 LLM 시간 (초)
+        """
+        if not ops or judgment_result == LLM_ERROR_VERDICT:
+            return
+        success = "SUCCESS" in judgment_result
+        with self._lock:
+            for arm in ops:
+                stats = self._stats.get(arm)
+                if stats is None:
+                    continue
+                stats[0] += 1
+                stats[1] += success
+                stats[2] += llm_duration
+
+    # --- 저장/보고 ---
+    def summary(self):
+        """연산자별 누적값과 사후 평균 (시간당 성공 수, run_stats에 기록)."""
+        with self._lock:
+            return {
+                arm: {
+                    "pulls": pulls,
+                    "successes": successes,
+                    "llm_sec": round(llm_sec, 2),
+                    "successes_per_hour": round(
+                        3600 * (self.prior_successes + successes) / (self.prior_llm_sec + llm_sec), 3),
+                }
+                for arm, (pulls, successes, llm_sec) in self._stats.items()
+            }
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = {
+                "version": STATE_VERSION,
+                "arms": {arm: {"pulls": pulls, "successes": successes, "llm_sec": llm_sec}
+                         for arm, (pulls, successes, llm_sec) in self._stats.items()},
+            }
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=4)
+            os.replace(tmp_path, self.path)
+            logger.info(f"스케줄러 상태 저장 완료: {self.path}")
+        except (IOError, OSError) as e:
+            logger.error(f"스케줄러 상태 저장 실패 {self.path}: {e}")
+
+
+def build_scheduler(mutator, path, seed=None):
+    """config.OPERATOR_SCHEDULER가 "thompson"이면 스케줄러, "uniform"이면 None (기존 균등 선택)."""
+    if config.OPERATOR_SCHEDULER != "thompson":
+        return None
+    return OperatorScheduler.load(path, mutator.operator_names(), mutator.medium_operator_names(), seed)
@@ -0,0 +1,51 @@
+# operator_stats.py
+# 변형 연산자별 비용 집계: 호출 수, 실제로 텍스트를 바꾼 횟수, 소요 시간(초).
+# KoreanMutator.mutate()가 호출 1회의 기록(trace)을 모아 한 번에 넘기므로 락은 mutate 1회당 한 번만 잡습니다.
+# 연산자 이름은 applied_mutations와 같은 "레벨:함수명" 형식이라 run_stats.RunStats가 로그 항목의
+# 하류 결과(성공, LLM 시간)와 그대로 이어 붙입니다. 변형 서비스 워커의 기록은 작업 결과와 함께 부모로 합쳐집니다.
+import threading
+
+
+class OperatorStats:
+    """연산자 이름 -> [calls, changed, sec] 누적 (여러 스레드에서 기록 가능)."""
+
+    def __init__(self):
+        self._ops = {}
+        self._lock = threading.Lock()
+
+    def record_trace(self, trace):
+        """mutate() 1회의 기록 [(연산자 이름, 변경 여부, 소요 초), ...] 누적."""
+        if not trace:
+            return
+        with self._lock:
+            for name, changed, sec in trace:
+                counters = self._ops.get(name)
+                if counters is None:
+                    counters = self._ops[name] = [0, 0, 0.0]
+                counters[0] += 1
+                counters[1] += changed
+                counters[2] += sec
+
+    def merge(self, snapshot):
+        """다른 집계기의 snapshot()/drain() 결과를 더함 (변형 서비스 워커 -> 부모)."""
+        if not snapshot:
+            return
+        with self._lock:
+            for name, (calls, changed, sec) in snapshot.items():
+                counters = self._ops.get(name)
+                if counters is None:
+                    counters = self._ops[name] = [0, 0, 0.0]
+                counters[0] += calls
+                counters[1] += changed
+                counters[2] += sec
+
+    def snapshot(self):
+        """{연산자 이름: (calls, changed, sec)}"""
+        with self._lock:
+            return {name: tuple(counters) for name, counters in self._ops.items()}
+
+    def drain(self):
+        """snapshot()을 반환하고 집계를 비움 (워커가 작업마다 부모에 넘길 증분)."""
+        with self._lock:
+            ops, self._ops = self._ops, {}
+        return {name: tuple(counters) for name, counters in ops.items()}
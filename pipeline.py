@@ -0,0 +1,253 @@
+# pipeline.py
+# 단계별 생산자/소비자 파이프라인 엔진: 변형 → 생성 → 평가 → 기록
+# 각 단계는 자체 워커 스레드 수를 갖고, 단계 사이의 큐 크기가 제한되어(backpressure)
+# 앞 단계가 너무 앞서가지 않으면서도 CPU 변형 작업과 GPU 생성이 겹쳐서 진행됩니다.
+import logging
+import queue
+import threading
+import time
+
+import config
+from fuzz_core import (JsonlLogWriter, apply_dedup_feedback, apply_scheduler_feedback, apply_seed_feedback,
+                       build_log_entry, get_seed_weight_after, timed_generate, timed_judge, timed_mutate,
+                       timed_mutate_batch)
+from mutation_rng import mutation_key, new_run_seed
+
+logger = logging.getLogger(__name__)
+
+# 단계 종료 신호 (워커 하나당 하나씩 전달)
+_STOP = object()
+
+
+class FuzzPipeline:
+    """
+    mutate → generate → judge → write 4단계 파이프라인.
+    SeedManager 접근(선택/가중치 업데이트)은 내부 락으로 직렬화합니다.
+    """
+
+    def __init__(self, seed_manager, mutator, all_log_filepath, max_iterations=None,
+                 mutate_workers=None, generate_workers=None, judge_workers=None, queue_size=None,
+                 run_stats=None, dedup_filter=None, run_seed=None, mutation_service=None, scheduler=None):
+        self.seed_manager = seed_manager
+        self.scheduler = scheduler  # operator_scheduler.OperatorScheduler (None이면 균등 무작위 연산자 선택)
+        self.run_seed = run_seed if run_seed is not None else new_run_seed()
+        self.run_stats = run_stats
+        self.dedup_filter = dedup_filter
+        self.mutator = mutator
+        # 변형 서비스(mutation_service.MutationService)가 있으면 변형은 워커 프로세스에서 수행
+        self.mutation_service = mutation_service
+        self.all_log_filepath = all_log_filepath
+        self.max_iterations = max_iterations if max_iterations is not None else config.MAX_ITERATIONS
+        self.workers = {
+            # 변형 서비스 사용 시 워커 프로세스마다 요청을 넣고 기다리는 스레드 하나씩
+            "mutate": max(1, mutate_workers or (mutation_service.workers if mutation_service is not None
+                                                else config.PIPELINE_MUTATE_WORKERS)),
+            "generate": max(1, generate_workers or config.PIPELINE_GENERATE_WORKERS),
+            "judge": max(1, judge_workers or config.PIPELINE_JUDGE_WORKERS),
+            "write": 1,  # 파일 기록 순서 보장을 위해 단일 스레드
+        }
+        queue_size = queue_size or config.PIPELINE_QUEUE_SIZE
+        # 각 단계의 입력 큐 (mutate 단계는 반복 번호 카운터에서 직접 작업을 가져옴)
+        self.queues = {
+            "generate": queue.Queue(maxsize=queue_size),
+            "judge": queue.Queue(maxsize=queue_size),
+            "write": queue.Queue(maxsize=queue_size),
+        }
+        self.successful_prompts = []
+        self._seed_lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+        self._next_iteration = 0
+        self._completed = 0
+
+    # --- 상태 조회 ---
+    def queue_depths(self):
+        """단계별 입력 큐에 쌓인 항목 수."""
+        return {stage: q.qsize() for stage, q in self.queues.items()}
+
+    # --- 단계 구현 ---
+    def _claim_iteration(self):
+        with self._counter_lock:
+            if self._next_iteration >= self.max_iterations:
+                return None
+            self._next_iteration += 1
+            return self._next_iteration
+
+    def _mutate_seed(self, original_seed_text, key):
+        """
+        시드 하나의 변형 목록 [(mutated_prompt, applied_mutation_names, mutate_cpu_sec, mutation_key), ...].
+        MUTATE_BATCH_SIZE > 1이면 mutate_batch로 서로 다른 변형을 한 번에 만듭니다 (키는 시도 번호로 구분).
+        중복 제거로 남은 변형이 없으면 mutated_prompt가 None인 항목 하나 (해당 반복은 건너뜀).
+        """
+        service = self.mutation_service
+        try:
+            if config.MUTATE_BATCH_SIZE > 1:
+                if service is not None:
+                    mutants, mutate_cpu_sec = service.timed_mutate_batch(
+                        original_seed_text, config.MUTATE_BATCH_SIZE, self.dedup_filter, key)
+                else:
+                    mutants, mutate_cpu_sec = timed_mutate_batch(
+                        self.mutator, original_seed_text, config.MUTATE_BATCH_SIZE, self.dedup_filter, key)
+                return ([(prompt, applied, mutate_cpu_sec, mutant_key) for prompt, applied, mutant_key in mutants]
+                        or [(None, [], mutate_cpu_sec, None)])
+            if service is not None:
+                return [service.timed_mutate(original_seed_text, self.dedup_filter, key)]
+            return [timed_mutate(self.mutator, original_seed_text, self.dedup_filter, key)]
+        except Exception as e:
+            logger.error(f"변형 실패: {e}")
+            return [(original_seed_text, [], 0.0, None)]
+
+    def _mutate_worker(self):
+        pending = []  # 현재 시드에서 만든 변형 중 아직 큐에 넣지 않은 것
+        selected_seed_info = None
+        while True:
+            iteration = self._claim_iteration()
+            if iteration is None:
+                return
+            iteration_start_time = time.time()
+            if not pending:
+                with self._seed_lock:
+                    selected_seed_info = self.seed_manager.select_seed()
+                if selected_seed_info is None:
+                    return
+                # 배치 변형의 키에는 배치를 만든 반복 번호가 들어감 (로그의 iteration과 다를 수 있음)
+                key = mutation_key(self.run_seed, iteration, selected_seed_info['id'])
+                if self.scheduler is not None:
+                    key = self.scheduler.assign(key, self.mutator.medium_available())
+                pending = self._mutate_seed(selected_seed_info['seed'], key)
+            original_seed_text = selected_seed_info['seed']
+            mutated_prompt, applied_mutation_names, mutate_cpu_sec, mutation_key_used = pending.pop(0)
+            if mutated_prompt is None:
+                logger.info(f"[{iteration}/{self.max_iterations}] 중복 변형만 생성되어 LLM 호출 없이 건너뜁니다.")
+                continue
+            if original_seed_text == mutated_prompt:
+                logger.info(f"[{iteration}/{self.max_iterations}] 변형이 적용되지 않았습니다.")
+            # 큐가 가득 차면 여기서 대기 (backpressure)
+            self.queues["generate"].put({
+                "iteration": iteration,
+                "iteration_start_time": iteration_start_time,
+                "seed_info": selected_seed_info,
+                "mutated_prompt": mutated_prompt,
+                "applied_mutations": applied_mutation_names,
+                "mutate_cpu_sec": mutate_cpu_sec,
+                "mutation_key": mutation_key_used,
+            })
+
+    def _generate_worker(self):
+        while True:
+            item = self.queues["generate"].get()
+            if item is _STOP:
+                return
+            try:
+                llm_response, llm_duration, call_info = timed_generate(
+                    config.TARGET_MODEL, item["mutated_prompt"], item["seed_info"]['seed'])
+            except Exception as e:
+                # 워커 스레드가 죽으면 파이프라인이 멈추므로 LLM 오류로 처리하고 계속 진행
+                logger.error(f"[{item['iteration']}] LLM 호출 중 예외 발생: {e}")
+                llm_response, llm_duration, call_info = None, 0.0, {"llm_error": "unexpected"}
+            logger.info(
+                f"[{item['iteration']}/{self.max_iterations}] LLM 응답 수신 완료 ({llm_duration:.2f}초)")
+            item.update(llm_response=llm_response, llm_duration=llm_duration, call_info=call_info)
+            self.queues["judge"].put(item)
+
+    def _judge_worker(self):
+        while True:
+            item = self.queues["judge"].get()
+            if item is _STOP:
+                return
+            try:
+                result = self._judge_item(item)
+            except Exception as e:
+                # 워커 스레드가 죽으면 앞 단계 큐가 가득 차 파이프라인이 멈추므로 해당 항목만 버리고 계속 진행
+                logger.error(f"[{item['iteration']}] 평가/로그 항목 생성 중 예외 발생: {e}")
+                continue
+            self.queues["write"].put(result)
+
+    def _judge_item(self, item):
+        """평가, 가중치/스케줄러 반영 후 (log_entry, is_success)."""
+        seed_id = item["seed_info"]['id']
+        original_seed_text = item["seed_info"]['seed']
+        judgment_result, judge_cpu_sec = timed_judge(original_seed_text, item["llm_response"])
+        logger.info(f"[{item['iteration']}/{self.max_iterations}] 평가 결과: {judgment_result}")
+        apply_dedup_feedback(self.dedup_filter, item["mutated_prompt"], judgment_result)
+        with self._seed_lock:
+            is_success = apply_seed_feedback(self.seed_manager, seed_id, judgment_result)
+            apply_scheduler_feedback(self.scheduler, item["mutation_key"], judgment_result, item["llm_duration"])
+            seed_weight_after = get_seed_weight_after(self.seed_manager, seed_id)
+        log_entry = build_log_entry(
+            item["iteration"], seed_id, original_seed_text, item["mutated_prompt"],
+            item["applied_mutations"], item["llm_response"], judgment_result,
+            item["llm_duration"], time.time() - item["iteration_start_time"],
+            config.TARGET_MODEL, seed_weight_after,
+            extra_fields={**item["call_info"], "mutate_cpu_sec": item["mutate_cpu_sec"],
+                          "judge_cpu_sec": judge_cpu_sec, "mutation_key": item["mutation_key"]})
+        return log_entry, is_success
+
+    def _write_worker(self, writer):
+        while True:
+            item = self.queues["write"].get()
+            if item is _STOP:
+                return
+            try:
+                self._write_item(writer, *item)
+            except Exception as e:
+                logger.error(f"로그 항목 기록 중 예외 발생: {e}")
+
+    def _write_item(self, writer, log_entry, is_success):
+        writer.write(log_entry)
+        if self.run_stats is not None:
+            self.run_stats.record(log_entry)
+        self._completed += 1
+        if is_success:
+            logger.warning(
+                f"★★★ 잠재적 탈옥 발견! (반복 {log_entry['iteration']}, 시드 ID {log_entry['seed_id']}) ★★★")
+            self.successful_prompts.append(log_entry)
+        if self._completed % 10 == 0:
+            logger.info(
+                f"진행: {self._completed}/{self.max_iterations}, 현재 성공 건수: "
+                f"{len(self.successful_prompts)}, 큐 깊이: {self.queue_depths()}")
+
+    # --- 실행 ---
+    def _start_stage(self, stage, target, args=()):
+        threads = [threading.Thread(target=target, args=args, name=f"pipeline-{stage}-{i}", daemon=True)
+                   for i in range(self.workers[stage])]
+        for t in threads:
+            t.start()
+        return threads
+
+    def _finish_stage(self, threads, next_stage):
+        """앞 단계 워커가 모두 끝나면 다음 단계 워커 수만큼 종료 신호 전달."""
+        for t in threads:
+            t.join()
+        for _ in range(self.workers[next_stage]):
+            self.queues[next_stage].put(_STOP)
+
+    def run(self):
+        """
+        파이프라인을 끝까지 실행합니다.
+
+        Returns:
+            list: 성공(POTENTIAL_SUCCESS) 로그 항목 리스트.
+        """
+        logger.info(f"파이프라인 워커 수: {self.workers}, 큐 크기: {self.queues['generate'].maxsize}")
+        # 로그 파일을 열 수 없으면 다른 단계를 시작하기 전에 여기서 예외로 끝냄 (writer가 없으면 큐가 막힘)
+        with JsonlLogWriter(self.all_log_filepath) as writer:
+            stage_threads = {
+                "write": self._start_stage("write", self._write_worker, (writer,)),
+                "judge": self._start_stage("judge", self._judge_worker),
+                "generate": self._start_stage("generate", self._generate_worker),
+                "mutate": self._start_stage("mutate", self._mutate_worker),
+            }
+            self._finish_stage(stage_threads["mutate"], "generate")
+            self._finish_stage(stage_threads["generate"], "judge")
+            self._finish_stage(stage_threads["judge"], "write")
+            for t in stage_threads["write"]:
+                t.join()
+        return self.successful_prompts
+
+
+def run_pipeline_fuzz(seed_manager, mutator, all_log_filepath, max_iterations=None, run_stats=None,
+                      dedup_filter=None, run_seed=None, mutation_service=None, scheduler=None):
+    """main에서 파이프라인 엔진을 실행하는 진입점."""
+    return FuzzPipeline(seed_manager, mutator, all_log_filepath, max_iterations,
+                        run_stats=run_stats, dedup_filter=dedup_filter, run_seed=run_seed,
+                        mutation_service=mutation_service, scheduler=scheduler).run()
@@ -0,0 +1,77 @@
+# pos_cache.py
+# 형태소 분석(Okt.pos) 결과 캐시
+# 같은 시드가 수천 번 재사용되고 한 번의 mutate() 안에서도 같은 텍스트를 여러 변형 함수가 다시 분석하므로,
+# (텍스트, 옵션) 키로 결과를 재사용해 JVM(JNI) 왕복을 줄입니다.
+import collections
+import logging
+import threading
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class PosCache:
+    """
+    크기 제한 LRU 캐시 (스레드 간 공유 가능).
+    키: (text, norm, stem), 값: 변경 불가능한 (형태소, 품사) 튜플의 튜플.
+    """
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries if max_entries is not None else config.POS_CACHE_MAX_ENTRIES
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_analyze(self, analyzer, text, norm=True, stem=False):
+        """
+        캐시된 분석 결과 반환, 없으면 analyzer.pos로 분석 후 저장.
+        분석 중 예외는 호출자에게 그대로 전달 (실패 결과는 캐시하지 않음).
+        """
+        key = (text, norm, stem)
+        with self._lock:
+            pos_tags = self._entries.get(key)
+            if pos_tags is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return pos_tags
+            self.misses += 1
+
+        # 분석은 락 밖에서 수행 (같은 키를 동시에 분석하는 경우 결과가 같으므로 나중 것이 덮어씀)
+        pos_tags = tuple(analyzer.pos(text, norm=norm, stem=stem))
+        if self.max_entries:
+            with self._lock:
+                self._entries[key] = pos_tags
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return pos_tags
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else None,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_pos_cache = None
+_pos_cache_lock = threading.Lock()
+
+
+def get_pos_cache():
+    """프로세스 전체에서 공유하는 형태소 분석 캐시 (최초 호출 시 생성)."""
+    global _pos_cache
+    if _pos_cache is None:
+        with _pos_cache_lock:
+            if _pos_cache is None:
+                _pos_cache = PosCache()
+    return _pos_cache
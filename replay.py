@@ -0,0 +1,90 @@
+# replay.py
+# all_log 파일의 mutation_key로 변형 프롬프트를 다시 만들어 기록된 프롬프트와 비교합니다 (LLM 호출 없음).
+# 키가 같으면 실행/프로세스와 무관하게 같은 변형이 나와야 하므로, 불일치가 있으면 종료 코드 1을 반환합니다.
+# --output을 주면 재생성한 프롬프트를 JSONL로 저장해 다른 모델/설정에서 같은 입력으로 벤치마크할 수 있습니다.
+#
+# 실행 예: python replay.py fuzz_results_phase1/all_log_cogito_20250101_120000.jsonl --output replayed.jsonl
+import argparse
+import json
+import logging
+import sys
+import time
+
+import config
+from fuzz_core import load_log_entries
+from mutation_rng import rng_for
+
+logger = logging.getLogger("Replay")
+
+
+def replay_entries(entries, mutator):
+    """
+    로그 항목마다 mutation_key로 변형을 재생성.
+
+    Returns:
+        tuple: (report, replayed) - replayed는 {iteration, seed_id, mutation_key, mutated_prompt, applied_mutations} 목록
+    """
+    report = {"entries": len(entries), "replayed": 0, "matched": 0, "mismatched": 0,
+              "no_key": 0, "unreplayable": 0, "mutate_cpu_sec": 0.0, "mismatches": []}
+    replayed = []
+    for entry in entries:
+        key = entry.get("mutation_key")
+        if not key:
+            report["no_key"] += 1
+            continue
+        if key["medium"] and not mutator.medium_available():
+            # Medium-Level 변형이 켜진 상태에서 만든 변형은 형태소 분석기 없이 재현할 수 없음
+            report["unreplayable"] += 1
+            continue
+        cpu_start = time.thread_time()
+        mutated_prompt, applied_mutations = mutator.mutate(
+            entry["original_seed"], rng=rng_for(key), medium=key["medium"], ops=key.get("ops"))
+        report["mutate_cpu_sec"] += time.thread_time() - cpu_start
+        report["replayed"] += 1
+        replayed.append({"iteration": entry.get("iteration"), "seed_id": entry.get("seed_id"),
+                         "mutation_key": key, "mutated_prompt": mutated_prompt,
+                         "applied_mutations": applied_mutations})
+
+        if "mutated_prompt" not in entry:
+            continue  # 프롬프트 없이 키만 기록된 로그는 재생성만 수행
+        if (mutated_prompt == entry["mutated_prompt"]
+                and applied_mutations == entry.get("applied_mutations", applied_mutations)):
+            report["matched"] += 1
+        else:
+            report["mismatched"] += 1
+            report["mismatches"].append(entry.get("iteration"))
+    report["mutate_cpu_sec"] = round(report["mutate_cpu_sec"], 4)
+    return report, replayed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="mutation_key로 변형 프롬프트 재생성/검증")
+    parser.add_argument("log_files", nargs="+", help="all_log_*.jsonl 경로")
+    parser.add_argument("--output", default=None, help="재생성한 프롬프트 JSONL 저장 경로")
+    parser.add_argument("--quiet", action="store_true", help="변형기 INFO 로그 끄기")
+    args = parser.parse_args()
+    logging.basicConfig(level=config.LOG_LEVEL, format=config.LOG_FORMAT)
+    if args.quiet:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    entries = [entry for path in args.log_files for entry in load_log_entries(path)]
+    # 키에 Medium-Level 변형이 있을 때만 형태소 분석기 준비를 기다림
+    needs_medium = any((entry.get("mutation_key") or {}).get("medium") for entry in entries)
+    from mutator import KoreanMutator
+    mutator = KoreanMutator(warm_up="eager" if needs_medium else None)
+
+    report, replayed = replay_entries(entries, mutator)
+    print(json.dumps({k: v for k, v in report.items() if k != "mismatches"}, ensure_ascii=False, indent=4))
+    if report["mismatches"]:
+        print(f"불일치 반복: {report['mismatches'][:20]}", file=sys.stderr)
+    if report["unreplayable"]:
+        print(f"형태소 분석기가 없어 재현하지 못한 항목: {report['unreplayable']}", file=sys.stderr)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            for item in replayed:
+                f.write(json.dumps(item, ensure_ascii=False) + '\n')
+    return 1 if report["mismatched"] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
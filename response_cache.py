@@ -0,0 +1,107 @@
+# response_cache.py
+# (모델, 프롬프트, 생성 옵션) 키 기반의 디스크 영속 응답 캐시 (SQLite)
+# 변형이 적용되지 않았거나 이전과 같은 프롬프트로 수렴한 경우 GPU 생성 없이 응답을 재사용합니다.
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    SQLite 기반 응답 캐시. 스레드 간 공유 가능 (내부 락 사용).
+    max_entries를 넘으면 가장 오래 전에 사용된 항목부터 삭제 (LRU).
+    """
+
+    def __init__(self, db_path, max_entries=None):
+        """
+        Args:
+            db_path (str): SQLite 파일 경로.
+            max_entries (int): 최대 저장 항목 수. None이면 config.RESPONSE_CACHE_MAX_ENTRIES.
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries if max_entries is not None else config.RESPONSE_CACHE_MAX_ENTRIES
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT NOT NULL,"
+            " response TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " last_access REAL NOT NULL)")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        logger.info(f"응답 캐시 열기 완료: {db_path} ({self._count}건)")
+
+    @staticmethod
+    def make_key(model_name, prompt, options=None):
+        """모델명, 정확한 프롬프트, 생성 옵션으로 캐시 키(sha256) 생성."""
+        payload = json.dumps([model_name, prompt, options or {}],
+                             ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, model_name, prompt, options=None):
+        """캐시된 응답 반환. 없으면 None."""
+        key = self.make_key(model_name, prompt, options)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return row[0]
+
+    def put(self, model_name, prompt, response, options=None):
+        """응답 저장 (오류 응답 None은 저장하지 않음)."""
+        if response is None:
+            return
+        key = self.make_key(model_name, prompt, options)
+        now = time.time()
+        with self._lock:
+            exists = self._conn.execute(
+                "SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone() is not None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created, last_access)"
+                " VALUES (?, ?, ?, ?, ?)", (key, model_name, response, now, now))
+            if not exists:
+                self._count += 1
+            if self.max_entries and self._count > self.max_entries:
+                self._evict(self._count - self.max_entries)
+            self._conn.commit()
+
+    def _evict(self, n):
+        """가장 오래 전에 사용된 n개 항목 삭제 (락 보유 상태에서 호출)."""
+        self._conn.execute(
+            "DELETE FROM responses WHERE key IN"
+            " (SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)", (n,))
+        self._count -= n
+        logger.debug(f"응답 캐시 항목 {n}건 삭제 (LRU)")
+
+    def stats(self):
+        return {"entries": self._count, "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
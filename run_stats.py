@@ -0,0 +1,179 @@
+# run_stats.py
+# 실행 1회(모델 1개)의 집계 통계: 처리량, Ollama 측정값(토큰/초, prefill vs decode, 모델 적재), 단계별 CPU 시간
+# 로그 항목을 기록할 때마다 record()로 누적하고 실행 종료 시 run_stats_*.json 으로 저장합니다.
+# 변형 연산자별로는 비용(operator_stats.OperatorStats: 호출/변경/소요 시간)과 하류 결과(해당 연산자가 바꾼
+# 프롬프트의 성공 수, LLM 시간)를 함께 저장해 생성 예산을 낭비하는 연산자를 찾을 수 있게 합니다.
+import collections
+import json
+import logging
+import threading
+import time
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# 로그 항목의 ollama_metrics 중 합산할 필드
+_METRIC_SUM_FIELDS = ("eval_count", "prompt_eval_count", "eval_duration_sec",
+                      "prompt_eval_duration_sec", "load_duration_sec", "total_duration_sec")
+_STAGE_CPU_FIELDS = ("mutate_cpu_sec", "generate_cpu_sec", "judge_cpu_sec")
+
+
+class RunStats:
+    """실행 단위 집계기. 여러 워커 스레드에서 record() 호출 가능 (내부 락 사용)."""
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self.started_at = time.time()
+        self.iterations = 0
+        self.successes = 0
+        self.cache_hits = 0
+        self.escalations = 0
+        self.measured_generations = 0  # Ollama 측정값이 있는 생성 수 (캐시 적중/조기 중단 제외)
+        self.load_stalls = 0           # load_duration이 RUN_STATS_LOAD_STALL_SEC 이상인 생성 수
+        self.llm_wall_sec = 0.0
+        self.llm_errors = collections.Counter()
+        self.metric_sums = dict.fromkeys(_METRIC_SUM_FIELDS, 0)
+        self.stage_cpu_sec = dict.fromkeys(_STAGE_CPU_FIELDS, 0.0)
+        self.run_seed = None  # 변형 난수의 실행 시드 (mutation_rng.new_run_seed, 엔진 시작 전 설정)
+        self.startup = {}  # 초기화 소요 시간 (main에서 설정)
+        self.dedup = {}    # 중복 제거 통계 (dedup.DedupFilter.stats(), 실행 종료 시 설정)
+        # 변형기의 연산자별 비용 집계 (operator_stats.OperatorStats, 엔진 시작 전 설정)
+        self.operator_costs = None
+        # 연산자 이름 -> [프롬프트 수, 성공 수, LLM 초] (applied_mutations 기준)
+        self.operator_yields = {}
+        self.scheduler = {}  # 연산자 스케줄러의 누적 상태 (OperatorScheduler.summary(), 실행 종료 시 설정)
+        self._lock = threading.Lock()
+
+    def record(self, log_entry):
+        """로그 항목 1건 누적."""
+        with self._lock:
+            self.iterations += 1
+            if "SUCCESS" in log_entry.get("judgment", ""):
+                self.successes += 1
+            if log_entry.get("llm_cache_hit"):
+                self.cache_hits += 1
+            if log_entry.get("llm_escalated"):
+                self.escalations += 1
+            if log_entry.get("llm_error"):
+                self.llm_errors[log_entry["llm_error"]] += 1
+            llm_sec = log_entry.get("llm_duration_sec") or 0.0
+            self.llm_wall_sec += llm_sec
+            is_success = "SUCCESS" in log_entry.get("judgment", "")
+            for name in log_entry.get("applied_mutations") or ():
+                counters = self.operator_yields.get(name)
+                if counters is None:
+                    counters = self.operator_yields[name] = [0, 0, 0.0]
+                counters[0] += 1
+                counters[1] += is_success
+                counters[2] += llm_sec
+            for field in _STAGE_CPU_FIELDS:
+                self.stage_cpu_sec[field] += log_entry.get(field) or 0.0
+
+            metrics = log_entry.get("ollama_metrics")
+            if metrics:
+                self.measured_generations += 1
+                for field in _METRIC_SUM_FIELDS:
+                    self.metric_sums[field] += metrics.get(field) or 0
+                if (metrics.get("load_duration_sec") or 0) >= config.RUN_STATS_LOAD_STALL_SEC:
+                    self.load_stalls += 1
+
+    def summary(self):
+        """
+        집계 결과 딕셔너리.
+        - decode/prefill_tokens_per_sec: 전체 토큰 수 / 전체 해당 단계 시간
+        - server_time_share: Ollama 측 시간 중 prefill/decode/적재 비중 (어디서 병목인지 확인)
+        """
+        with self._lock:
+            sums = dict(self.metric_sums)
+            wall_sec = time.time() - self.started_at
+            prefill_sec = sums["prompt_eval_duration_sec"]
+            decode_sec = sums["eval_duration_sec"]
+            load_sec = sums["load_duration_sec"]
+            server_sec = prefill_sec + decode_sec + load_sec
+            return {
+                "model_name": self.model_name,
+                "run_seed": self.run_seed,
+                "wall_sec": round(wall_sec, 2),
+                "iterations": self.iterations,
+                "iter_per_sec": round(self.iterations / wall_sec, 3) if wall_sec > 0 else None,
+                "successes": self.successes,
+                "cache_hits": self.cache_hits,
+                "escalations": self.escalations,
+                "llm_errors": dict(self.llm_errors),
+                "llm_wall_sec": round(self.llm_wall_sec, 2),
+                "measured_generations": self.measured_generations,
+                "tokens": {
+                    "prompt": sums["prompt_eval_count"],
+                    "generated": sums["eval_count"],
+                },
+                "decode_tokens_per_sec": (
+                    round(sums["eval_count"] / decode_sec, 2) if decode_sec else None),
+                "prefill_tokens_per_sec": (
+                    round(sums["prompt_eval_count"] / prefill_sec, 2) if prefill_sec else None),
+                "server_sec": {
+                    "prefill": round(prefill_sec, 3),
+                    "decode": round(decode_sec, 3),
+                    "load": round(load_sec, 3),
+                    "total": round(sums["total_duration_sec"], 3),
+                },
+                "server_time_share": {
+                    "prefill": round(prefill_sec / server_sec, 3) if server_sec else None,
+                    "decode": round(decode_sec / server_sec, 3) if server_sec else None,
+                    "load": round(load_sec / server_sec, 3) if server_sec else None,
+                },
+                "load_stalls": self.load_stalls,
+                "stage_cpu_sec": {k: round(v, 4) for k, v in self.stage_cpu_sec.items()},
+                "startup": dict(self.startup),
+                "dedup": dict(self.dedup),
+                "operators": self._operator_summary(),
+                "scheduler": dict(self.scheduler),
+            }
+
+    def _operator_summary(self):
+        """
+        연산자별 비용과 하류 결과 (락 안에서 호출).
+        - calls/changed/mutate_ms_per_call: 변형기에서 호출된 횟수, 텍스트를 실제로 바꾼 횟수, 호출당 소요 시간
+        - prompts/successes/llm_sec: 이 연산자가 바꾼 프롬프트 중 LLM에 보낸 수, 성공 수, LLM 시간 합계
+        """
+        costs = self.operator_costs.snapshot() if self.operator_costs is not None else {}
+        operators = {}
+        for name in sorted(set(costs) | set(self.operator_yields)):
+            calls, changed, sec = costs.get(name, (0, 0, 0.0))
+            prompts, successes, llm_sec = self.operator_yields.get(name, (0, 0, 0.0))
+            operators[name] = {
+                "calls": calls,
+                "changed": changed,
+                "change_rate": round(changed / calls, 3) if calls else None,
+                "mutate_sec": round(sec, 4),
+                "mutate_ms_per_call": round(sec * 1000 / calls, 4) if calls else None,
+                "prompts": prompts,
+                "successes": successes,
+                "success_rate": round(successes / prompts, 4) if prompts else None,
+                "llm_sec": round(llm_sec, 2),
+                "llm_sec_per_success": round(llm_sec / successes, 2) if successes else None,
+            }
+        return operators
+
+    def save(self, filepath):
+        """집계 결과를 JSON 파일로 저장하고 요약을 반환."""
+        summary = self.summary()
+        try:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, ensure_ascii=False, indent=4)
+            logger.info(f"실행 통계 저장 완료: {filepath}")
+        except IOError as e:
+            logger.error(f"실행 통계 저장 실패 {filepath}: {e}")
+        return summary
+
+    def log_summary(self):
+        summary = self.summary()
+        logger.info(
+            f"[{self.model_name}] 생성 {summary['tokens']['generated']}토큰, "
+            f"decode {summary['decode_tokens_per_sec']} tok/s, prefill {summary['prefill_tokens_per_sec']} tok/s, "
+            f"서버 시간 비중 {summary['server_time_share']}, 모델 적재 지연 {summary['load_stalls']}회")
+        # 성공 없이 LLM 시간만 쓴 연산자 (정리 후보, LLM 시간 순)
+        wasteful = sorted(((name, op["llm_sec"]) for name, op in summary["operators"].items()
+                           if op["prompts"] and not op["successes"]), key=lambda item: -item[1])
+        if wasteful:
+            logger.info(f"[{self.model_name}] 성공 없는 연산자 (LLM 초): {dict(wasteful[:5])}")
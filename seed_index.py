@@ -0,0 +1,295 @@
+# seed_index.py
+# 시드별 사전 분석 인덱스: 형태소 분석(POS), 유의어 치환 후보 위치, 한글 음절 위치, 원문에 정렬된 토큰(token_ir),
+# 판정용 유해 키워드를 시드 로드 시 한 번만 계산해 두고 변형기/판정기가 매 반복 재사용합니다.
+# 결과는 seeds.txt 옆의 JSON 파일에 저장되어 다음 실행에서는 바뀐 시드만 다시 분석합니다.
+# 변형 서비스(mutation_service.py)의 워커 프로세스에는 SharedSeedIndex(mmap 파일)로 같은 인덱스를 공유합니다.
+import array
+import bisect
+import functools
+import hashlib
+import json
+import logging
+import mmap
+import os
+import pickle
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from hangul import syllable_positions
+from judge import extract_harmful_keywords
+from token_ir import align_tokens
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 2
+
+
+def index_signature(mutator):
+    """
+    분석 결과에 영향을 주는 조건의 서명: 형태소 분석기 종류, 유의어 사전 파일 (크기, 수정 시각),
+    유해 키워드 맵. 저장된 인덱스와 서명이 다르면 전체를 다시 분석합니다.
+    유의어 사전은 원본 피클을 기준으로 하고, 피클 없이 컴파일된 파일만 있으면 그 파일을 기준으로 합니다.
+    """
+    thesaurus = None
+    for path in (config.THESAURUS_PATH, config.THESAURUS_COMPILED_PATH):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        thesaurus = f"{stat.st_size}:{int(stat.st_mtime)}"
+        break
+    keywords = json.dumps(config.HARMFUL_KEYWORDS_MAP, ensure_ascii=False, sort_keys=True)
+    return {
+        "analyzer": mutator.analyzer_name if mutator is not None else None,
+        "thesaurus": thesaurus,
+        "keywords": hashlib.sha1(keywords.encode('utf-8')).hexdigest(),
+    }
+
+
+def analyze_seed(text, mutator):
+    """
+    시드 하나를 분석. 형태소 분석기가 없으면 pos/synonym_candidates는 None.
+
+    Returns:
+        dict: {'pos', 'synonym_candidates', 'hangul_positions', 'tokens', 'harmful_keywords'}
+            tokens는 token_ir.align_tokens 템플릿 (분석기가 없으면 어절 단위)
+    """
+    pos_tags = None
+    synonym_candidates = None
+    if mutator is not None and mutator.analyzer:
+        pos_tags = mutator._get_pos(text)
+        synonym_candidates = mutator.synonym_candidate_indices(pos_tags)
+    return {
+        "pos": pos_tags,
+        "synonym_candidates": synonym_candidates,
+        "hangul_positions": syllable_positions(text),
+        "tokens": align_tokens(text, pos_tags or ()),
+        "harmful_keywords": sorted(extract_harmful_keywords(text)),
+    }
+
+
+class SeedIndex:
+    """시드 텍스트 -> 분석 결과 딕셔너리. 생성 후에는 읽기 전용이므로 스레드 간 공유 가능."""
+
+    def __init__(self, entries=None, signature=None, changed=False):
+        self.entries = entries or {}
+        self.signature = signature
+        self.changed = changed  # build()에서 새로 분석한 시드가 있는지 (저장 필요 여부)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, text):
+        """시드 분석 결과. 인덱스에 없는 텍스트(변형된 프롬프트 등)면 None."""
+        return self.entries.get(text)
+
+    def harmful_keywords(self, text):
+        """판정용 유해 키워드 (인덱스에 없으면 직접 추출)."""
+        analysis = self.entries.get(text)
+        if analysis is not None:
+            return analysis["harmful_keywords"]
+        return extract_harmful_keywords(text)
+
+    # --- 구축 ---
+    @classmethod
+    def build(cls, seed_texts, mutator=None, workers=None, previous=None):
+        """
+        시드 목록의 분석 인덱스 구축. previous(이전 인덱스)가 같은 조건에서 만들어졌으면
+        이미 분석된 시드는 재사용하고 새 시드만 분석합니다.
+        """
+        signature = index_signature(mutator)
+        reusable = {}
+        if previous is not None and previous.signature == signature:
+            reusable = previous.entries
+
+        entries = {text: reusable[text] for text in seed_texts if text in reusable}
+        missing = [text for text in dict.fromkeys(seed_texts) if text not in entries]
+        if missing:
+            if mutator is not None and mutator.analyzer_enabled and not mutator.is_ready():
+                # 새 시드의 형태소 분석에는 분석기가 필요 (저장된 인덱스로 충분하면 대기하지 않음)
+                logger.info("새 시드 분석을 위해 형태소 분석기 준비를 기다립니다.")
+                mutator.wait_until_ready()
+            workers = max(1, workers or config.SEED_INDEX_WORKERS)
+            logger.info(f"시드 분석 인덱스 구축: {len(missing)}개 분석 (재사용 {len(entries)}개, 워커 {workers})")
+            if workers > 1:
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="seed-index") as executor:
+                    results = executor.map(lambda t: analyze_seed(t, mutator), missing)
+                    entries.update(zip(missing, results))
+            else:
+                entries.update((text, analyze_seed(text, mutator)) for text in missing)
+            # 대기 중 분석기 기동이 실패했으면 서명이 바뀜 (품사 없는 결과를 다음 실행에서 재사용하지 않도록)
+            signature = index_signature(mutator)
+        return cls(entries, signature, changed=bool(missing))
+
+    # --- 저장/로드 ---
+    def save(self, path):
+        data = {
+            "version": INDEX_VERSION,
+            "signature": self.signature,
+            "entries": [dict(analysis, seed=text) for text, analysis in self.entries.items()],
+        }
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            logger.info(f"시드 분석 인덱스 저장 완료: {path} ({len(self.entries)}개)")
+        except (IOError, OSError) as e:
+            logger.error(f"시드 분석 인덱스 저장 실패 {path}: {e}")
+
+    @classmethod
+    def load(cls, path):
+        """저장된 인덱스 로드. 없거나 형식이 다르면 None."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (IOError, json.JSONDecodeError) as e:
+            logger.warning(f"시드 분석 인덱스 로드 실패 ({path}): {e}. 다시 구축합니다.")
+            return None
+        if data.get("version") != INDEX_VERSION:
+            return None
+        entries = {}
+        for item in data.get("entries", []):
+            text = item.pop("seed")
+            if item.get("pos") is not None:
+                # 캐시된 분석 결과와 같은 형태(튜플의 튜플)로 복원
+                item["pos"] = tuple(tuple(pair) for pair in item["pos"])
+            entries[text] = item
+        return cls(entries, data.get("signature"))
+
+
+# --- 프로세스 간 공유 (mutation_service 워커용) ---
+SHARED_MAGIC = b"KOSEEDIX"
+SHARED_FORMAT_VERSION = 1
+_SHARED_HEADER = struct.Struct("=8sII")
+
+
+def _text_hash(text):
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class SharedSeedIndex:
+    """
+    SeedIndex의 읽기 전용 mmap 사본. 부모 프로세스가 파일 하나로 내보내면 각 워커 프로세스는 mmap만 하므로
+    OS 페이지 캐시의 한 사본을 공유하고, 조회한 시드의 분석 결과만 역직렬화합니다 (워커별 LRU 캐시).
+    시드 ID(= 내보낸 순서)로 원문도 찾을 수 있어 워커에는 변형 키만 넘기면 됩니다.
+    SeedIndex와 같은 조회 메서드(get, harmful_keywords)를 제공합니다.
+
+    파일 형식 (같은 머신의 프로세스끼리만 쓰는 임시 파일이므로 네이티브 바이트 순서):
+        헤더 magic(8) version(u32) count(u32)
+        u64 x count 원문 해시 (정렬), u32 x count 해시 순서 -> 시드 ID, u32 x (count+1) 항목 오프셋 (blob 기준)
+        항목 blob: 시드 ID 순으로 pickle((원문, 분석 결과))
+    """
+
+    def __init__(self, path, cache_size=None):
+        self.path = path
+        self.cache_size = cache_size or config.SHARED_SEED_INDEX_CACHE
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = _SHARED_HEADER.unpack_from(self._mm, 0)
+        if magic != SHARED_MAGIC or version != SHARED_FORMAT_VERSION:
+            self._mm.close()
+            raise ValueError(f"공유 시드 인덱스 형식이 아닙니다: {path}")
+        self._count = count
+        view = memoryview(self._mm)
+        pos = _SHARED_HEADER.size
+        self._hashes = view[pos:pos + 8 * count].cast('Q')
+        pos += 8 * count
+        self._ids_by_hash = view[pos:pos + 4 * count].cast('I')
+        pos += 4 * count
+        self._offsets = view[pos:pos + 4 * (count + 1)].cast('I')
+        self._blob_base = pos + 4 * (count + 1)
+        self._entry = functools.lru_cache(maxsize=self.cache_size)(self._load_entry)
+
+    @classmethod
+    def export(cls, index, seed_texts, path):
+        """index(SeedIndex)에서 seed_texts(시드 ID 순)의 분석 결과를 path에 내보내고 연 사본을 반환."""
+        blobs = [pickle.dumps((text, index.get(text)), protocol=pickle.HIGHEST_PROTOCOL) for text in seed_texts]
+        order = sorted(range(len(seed_texts)), key=lambda i: _text_hash(seed_texts[i]))
+        hashes = array.array('Q', [_text_hash(seed_texts[i]) for i in order])
+        offsets = array.array('I', [0])
+        for blob in blobs:
+            offsets.append(offsets[-1] + len(blob))
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_SHARED_HEADER.pack(SHARED_MAGIC, SHARED_FORMAT_VERSION, len(seed_texts)))
+            f.write(hashes.tobytes())
+            f.write(array.array('I', order).tobytes())
+            f.write(offsets.tobytes())
+            for blob in blobs:
+                f.write(blob)
+        os.replace(tmp_path, path)
+        return cls(path)
+
+    def __len__(self):
+        return self._count
+
+    def __reduce__(self):
+        # 워커 프로세스로 넘길 때는 경로만 전달하고 각 프로세스에서 다시 mmap (페이지 캐시 공유)
+        return (self.__class__, (self.path, self.cache_size))
+
+    def _load_entry(self, seed_id):
+        start = self._blob_base + self._offsets[seed_id]
+        return pickle.loads(self._mm[start:self._blob_base + self._offsets[seed_id + 1]])
+
+    def seed_text(self, seed_id):
+        """시드 ID의 원문 (범위 밖이면 None)."""
+        if not 0 <= seed_id < self._count:
+            return None
+        return self._entry(seed_id)[0]
+
+    def get(self, text):
+        """시드 분석 결과. 인덱스에 없는 텍스트(변형된 프롬프트 등)면 None."""
+        text_hash = _text_hash(text)
+        i = bisect.bisect_left(self._hashes, text_hash)
+        while i < self._count and self._hashes[i] == text_hash:
+            seed_text, analysis = self._entry(self._ids_by_hash[i])
+            if seed_text == text:
+                return analysis
+            i += 1
+        return None
+
+    def harmful_keywords(self, text):
+        """판정용 유해 키워드 (인덱스에 없으면 직접 추출)."""
+        analysis = self.get(text)
+        if analysis is not None:
+            return analysis["harmful_keywords"]
+        return extract_harmful_keywords(text)
+
+    def close(self):
+        self._entry.cache_clear()
+        for view in (self._hashes, self._ids_by_hash, self._offsets):
+            view.release()  # mmap을 닫기 전에 내보낸 버퍼를 먼저 해제해야 함
+        self._mm.close()
+
+
+_seed_index = SeedIndex()
+_seed_index_lock = threading.Lock()
+
+
+def get_seed_index():
+    """현재 실행에서 사용하는 시드 분석 인덱스 (prepare_seed_index 전에는 빈 인덱스)."""
+    return _seed_index
+
+
+def prepare_seed_index(seed_texts, mutator=None, path=None):
+    """
+    저장된 인덱스를 불러와 바뀐 시드만 다시 분석하고, 변경이 있으면 저장한 뒤
+    프로세스 공용 인덱스로 설정합니다. mutator가 주어지면 변형기에도 연결합니다.
+    """
+    global _seed_index
+    path = path or config.SEED_INDEX_PATH
+    with _seed_index_lock:
+        previous = SeedIndex.load(path)
+        index = SeedIndex.build(seed_texts, mutator, previous=previous)
+        if index.changed or previous is None or len(previous) != len(index):
+            index.save(path)
+        _seed_index = index
+    if mutator is not None:
+        mutator.seed_index = index
+    logger.info(f"시드 분석 인덱스 준비 완료: {len(index)}개")
+    return index
@@ -1,4 +1,6 @@
 # seed_manager.py
+# 시드 풀은 ID 순 리스트(seed_pool[id])로 두고, 가중치는 펜윅 트리(누적합 트리)로 관리해
+# 가중치 기반 선택과 가중치 업데이트를 O(log n), ID 조회를 O(1)로 처리합니다 (수십만 개 시드 코퍼스용).
 import random
 import logging
 import os
@@ -7,8 +9,66 @@ import config  # config 임포트
 logger = logging.getLogger(__name__)
 
 
+class FenwickTree:
+    """가중치 누적합 트리: 값 변경/추가와 누적합 기준 탐색이 O(log n)."""
+
+    def __init__(self, values=()):
+        # O(n) 구성: 각 노드가 자신의 값을 부모 노드에 한 번씩 전달
+        self._tree = [0.0] + [float(v) for v in values]
+        n = len(self._tree) - 1
+        for i in range(1, n + 1):
+            parent = i + (i & -i)
+            if parent <= n:
+                self._tree[parent] += self._tree[i]
+
+    def __len__(self):
+        return len(self._tree) - 1
+
+    def add(self, index, delta):
+        """index(0부터) 위치의 값에 delta를 더함."""
+        tree, n = self._tree, len(self._tree) - 1
+        i = index + 1
+        while i <= n:
+            tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, count):
+        """앞에서부터 count개 값의 합."""
+        tree, total = self._tree, 0.0
+        i = count
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def total(self):
+        return self.prefix_sum(len(self))
+
+    def append(self, value):
+        """맨 뒤에 값 추가 (새 노드는 자신이 담당하는 구간의 합으로 초기화)."""
+        i = len(self._tree)
+        lowbit = i & -i
+        self._tree.append(float(value) + self.prefix_sum(i - 1) - self.prefix_sum(i - lowbit))
+
+    def find(self, target):
+        """누적합이 target을 처음 넘는 위치 (0부터, 0 <= target < total())."""
+        tree, n = self._tree, len(self._tree) - 1
+        pos = 0
+        step = 1 << n.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= n and tree[nxt] <= target:
+                pos = nxt
+                target -= tree[nxt]
+            step >>= 1
+        return min(pos, n - 1)  # 부동소수 오차로 target이 합계 이상이 되어도 마지막 위치로
+
+
 class SeedManager:
-    """시드 파일을 로드하고, 가중치 기반 랜덤 선택 및 가중치 업데이트를 관리."""
+    """
+    시드 파일을 로드하고, 가중치 기반 랜덤 선택 및 가중치 업데이트를 관리.
+    seed_pool[i]의 ID는 i이며, 선택/업데이트는 펜윅 트리로 O(log n)입니다.
+    """
 
     def __init__(self, seed_file_path):
         """
@@ -23,6 +83,8 @@ class SeedManager:
         self.weight_decrease = config.WEIGHT_DECREASE
         self.min_weight = config.MIN_WEIGHT
         self.max_weight = config.MAX_WEIGHT
+        self._weights = FenwickTree()
+        self._updates_since_rebuild = 0
         self.load_seeds()
 
     def load_seeds(self):
@@ -41,11 +103,31 @@ class SeedManager:
                 {'id': i, 'seed': seed_text, 'weight': self.initial_weight}
                 for i, seed_text in enumerate(seeds)
             ]
+            self._rebuild_weights()
             logger.info(
                 f"총 {len(self.seed_pool)}개의 시드를 '{self.seed_file_path}'에서 로드했습니다.")
         except Exception as e:
             logger.error(f"시드 파일 로드 중 오류 발생: {e}")
             self.seed_pool = []
+            self._rebuild_weights()
+
+    def _rebuild_weights(self):
+        """seed_pool의 가중치로 누적합 트리를 다시 구성 (O(n))."""
+        self._weights = FenwickTree(item['weight'] for item in self.seed_pool)
+        self._updates_since_rebuild = 0
+
+    def add_seed(self, seed_text, weight=None):
+        """
+        시드 추가 (진화/발견된 프롬프트 등). O(log n).
+
+        Returns:
+            int: 새 시드 ID
+        """
+        seed_id = len(self.seed_pool)
+        weight = self.initial_weight if weight is None else min(self.max_weight, max(self.min_weight, weight))
+        self.seed_pool.append({'id': seed_id, 'seed': seed_text, 'weight': weight})
+        self._weights.append(weight)
+        return seed_id
 
     def select_seed(self):
         """가중치에 따라 시드 하나를 랜덤하게 선택."""
@@ -53,24 +135,22 @@ class SeedManager:
             logger.warning("시드 풀이 비어 있어 시드를 선택할 수 없습니다.")
             return None
 
-        weights = [item['weight'] for item in self.seed_pool]
-        total_weight = sum(weights)
+        total_weight = self._weights.total()
 
         if total_weight <= 0:
             logger.warning("모든 시드 가중치가 0 이하입니다. 균등 확률로 선택합니다.")
             selected_item = random.choice(self.seed_pool)
         else:
-            selected_item = random.choices(
-                self.seed_pool, weights=weights, k=1)[0]
+            selected_item = self.seed_pool[self._weights.find(random.random() * total_weight)]
 
         logger.debug(
             f"선택된 시드 ID: {selected_item['id']}, 가중치: {selected_item['weight']:.2f}")
-        return selected_item.copy()  # 원본 수정을 방지하기 위해 복사본 반환
+        # 복사하지 않고 풀의 항목을 그대로 반환 (호출자는 읽기만 하며, 'weight'는 이후 업데이트가 반영될 수 있음)
+        return selected_item
 
     def update_weight(self, selected_seed_id, success):
         """선택된 시드의 가중치를 성공 여부에 따라 업데이트."""
-        seed_item = next(
-            (item for item in self.seed_pool if item['id'] == selected_seed_id), None)
+        seed_item = self._get_item(selected_seed_id)
         if seed_item:
             current_weight = seed_item['weight']
             if success:
@@ -84,16 +164,26 @@ class SeedManager:
                 logger.debug(
                     f"시드 ID {selected_seed_id} 가중치 감소: {current_weight:.2f} -> {new_weight:.2f}")
             seed_item['weight'] = new_weight
+            self._weights.add(selected_seed_id, new_weight - current_weight)
+            self._updates_since_rebuild += 1
+            if self._updates_since_rebuild > max(1024, len(self.seed_pool)):
+                # 증분 업데이트의 부동소수 오차가 쌓이지 않도록 주기적으로 재구성 (분할 상환 O(1))
+                self._rebuild_weights()
         else:
             logger.warning(
                 f"가중치 업데이트 실패: 시드 ID {selected_seed_id}를 찾을 수 없습니다.")
 
     def get_seed_by_id(self, seed_id):
         """ID로 시드 텍스트 조회."""
-        seed_item = next(
-            (item for item in self.seed_pool if item['id'] == seed_id), None)
+        seed_item = self._get_item(seed_id)
         return seed_item['seed'] if seed_item else None
 
+    def _get_item(self, seed_id):
+        """ID로 시드 항목 조회 (O(1), 없으면 None)."""
+        if isinstance(seed_id, int) and 0 <= seed_id < len(self.seed_pool):
+            return self.seed_pool[seed_id]
+        return None
+
     def get_current_weights(self):
         """디버깅용 현재 가중치 반환."""
         return {item['id']: round(item['weight'], 2) for item in self.seed_pool}
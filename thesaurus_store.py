@@ -0,0 +1,208 @@
+# thesaurus_store.py
+# 컴파일된 유의어 사전: 정렬된 (단어, 품사) 키 테이블 + 오프셋 배열 + 관련 단어 목록을 한 파일에 담아 mmap으로 엽니다.
+# 피클처럼 시작 시 전체를 역직렬화하지 않고 조회한 페이지만 읽으며, 여러 워커 프로세스가 OS 페이지 캐시의
+# 같은 사본을 공유합니다. 관련 단어(유의어+상위어+하위어) 목록은 컴파일 시 중복 제거/정렬해 둡니다.
+#
+# 파일 형식 (리틀 엔디언):
+#   헤더  : magic(8) version(u32) count(u32) key_blob_pos(u32) value_blob_pos(u32)
+#   u32 x (count+1) 키 오프셋, u32 x (count+1) 값 오프셋 (각 blob 시작 기준)
+#   키 blob  : "단어\0품사" UTF-8, 바이트 순 정렬
+#   값 blob  : 관련 단어들을 "\0"으로 이은 UTF-8
+#
+# 변환: python thesaurus_store.py [pickle 경로] [출력 경로]
+import array
+import logging
+import mmap
+import os
+import pickle
+import struct
+import sys
+
+import config
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"KOTHES\0\0"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sIIII")
+_SEPARATOR = b"\0"
+
+
+def _encode_key(word, pos_tag):
+    return word.encode('utf-8') + _SEPARATOR + pos_tag.encode('utf-8')
+
+
+def related_words_from_entry(word, entry):
+    """피클 사전 항목 {'synonyms', 'hypernym', 'hyponyms'} -> 중복 제거/정렬된 관련 단어 목록 (원본 단어 제외)."""
+    related_words = set()
+    synonyms = entry.get('synonyms')
+    if synonyms and isinstance(synonyms, (list, set)):
+        related_words.update(s for s in synonyms if isinstance(s, str))
+    hypernym = entry.get('hypernym')
+    if hypernym and isinstance(hypernym, str):
+        related_words.add(hypernym)
+    hyponyms = entry.get('hyponyms')
+    if hyponyms and isinstance(hyponyms, (list, set)):
+        related_words.update(h for h in hyponyms if isinstance(h, str))
+    related_words.discard(word)
+    # 구분자와 겹치는 단어는 저장할 수 없으므로 제외
+    return sorted(w for w in related_words if w and "\0" not in w)
+
+
+def compile_thesaurus(thesaurus, out_path):
+    """
+    thesaurus[word][pos_tag] = {...} 형태의 사전을 컴파일된 파일로 저장 (임시 파일에 쓴 뒤 교체).
+    관련 단어가 하나도 없는 (단어, 품사)는 치환 후보가 될 수 없으므로 제외합니다.
+
+    Returns:
+        int: 저장된 (단어, 품사) 키 수
+    """
+    items = []
+    for word, pos_entries in thesaurus.items():
+        if not isinstance(word, str) or "\0" in word or not isinstance(pos_entries, dict):
+            continue
+        for pos_tag, entry in pos_entries.items():
+            if not isinstance(pos_tag, str) or not isinstance(entry, dict):
+                continue
+            related = related_words_from_entry(word, entry)
+            if related:
+                items.append((_encode_key(word, pos_tag), "\0".join(related).encode('utf-8')))
+    items.sort(key=lambda item: item[0])
+
+    key_offsets, value_offsets = array.array('I', [0]), array.array('I', [0])
+    for key, value in items:
+        key_offsets.append(key_offsets[-1] + len(key))
+        value_offsets.append(value_offsets[-1] + len(value))
+    if sys.byteorder != 'little':
+        key_offsets.byteswap()
+        value_offsets.byteswap()
+
+    count = len(items)
+    key_blob_pos = _HEADER.size + 2 * 4 * (count + 1)
+    value_blob_pos = key_blob_pos + sum(len(key) for key, _ in items)
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, count, key_blob_pos, value_blob_pos))
+        f.write(key_offsets.tobytes())
+        f.write(value_offsets.tobytes())
+        for key, _ in items:
+            f.write(key)
+        for _, value in items:
+            f.write(value)
+    os.replace(tmp_path, out_path)
+    return count
+
+
+def convert_pickle(pickle_path, out_path):
+    """기존 combined_thesaurus.pkl -> 컴파일된 파일."""
+    with open(pickle_path, 'rb') as f:
+        thesaurus = pickle.load(f)
+    count = compile_thesaurus(thesaurus, out_path)
+    logger.info(f"유의어 사전 컴파일 완료: {pickle_path} -> {out_path} ({count}개 (단어, 품사))")
+    return count
+
+
+class ThesaurusStore:
+    """
+    컴파일된 유의어 사전 (읽기 전용 mmap, 스레드 간 공유 가능).
+    키 조회는 mmap 위 이진 탐색이며 관련 단어 목록은 조회한 키만 디코딩합니다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, self._key_base, self._value_base = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mm.close()
+            raise ValueError(f"컴파일된 유의어 사전 형식이 아닙니다: {path}")
+        self._count = count
+        offsets_size = 4 * (count + 1)
+        view = memoryview(self._mm)
+        key_offsets = view[_HEADER.size:_HEADER.size + offsets_size]
+        value_offsets = view[_HEADER.size + offsets_size:_HEADER.size + 2 * offsets_size]
+        if sys.byteorder == 'little':
+            # mmap 위의 오프셋 배열을 복사 없이 그대로 사용
+            self._key_offsets = key_offsets.cast('I')
+            self._value_offsets = value_offsets.cast('I')
+        else:
+            self._key_offsets = array.array('I', key_offsets.tobytes())
+            self._key_offsets.byteswap()
+            self._value_offsets = array.array('I', value_offsets.tobytes())
+            self._value_offsets.byteswap()
+
+    def __len__(self):
+        return self._count
+
+    def __reduce__(self):
+        # 워커 프로세스로 넘길 때는 경로만 전달하고 각 프로세스에서 다시 mmap (페이지 캐시 공유)
+        return (self.__class__, (self.path,))
+
+    def _key_at(self, i):
+        return self._mm[self._key_base + self._key_offsets[i]:self._key_base + self._key_offsets[i + 1]]
+
+    def _find(self, word, pos_tag):
+        """(word, pos_tag) 키의 인덱스, 없으면 -1."""
+        key = _encode_key(word, pos_tag)
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count and self._key_at(lo) == key:
+            return lo
+        return -1
+
+    def contains(self, word, pos_tag):
+        """관련 단어가 있는 (word, pos_tag)인지."""
+        return self._find(word, pos_tag) >= 0
+
+    def related(self, word, pos_tag):
+        """관련 단어(유의어, 상위어, 하위어) 목록 (정렬됨, 원본 단어 제외). 없으면 빈 리스트."""
+        i = self._find(word, pos_tag)
+        if i < 0:
+            return []
+        start = self._value_base + self._value_offsets[i]
+        end = self._value_base + self._value_offsets[i + 1]
+        return self._mm[start:end].decode('utf-8').split("\0")
+
+    def close(self):
+        for offsets in (self._key_offsets, self._value_offsets):
+            if isinstance(offsets, memoryview):
+                offsets.release()  # mmap을 닫기 전에 내보낸 버퍼를 먼저 해제해야 함
+        self._mm.close()
+
+
+def open_thesaurus(compiled_path=None, pickle_path=None):
+    """
+    컴파일된 유의어 사전을 엽니다. 컴파일된 파일이 없거나 피클보다 오래되었으면 피클에서 먼저 변환합니다.
+
+    Returns:
+        ThesaurusStore | None: 사전 파일이 없거나 열 수 없으면 None.
+    """
+    compiled_path = compiled_path or config.THESAURUS_COMPILED_PATH
+    pickle_path = pickle_path or config.THESAURUS_PATH
+    try:
+        if os.path.exists(pickle_path) and (
+                not os.path.exists(compiled_path)
+                or os.path.getmtime(compiled_path) < os.path.getmtime(pickle_path)):
+            convert_pickle(pickle_path, compiled_path)
+        if not os.path.exists(compiled_path):
+            logger.warning(
+                f"유의어 사전 파일을 찾을 수 없습니다: {pickle_path}. 유의어 변형 비활성화.")
+            return None
+        store = ThesaurusStore(compiled_path)
+        logger.info(f"유의어 사전 로드 완료: {compiled_path} ({len(store)}개 (단어, 품사))")
+        return store
+    except Exception as e:
+        logger.error(f"유의어 사전 로드 실패 ({compiled_path}): {e}")
+        return None
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format=config.LOG_FORMAT)
+    source = sys.argv[1] if len(sys.argv) > 1 else config.THESAURUS_PATH
+    target = sys.argv[2] if len(sys.argv) > 2 else config.THESAURUS_COMPILED_PATH
+    convert_pickle(source, target)
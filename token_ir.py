@@ -0,0 +1,186 @@
+# token_ir.py
+# Medium/High-Level 변형이 공유하는 토큰 표현: 형태소(분석기가 없으면 어절) 단위 토큰에 원문 오프셋, 품사,
+# 뒤따르는 공백을 붙여 텍스트당 한 번 만들고, 조사/어미/유의어/어순/필러 변형이 토큰을 제자리에서 고친 뒤
+# 마지막에 한 번만 문자열로 되돌립니다. 원래 공백을 토큰에 보존하므로 " ".join + 정규식 정리가 필요 없고
+# 띄어쓰기도 무너지지 않습니다.
+#
+# 정렬: 형태소 분석 결과를 원문 위에서 앞으로만 찾아(현재/다음 어절 범위 안) 선형 시간에 오프셋을 붙이고,
+# 정규화(norm=True)로 원문에 없는 형태소는 건너뛰며, 어느 형태소에도 맞지 않은 원문 조각은 품사 없는 토큰으로 남깁니다.
+import re
+
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+_NON_SPACE_PATTERN = re.compile(r'\S+')
+SENTENCE_END_CHARS = ".?!"
+
+
+class Token:
+    """
+    토큰 하나.
+
+    Attributes:
+        text (str): 현재 텍스트 (변형으로 바뀌거나 ''로 삭제될 수 있음)
+        tag (str): 품사 (분석 결과에 맞지 않은 조각/삽입된 토큰은 None)
+        start (int): 원문 시작 오프셋 (삽입된 토큰은 None), end는 원래 텍스트 기준 끝 오프셋
+        ws (str): 토큰 뒤의 공백 (원문 그대로)
+        pos_index (int): 형태소 분석 결과(pos_tags)에서의 인덱스 (없으면 None)
+    """
+
+    __slots__ = ("text", "tag", "start", "end", "ws", "pos_index")
+
+    def __init__(self, text, tag=None, start=None, ws="", pos_index=None):
+        self.text = text
+        self.tag = tag
+        self.start = start
+        self.end = start + len(text) if start is not None else None
+        self.ws = ws
+        self.pos_index = pos_index
+
+    def __repr__(self):
+        return f"Token({self.text!r}, {self.tag!r}, {self.start}, ws={self.ws!r})"
+
+
+def align_tokens(text, pos_tags):
+    """
+    형태소 분석 결과를 원문에 정렬한 토큰 템플릿 (JSON으로 저장 가능, 시드 인덱스에 보관).
+
+    Args:
+        text (str): 원문
+        pos_tags: [(형태소, 품사), ...]. 비어 있으면 공백 기준 어절 토큰(품사 None)만 만듦
+
+    Returns:
+        tuple: (lead, [[text, tag, start, ws, pos_index], ...]) - lead는 맨 앞 공백
+    """
+    n = len(text)
+    match = _WHITESPACE_PATTERN.match(text)
+    cursor = match.end() if match else 0
+    lead = text[:cursor]
+    items = []
+
+    def emit(start, end, tag, pos_index):
+        ws_match = _WHITESPACE_PATTERN.match(text, end)
+        ws_end = ws_match.end() if ws_match else end
+        items.append([text[start:end], tag, start, text[end:ws_end], pos_index])
+        return ws_end
+
+    def emit_gap(start, end):
+        for piece in _NON_SPACE_PATTERN.finditer(text, start, end):
+            emit(piece.start(), piece.end(), None, None)
+
+    for pos_index, (word, tag) in enumerate(pos_tags):
+        if not word or cursor >= n:
+            continue
+        # 찾는 범위: 현재 어절과 다음 어절 (앞 형태소가 정규화로 건너뛰어져 현재 어절이 남아 있을 수 있음)
+        first_ws = _WHITESPACE_PATTERN.search(text, cursor)
+        limit = n
+        if first_ws:
+            second_ws = _WHITESPACE_PATTERN.search(text, first_ws.end())
+            limit = second_ws.start() if second_ws else n
+        found = text.find(word, cursor, limit)
+        if found < 0:
+            continue  # 정규화로 원문에 없는 형태소 (해당 원문은 품사 없는 조각으로 남음)
+        if found > cursor:
+            emit_gap(cursor, found)
+        cursor = emit(found, found + len(word), tag, pos_index)
+    emit_gap(cursor, n)
+    return lead, items
+
+
+class TokenText:
+    """
+    변형 중인 텍스트의 토큰 목록. 변형 함수가 tokens를 제자리에서 고치고 render()로 한 번에 문자열화합니다.
+
+    Attributes:
+        lead (str): 맨 앞 공백
+        tokens (list[Token]): 토큰 목록
+        source_text (str): 토큰을 만든 원문
+        pos_tags: 원문의 형태소 분석 결과 (Token.pos_index가 가리키는 목록)
+    """
+
+    def __init__(self, lead, tokens, source_text, pos_tags=None):
+        self.lead = lead
+        self.tokens = tokens
+        self.source_text = source_text
+        self.pos_tags = pos_tags or ()
+
+    @classmethod
+    def from_template(cls, template, source_text, pos_tags=None):
+        """align_tokens 결과(템플릿)로 새 토큰 목록 생성 (템플릿은 공유되므로 복사)."""
+        lead, items = template
+        return cls(lead, [Token(text, tag, start, ws, pos_index) for text, tag, start, ws, pos_index in items],
+                   source_text, pos_tags)
+
+    @classmethod
+    def build(cls, text, pos_tags=None):
+        return cls.from_template(align_tokens(text, pos_tags or ()), text, pos_tags)
+
+    def render(self):
+        return self.lead + "".join([token.text + token.ws for token in self.tokens])
+
+    def token_for_pos(self, pos_index):
+        """pos_tags[pos_index]에 정렬된 토큰 (정렬되지 않았으면 None)."""
+        for token in self.tokens:
+            if token.pos_index == pos_index:
+                return token
+        return None
+
+    # --- 어절 ---
+    def word_groups(self):
+        """
+        어절(공백 없이 이어진 토큰 묶음) 목록과 각 어절 뒤의 공백.
+
+        Returns:
+            tuple: ([[Token, ...], ...], [공백, ...])
+        """
+        groups, separators, current = [], [], []
+        for token in self.tokens:
+            current.append(token)
+            if token.ws:
+                groups.append(current)
+                separators.append(token.ws)
+                current = []
+        if current:
+            groups.append(current)
+            separators.append(current[-1].ws)
+        return groups, separators
+
+    def set_word_groups(self, groups, separators):
+        """word_groups()로 얻은 어절의 순서를 바꾸거나 어절을 삽입한 뒤 반영 (공백은 위치를 따라감)."""
+        tokens = []
+        for group, separator in zip(groups, separators):
+            group[-1].ws = separator
+            tokens.extend(group)
+        self.tokens = tokens
+
+    # --- 문장 ---
+    def sentences(self):
+        """문장별 토큰 범위 [(first, last), ...] (마지막 토큰이 . ? ! 로 끝나면 문장 끝)."""
+        ranges, first = [], 0
+        for i, token in enumerate(self.tokens):
+            if token.text and token.text[-1] in SENTENCE_END_CHARS:
+                ranges.append((first, i))
+                first = i + 1
+        if first < len(self.tokens):
+            ranges.append((first, len(self.tokens) - 1))
+        return ranges
+
+    def span_text(self, first, last):
+        """tokens[first..last]의 텍스트 (사이 공백 포함, 마지막 토큰 뒤 공백 제외)."""
+        tokens = self.tokens
+        return "".join([t.text + t.ws for t in tokens[first:last]]) + tokens[last].text
+
+    def replace_tail(self, first, last, length, replacement):
+        """
+        tokens[first..last] 텍스트의 마지막 length글자를 replacement로 교체 (공백 없는 꼬리에만 사용).
+        꼬리가 여러 토큰에 걸치면 뒤 토큰부터 잘라내고 replacement는 잘린 가장 앞 토큰에 붙입니다.
+        """
+        tokens = self.tokens
+        k = last
+        while True:
+            token = tokens[k]
+            cut = min(length, len(token.text))
+            token.text = token.text[:len(token.text) - cut]
+            length -= cut
+            if length <= 0 or k == first:
+                break
+            k -= 1
+        tokens[k].text += replacement